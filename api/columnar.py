@@ -0,0 +1,188 @@
+"""
+Columnar binary request/response formats for batch scoring.
+Decodes Arrow IPC streams or numpy .npz archives into column arrays,
+checks Transaction constraints column by column and encodes results back
+into the same format.
+"""
+
+import importlib.util
+import io
+from typing import Any, Dict, Tuple, Type
+
+import numpy as np
+from pydantic import BaseModel
+
+# pyarrow is imported on first Arrow request so API startup does not pay for it
+HAS_PYARROW = importlib.util.find_spec('pyarrow') is not None
+
+ARROW_MEDIA_TYPE = 'application/vnd.apache.arrow.stream'
+NPZ_MEDIA_TYPE = 'application/x-npz'
+COLUMNAR_MEDIA_TYPES = (ARROW_MEDIA_TYPE, NPZ_MEDIA_TYPE)
+
+
+class ColumnarFormatError(ValueError):
+    """Raised when a columnar body cannot be decoded or is malformed as a whole."""
+
+
+def column_constraints(model_cls: Type[BaseModel]) -> Dict[str, Dict[str, Any]]:
+    """
+    Derive per-column checks from a Pydantic model's field declarations.
+
+    Args:
+        model_cls: Pydantic model (e.g. Transaction)
+
+    Returns:
+        Mapping of field name to {'type': float|int|str, 'ge': ..., 'le': ...}
+    """
+    constraints = {}
+    for name, field in model_cls.model_fields.items():
+        spec = {'type': field.annotation, 'ge': None, 'le': None}
+        for item in field.metadata:
+            if hasattr(item, 'ge'):
+                spec['ge'] = item.ge
+            if hasattr(item, 'le'):
+                spec['le'] = item.le
+        constraints[name] = spec
+    return constraints
+
+
+def decode_columns(body: bytes, media_type: str) -> Dict[str, np.ndarray]:
+    """
+    Decode a columnar request body.
+
+    Args:
+        body: Raw request body
+        media_type: One of COLUMNAR_MEDIA_TYPES
+
+    Returns:
+        Mapping of column name to numpy array
+    """
+    try:
+        if media_type == ARROW_MEDIA_TYPE:
+            if not HAS_PYARROW:
+                raise ColumnarFormatError("Arrow IPC requires pyarrow, which is not installed")
+            import pyarrow as pa
+            table = pa.ipc.open_stream(body).read_all()
+            return {
+                name: table.column(name).to_numpy(zero_copy_only=False)
+                for name in table.column_names
+            }
+
+        with np.load(io.BytesIO(body), allow_pickle=False) as archive:
+            return {name: archive[name] for name in archive.files}
+    except ColumnarFormatError:
+        raise
+    except Exception as e:
+        raise ColumnarFormatError(f"Could not decode {media_type} body: {e}")
+
+
+def validate_columns(
+    columns: Dict[str, np.ndarray],
+    constraints: Dict[str, Dict[str, Any]]
+) -> Tuple[Dict[str, np.ndarray], np.ndarray]:
+    """
+    Coerce columns to their declared types and check constraints vectorized.
+
+    Args:
+        columns: Decoded column arrays
+        constraints: Output of column_constraints
+
+    Returns:
+        Tuple of (typed columns, per-row error messages; '' for valid rows)
+
+    Raises:
+        ColumnarFormatError: On missing columns, ragged lengths or
+            columns that cannot be converted at all
+    """
+    missing = [name for name in constraints if name not in columns]
+    if missing:
+        raise ColumnarFormatError(f"Missing columns: {missing}")
+
+    lengths = {len(columns[name]) for name in constraints}
+    if len(lengths) > 1:
+        raise ColumnarFormatError(f"Columns have different lengths: {sorted(lengths)}")
+    n_rows = lengths.pop() if lengths else 0
+
+    errors = np.full(n_rows, '', dtype=object)
+
+    def flag(mask: np.ndarray, message: str) -> None:
+        errors[mask & (errors == '')] = message
+
+    typed = {}
+    for name, spec in constraints.items():
+        values = np.asarray(columns[name])
+
+        if spec['type'] is str:
+            if values.dtype == object:
+                flag(np.equal(values, None), f"{name}: value is required")
+            typed[name] = values.astype(str)
+            continue
+
+        try:
+            numeric = values.astype(np.float64)
+        except (TypeError, ValueError):
+            raise ColumnarFormatError(f"Column '{name}' is not numeric")
+
+        flag(~np.isfinite(numeric), f"{name}: value must be a finite number")
+        if spec['type'] is int:
+            flag(np.isfinite(numeric) & (numeric != np.floor(numeric)), f"{name}: value must be an integer")
+        if spec['ge'] is not None:
+            flag(numeric < spec['ge'], f"{name}: value must be >= {spec['ge']}")
+        if spec['le'] is not None:
+            flag(numeric > spec['le'], f"{name}: value must be <= {spec['le']}")
+
+        typed[name] = numeric
+
+    return typed, errors
+
+
+def risk_levels(probabilities: np.ndarray) -> np.ndarray:
+    """Vectorized risk level mapping (same thresholds as the JSON API)."""
+    return np.select(
+        [probabilities >= 0.7, probabilities >= 0.4],
+        ['HIGH', 'MEDIUM'],
+        default='LOW'
+    )
+
+
+def encode_results(
+    predictions: np.ndarray,
+    probabilities: np.ndarray,
+    errors: np.ndarray,
+    media_type: str
+) -> bytes:
+    """
+    Encode batch results as columns.
+
+    Failed rows carry is_fraud=-1, a NaN probability, an empty risk level
+    and their error message.
+
+    Args:
+        predictions: Predicted classes (one per input row)
+        probabilities: Fraud probabilities (one per input row)
+        errors: Per-row error messages ('' for scored rows)
+        media_type: One of COLUMNAR_MEDIA_TYPES
+
+    Returns:
+        Encoded response body
+    """
+    failed = errors != ''
+    levels = risk_levels(probabilities).astype(object)
+    levels[failed] = ''
+
+    result = {
+        'is_fraud': np.where(failed, -1, predictions).astype(np.int8),
+        'fraud_probability': np.where(failed, np.nan, probabilities).astype(np.float64),
+        'risk_level': levels.astype(str),
+        'error': errors.astype(str)
+    }
+
+    buffer = io.BytesIO()
+    if media_type == ARROW_MEDIA_TYPE:
+        import pyarrow as pa
+        table = pa.table(result)
+        with pa.ipc.new_stream(buffer, table.schema) as writer:
+            writer.write_table(table)
+    else:
+        np.savez(buffer, **result)
+    return buffer.getvalue()
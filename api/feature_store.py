@@ -0,0 +1,473 @@
+"""
+Online feature store for the fraud detection API.
+Keeps a sliding window of each customer's recent transactions in memory so
+/predict can compute velocity features itself instead of trusting
+client-supplied counters, with TTL/LRU eviction of idle customers and
+periodic snapshots to local disk.
+
+Windows and output semantics come from the `velocity_history:` config that
+the offline backfill uses, so served features match the training data.
+"""
+
+import math
+import os
+import tempfile
+import threading
+import time
+from array import array
+from bisect import bisect_left
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, Mapping, Optional
+
+import numpy as np
+
+from src.features.customer_history import CURRENT_AMOUNT, DEFAULT_HISTORY_CONFIG
+
+DISTANCE_FEATURE = 'distance_from_last_transaction'
+
+EARTH_RADIUS_KM = 6371.0088
+
+# Ring buffer capacity a new customer starts with (grows by doubling)
+INITIAL_CAPACITY = 8
+
+# Approximate per-customer overhead of the state object, its lists and the dict node
+STATE_OVERHEAD_BYTES = 480
+
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Great-circle distance between two coordinates in kilometres."""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    a = (
+        math.sin((phi2 - phi1) / 2) ** 2
+        + math.cos(phi1) * math.cos(phi2) * math.sin(math.radians(lon2 - lon1) / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+class _CustomerState:
+    """
+    Recent transactions of one customer.
+
+    Events are numbered by sequence; the ring buffer holds events
+    [first, end) at position seq % capacity. Each window keeps the sequence
+    of its oldest event still inside the window plus a running count and
+    amount sum, so an update only touches events entering or leaving.
+    """
+
+    __slots__ = (
+        'times', 'amounts', 'first', 'end', 'tails', 'counts', 'sums',
+        'last_time', 'latitude', 'longitude', 'last_transaction_id', 'last_features'
+    )
+
+    def __init__(self, n_windows: int, capacity: int = INITIAL_CAPACITY):
+        self.times = array('d', bytes(8 * capacity))
+        self.amounts = array('d', bytes(8 * capacity))
+        self.first = 0
+        self.end = 0
+        self.tails = [0] * n_windows
+        self.counts = [0] * n_windows
+        self.sums = [0.0] * n_windows
+        self.last_time: Optional[float] = None
+        self.latitude: Optional[float] = None
+        self.longitude: Optional[float] = None
+        self.last_transaction_id: Optional[str] = None
+        self.last_features: Optional[Dict[str, float]] = None
+
+    @property
+    def capacity(self) -> int:
+        return len(self.times)
+
+    def resize(self, capacity: int) -> None:
+        """Move the buffered events into a ring of a new capacity."""
+        times = array('d', bytes(8 * capacity))
+        amounts = array('d', bytes(8 * capacity))
+        old = self.capacity
+        for seq in range(self.first, self.end):
+            times[seq % capacity] = self.times[seq % old]
+            amounts[seq % capacity] = self.amounts[seq % old]
+        self.times, self.amounts = times, amounts
+
+
+class OnlineFeatureStore:
+    """Per-customer sliding-window velocity features, updated as transactions are scored."""
+
+    def __init__(
+        self,
+        history_config: Optional[Mapping[str, Any]] = None,
+        max_customers: int = 1000000,
+        max_events_per_customer: int = 4096,
+        ttl_seconds: Optional[float] = None,
+        snapshot_path: Optional[str] = None
+    ):
+        """
+        Initialize feature store.
+
+        Args:
+            history_config: `velocity_history:` config section; missing keys use DEFAULT_HISTORY_CONFIG
+            max_customers: Maximum number of customers kept (least recently active are evicted)
+            max_events_per_customer: Ring buffer cap; older events are dropped from every window
+            ttl_seconds: Forget customers idle this long (defaults to the widest window)
+            snapshot_path: File used by save_snapshot()/load_snapshot()
+        """
+        self.config = dict(DEFAULT_HISTORY_CONFIG)
+        self.config.update(history_config or {})
+
+        # Counts and means share one set of windows, widest last
+        self.windows: List[float] = sorted(
+            set(self.config['count_windows'].values()) | set(self.config['mean_windows'].values())
+        )
+        window_index = {window: i for i, window in enumerate(self.windows)}
+        self._count_outputs = [(name, window_index[w]) for name, w in self.config['count_windows'].items()]
+        self._mean_outputs = [(name, window_index[w]) for name, w in self.config['mean_windows'].items()]
+        self.output_names = (
+            [name for name, _ in self._count_outputs]
+            + [name for name, _ in self._mean_outputs]
+            + [self.config['gap_feature'], DISTANCE_FEATURE]
+        )
+
+        self.max_customers = max_customers
+        self.max_events = max(INITIAL_CAPACITY, max_events_per_customer)
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else max(self.windows, default=0.0)
+        self.snapshot_path = Path(snapshot_path) if snapshot_path else None
+
+        self._customers: 'OrderedDict[str, _CustomerState]' = OrderedDict()
+        self._lock = threading.Lock()
+        self._buffer_slots = 0
+        self._buffered_events = 0
+
+        self.updates = 0
+        self.duplicates = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.truncations = 0
+        self.snapshots = 0
+        self.restored = 0
+        self.last_snapshot_at: Optional[float] = None
+
+    def observe(
+        self,
+        customer_id: str,
+        timestamp: Optional[float] = None,
+        amount: float = 0.0,
+        latitude: Optional[float] = None,
+        longitude: Optional[float] = None,
+        transaction_id: Optional[str] = None
+    ) -> Dict[str, float]:
+        """
+        Velocity features for a transaction, then record it.
+
+        Features only cover the customer's earlier transactions, like the
+        offline backfill. A retry carrying the customer's last transaction_id
+        returns the same features without being counted twice.
+
+        Args:
+            customer_id: Customer key
+            timestamp: Event time in epoch seconds (defaults to now)
+            amount: Transaction amount
+            latitude: Transaction latitude, if known
+            longitude: Transaction longitude, if known
+            transaction_id: Client transaction id used to detect retries
+
+        Returns:
+            Mapping of feature name to value (counts, means, gap and distance
+            from the last known location, 0.0 without coordinates)
+        """
+        now = time.time() if timestamp is None else timestamp
+
+        with self._lock:
+            state = self._customers.get(customer_id)
+            if state is not None and transaction_id is not None and transaction_id == state.last_transaction_id:
+                self.duplicates += 1
+                return dict(state.last_features)
+
+            self._expire(now)
+            state = self._customers.get(customer_id)
+            if state is None:
+                state = _CustomerState(len(self.windows))
+                self._customers[customer_id] = state
+                self._buffer_slots += state.capacity
+            else:
+                self._customers.move_to_end(customer_id)
+                # Keep each customer's events ordered if the clock steps back
+                now = max(now, state.last_time)
+
+            self._advance(state, now)
+            features = self._features(state, now, amount, latitude, longitude)
+            self._append(state, now, amount)
+
+            state.last_time = now
+            if latitude is not None and longitude is not None:
+                state.latitude, state.longitude = latitude, longitude
+            state.last_transaction_id = transaction_id
+            state.last_features = features
+            self.updates += 1
+
+            while len(self._customers) > self.max_customers:
+                self._evict_oldest()
+                self.evictions += 1
+
+        return dict(features)
+
+    def _advance(self, state: _CustomerState, now: float) -> None:
+        """Move every window's start past events older than the window."""
+        times, amounts, capacity = state.times, state.amounts, state.capacity
+        for i, window in enumerate(self.windows):
+            cutoff = now - window
+            tail = state.tails[i]
+            while tail < state.end and times[tail % capacity] < cutoff:
+                state.counts[i] -= 1
+                state.sums[i] -= amounts[tail % capacity]
+                tail += 1
+            state.tails[i] = tail
+            if state.counts[i] == 0:
+                state.sums[i] = 0.0
+
+        # The widest window starts earliest; nothing before it is needed
+        first = state.tails[-1] if self.windows else state.end
+        self._buffered_events -= first - state.first
+        state.first = first
+
+        if state.capacity > INITIAL_CAPACITY and state.end - state.first <= state.capacity // 4:
+            self._resize(state, state.capacity // 2)
+
+    def _features(
+        self,
+        state: _CustomerState,
+        now: float,
+        amount: float,
+        latitude: Optional[float],
+        longitude: Optional[float]
+    ) -> Dict[str, float]:
+        """Feature values from the current window state (before the new event)."""
+        empty_mean = self.config['empty_window_mean']
+        empty_mean = float(amount if empty_mean == CURRENT_AMOUNT else empty_mean)
+
+        features: Dict[str, float] = {}
+        for name, i in self._count_outputs:
+            features[name] = state.counts[i]
+        for name, i in self._mean_outputs:
+            count = state.counts[i]
+            features[name] = state.sums[i] / count if count else empty_mean
+
+        if state.last_time is None:
+            features[self.config['gap_feature']] = float(self.config['first_transaction_gap'])
+        else:
+            features[self.config['gap_feature']] = (now - state.last_time) / self.config['gap_unit_seconds']
+
+        distance = 0.0
+        if latitude is not None and longitude is not None and state.latitude is not None:
+            distance = haversine_km(state.latitude, state.longitude, latitude, longitude)
+        features[DISTANCE_FEATURE] = distance
+        return features
+
+    def _append(self, state: _CustomerState, now: float, amount: float) -> None:
+        """Add an event to the ring and every window."""
+        if state.end - state.first == state.capacity:
+            if state.capacity < self.max_events:
+                self._resize(state, min(state.capacity * 2, self.max_events))
+            else:
+                # Buffer full: drop the oldest event from every window holding it
+                oldest = state.first % state.capacity
+                for i in range(len(self.windows)):
+                    if state.tails[i] == state.first:
+                        state.counts[i] -= 1
+                        state.sums[i] -= state.amounts[oldest]
+                        state.tails[i] += 1
+                state.first += 1
+                self._buffered_events -= 1
+                self.truncations += 1
+
+        position = state.end % state.capacity
+        state.times[position] = now
+        state.amounts[position] = amount
+        state.end += 1
+        self._buffered_events += 1
+        for i in range(len(self.windows)):
+            state.counts[i] += 1
+            state.sums[i] += amount
+
+    def _resize(self, state: _CustomerState, capacity: int) -> None:
+        self._buffer_slots += capacity - state.capacity
+        state.resize(capacity)
+
+    def _expire(self, now: float) -> None:
+        """Forget customers idle for longer than the TTL (least recently active first)."""
+        cutoff = now - self.ttl_seconds
+        while self._customers:
+            state = next(iter(self._customers.values()))
+            if state.last_time is None or state.last_time >= cutoff:
+                break
+            self._evict_oldest()
+            self.expirations += 1
+
+    def _evict_oldest(self) -> None:
+        _, state = self._customers.popitem(last=False)
+        self._buffer_slots -= state.capacity
+        self._buffered_events -= state.end - state.first
+
+    def clear(self) -> None:
+        """Forget every customer."""
+        with self._lock:
+            self._customers.clear()
+            self._buffer_slots = 0
+            self._buffered_events = 0
+
+    def save_snapshot(self, path: Optional[str] = None) -> int:
+        """
+        Write every customer's buffered events and last location to disk.
+
+        The state is copied into flat arrays under the lock and written
+        outside it, to a temporary file that atomically replaces the
+        previous snapshot.
+
+        Args:
+            path: Snapshot file (defaults to snapshot_path)
+
+        Returns:
+            Number of customers written
+        """
+        path = Path(path) if path else self.snapshot_path
+        if path is None:
+            raise ValueError("No snapshot path configured")
+
+        with self._lock:
+            n_customers = len(self._customers)
+            ids = [customer_id.encode() for customer_id in self._customers]
+            last_time = np.empty(n_customers)
+            location = np.full((n_customers, 2), np.nan)
+            lengths = np.empty(n_customers, dtype=np.int64)
+            times = array('d')
+            amounts = array('d')
+            for row, state in enumerate(self._customers.values()):
+                last_time[row] = state.last_time
+                if state.latitude is not None:
+                    location[row] = (state.latitude, state.longitude)
+                lengths[row] = state.end - state.first
+                capacity = state.capacity
+                for seq in range(state.first, state.end):
+                    times.append(state.times[seq % capacity])
+                    amounts.append(state.amounts[seq % capacity])
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f'.{path.name}.', suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                np.savez(
+                    f,
+                    windows=np.asarray(self.windows, dtype=np.float64),
+                    id_lengths=np.array([len(customer_id) for customer_id in ids], dtype=np.int64),
+                    id_bytes=np.frombuffer(b''.join(ids), dtype=np.uint8),
+                    last_time=last_time,
+                    location=location,
+                    lengths=lengths,
+                    times=np.frombuffer(times, dtype=np.float64),
+                    amounts=np.frombuffer(amounts, dtype=np.float64)
+                )
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+        self.snapshots += 1
+        self.last_snapshot_at = time.time()
+        return n_customers
+
+    def load_snapshot(self, path: Optional[str] = None) -> int:
+        """
+        Restore customers from a snapshot, replacing the current state.
+
+        Window positions are recomputed from each customer's last event
+        time, so snapshots stay valid if the configured windows change.
+        Customers idle longer than the TTL are skipped.
+
+        Args:
+            path: Snapshot file (defaults to snapshot_path)
+
+        Returns:
+            Number of customers restored (0 if the file does not exist)
+        """
+        path = Path(path) if path else self.snapshot_path
+        if path is None or not path.exists():
+            return 0
+
+        with np.load(path, allow_pickle=False) as data:
+            id_lengths = data['id_lengths']
+            id_bytes = data['id_bytes'].tobytes()
+            last_time = data['last_time']
+            location = data['location']
+            lengths = data['lengths']
+            times = data['times']
+            amounts = data['amounts']
+
+        id_offsets = np.concatenate([[0], np.cumsum(id_lengths)])
+        offsets = np.concatenate([[0], np.cumsum(lengths)])
+        cutoff = time.time() - self.ttl_seconds
+
+        customers: 'OrderedDict[str, _CustomerState]' = OrderedDict()
+        buffer_slots = 0
+        for row in range(len(lengths)):
+            if last_time[row] < cutoff:
+                continue
+            customer_id = id_bytes[id_offsets[row]:id_offsets[row + 1]].decode()
+            state = self._restore_state(
+                times[offsets[row]:offsets[row + 1]].tolist(),
+                amounts[offsets[row]:offsets[row + 1]].tolist(),
+                float(last_time[row])
+            )
+            if not np.isnan(location[row, 0]):
+                state.latitude, state.longitude = float(location[row, 0]), float(location[row, 1])
+            customers[customer_id] = state
+            buffer_slots += state.capacity
+
+        while len(customers) > self.max_customers:
+            buffer_slots -= customers.popitem(last=False)[1].capacity
+
+        with self._lock:
+            self._customers = customers
+            self._buffer_slots = buffer_slots
+            self._buffered_events = sum(state.end - state.first for state in customers.values())
+            self.restored = len(customers)
+        return len(customers)
+
+    def _restore_state(self, times: List[float], amounts: List[float], last_time: float) -> _CustomerState:
+        """Rebuild a customer's ring and window positions as of its last event."""
+        times, amounts = times[-self.max_events:], amounts[-self.max_events:]
+        capacity = INITIAL_CAPACITY
+        while capacity < len(times):
+            capacity *= 2
+        state = _CustomerState(len(self.windows), min(capacity, self.max_events))
+        for seq, (event_time, amount) in enumerate(zip(times, amounts)):
+            state.times[seq] = event_time
+            state.amounts[seq] = amount
+        state.end = len(times)
+
+        for i, window in enumerate(self.windows):
+            tail = bisect_left(times, last_time - window)
+            state.tails[i] = tail
+            state.counts[i] = len(times) - tail
+            state.sums[i] = math.fsum(amounts[tail:])
+        state.first = state.tails[-1] if self.windows else state.end
+        state.last_time = last_time
+        return state
+
+    def stats(self) -> Dict[str, Any]:
+        """Occupancy and update counters."""
+        customers = len(self._customers)
+        return {
+            'customers': customers,
+            'events_buffered': self._buffered_events,
+            'approx_memory_bytes': customers * STATE_OVERHEAD_BYTES + self._buffer_slots * 16,
+            'max_customers': self.max_customers,
+            'max_events_per_customer': self.max_events,
+            'ttl_seconds': self.ttl_seconds,
+            'windows_seconds': self.windows,
+            'updates': self.updates,
+            'duplicates': self.duplicates,
+            'evictions': self.evictions,
+            'expirations': self.expirations,
+            'truncations': self.truncations,
+            'snapshots': self.snapshots,
+            'last_snapshot_at': self.last_snapshot_at,
+            'restored': self.restored
+        }
@@ -0,0 +1,315 @@
+"""
+Compiled inference plan for the fraud detection API.
+Turns the loaded preprocessor artifact into fixed-order numpy lookups so
+scoring does not build pandas objects per request. Engineered features come from
+the same FeaturePipeline that training uses.
+"""
+
+import pickle
+import threading
+import time
+import warnings
+from datetime import datetime
+from typing import Any, Dict, List, Mapping, Optional, Tuple, Union
+
+import numpy as np
+
+from src.features.feature_pipeline import FeaturePipeline
+from src.features.preprocessor_artifact import PreprocessorArtifact
+
+# Models fitted on DataFrames warn when scored with plain arrays; the plan
+# guarantees the training column order, so the warning is noise here.
+warnings.filterwarnings('ignore', message='X does not have valid feature names')
+
+# Raw transaction fields, in the order the API receives them
+RAW_FEATURES = [
+    'amount', 'merchant_category', 'card_present', 'transaction_type',
+    'distance_from_home', 'distance_from_last_transaction',
+    'time_since_last_transaction', 'customer_age', 'customer_tenure_days',
+    'avg_transaction_amount_30d', 'num_transactions_24h', 'num_transactions_7d'
+]
+
+# Scoring stages reported through the optional timings accumulator
+SCORING_STAGES = ('features', 'encoding', 'scaling', 'inference')
+
+
+def _add_timing(timings: Optional[Dict[str, float]], stage: str, seconds: float) -> None:
+    """Accumulate stage seconds when the caller asked for timings."""
+    if timings is not None:
+        timings[stage] = timings.get(stage, 0.0) + seconds
+
+
+class InferencePlan:
+    """Fixed-order scoring plan compiled once from a model and its preprocessor."""
+
+    def __init__(
+        self,
+        model: Any,
+        preprocessor: Union[PreprocessorArtifact, Mapping[str, Any]],
+        pipeline: Optional[FeaturePipeline] = None
+    ):
+        """
+        Compile the plan.
+
+        Args:
+            model: Fitted classifier exposing predict_proba and classes_
+            preprocessor: Preprocessor artifact, or the component dict of a
+                pickled preprocessor
+            pipeline: Feature pipeline (defaults to the one saved with the
+                preprocessor, or the project config for older artifacts)
+        """
+        if not isinstance(preprocessor, PreprocessorArtifact):
+            preprocessor = PreprocessorArtifact.from_components(preprocessor)
+        if pipeline is None:
+            feature_config = preprocessor.feature_config
+            pipeline = FeaturePipeline(feature_config) if feature_config else FeaturePipeline.from_config()
+
+        self.model = model
+        self.pipeline = pipeline
+        self.classes = np.asarray(model.classes_)
+        self.feature_order = self._resolve_feature_order(model, preprocessor, pipeline)
+        self.n_features = len(self.feature_order)
+        self._position = {name: i for i, name in enumerate(self.feature_order)}
+
+        # Category lookups: label -> encoded value (its vocabulary index), unseen -> -1
+        self.category_index: Dict[str, Dict[str, int]] = {
+            col: {label: idx for idx, label in enumerate(vocabulary.tolist())}
+            for col, vocabulary in preprocessor.vocabularies.items()
+            if col in self._position
+        }
+
+        # Bin lookups: bin code -> encoded value; the extra last slot holds
+        # the value for out-of-range inputs, which pandas labels 'nan'
+        self.bin_edges: Dict[str, np.ndarray] = {}
+        self.bin_lookup: Dict[str, np.ndarray] = {}
+        for col, (_, edges, labels) in pipeline.binned_features.items():
+            if col not in self._position:
+                continue
+            index = self.category_index.get(col)
+            self.bin_edges[col] = np.asarray(edges, dtype=np.float64)
+            self.bin_lookup[col] = np.array(
+                [index.get(label, -1) if index is not None else i
+                 for i, label in enumerate(labels + ['nan'])],
+                dtype=np.float64
+            )
+        self._bin_lookup_list = {col: lookup.tolist() for col, lookup in self.bin_lookup.items()}
+
+        # Scaler as full-width vectors; unscaled columns get mean 0 and scale 1
+        self.mean = np.zeros(self.n_features, dtype=np.float64)
+        self.scale = np.ones(self.n_features, dtype=np.float64)
+        if preprocessor.has_scaler:
+            for i, col in enumerate(preprocessor.numeric_features):
+                if col in self._position:
+                    self.mean[self._position[col]] = preprocessor.scaler_mean[i]
+                    self.scale[self._position[col]] = preprocessor.scaler_scale[i]
+
+        self._buffers = threading.local()
+
+    @classmethod
+    def from_files(cls, model_path: str, preprocessor_path: str) -> 'InferencePlan':
+        """
+        Load a pickled model and a preprocessor artifact and compile them into a plan.
+
+        Args:
+            model_path: Path to the pickled model
+            preprocessor_path: Path to the preprocessor artifact (or legacy pickle)
+
+        Returns:
+            Compiled InferencePlan
+        """
+        with open(model_path, 'rb') as f:
+            model = pickle.load(f)
+        return cls(model, PreprocessorArtifact.load(preprocessor_path))
+
+    @staticmethod
+    def _resolve_feature_order(
+        model: Any,
+        preprocessor: PreprocessorArtifact,
+        pipeline: FeaturePipeline
+    ) -> List[str]:
+        """Column order the model was trained on."""
+        if hasattr(model, 'feature_names_in_'):
+            return [str(name) for name in model.feature_names_in_]
+        if preprocessor.feature_order:
+            return list(preprocessor.feature_order)
+
+        known = set(preprocessor.numeric_features) | set(preprocessor.categorical_features)
+        return [col for col in RAW_FEATURES + pipeline.output_names if col in known]
+
+    def _row_buffer(self) -> np.ndarray:
+        """Preallocated (1, n_features) vector, one per thread."""
+        buffer = getattr(self._buffers, 'row', None)
+        if buffer is None:
+            buffer = np.empty((1, self.n_features), dtype=np.float64)
+            self._buffers.row = buffer
+        return buffer
+
+    def transform_one(
+        self,
+        record: Mapping[str, Any],
+        timestamp: Optional[datetime] = None,
+        timings: Optional[Dict[str, float]] = None
+    ) -> np.ndarray:
+        """
+        Build the model input for a single transaction.
+
+        Args:
+            record: Raw transaction fields
+            timestamp: Scoring time for temporal features (defaults to now)
+            timings: Optional dict that per-stage seconds are added to
+
+        Returns:
+            Scaled feature vector of shape (1, n_features)
+        """
+        started = time.perf_counter()
+        features = dict(record)
+        features.update(self.pipeline.transform_record(record, timestamp))
+        engineered = time.perf_counter()
+
+        for col, lookup in self._bin_lookup_list.items():
+            features[col] = lookup[features[col]]
+
+        for col, index in self.category_index.items():
+            if col not in self.bin_lookup:
+                features[col] = index.get(str(record[col]), -1)
+        encoded = time.perf_counter()
+
+        buffer = self._row_buffer()
+        row = buffer[0]
+        for i, name in enumerate(self.feature_order):
+            row[i] = features[name]
+        row -= self.mean
+        row /= self.scale
+
+        if timings is not None:
+            _add_timing(timings, 'features', engineered - started)
+            _add_timing(timings, 'encoding', encoded - engineered)
+            _add_timing(timings, 'scaling', time.perf_counter() - encoded)
+        return buffer
+
+    def transform_batch(
+        self,
+        columns: Mapping[str, Any],
+        timestamp: Optional[datetime] = None,
+        timings: Optional[Dict[str, float]] = None
+    ) -> np.ndarray:
+        """
+        Build the model input for many transactions at once.
+
+        Args:
+            columns: Raw transaction fields as column arrays of equal length
+            timestamp: Scoring time for temporal features (defaults to now)
+            timings: Optional dict that per-stage seconds are added to
+
+        Returns:
+            Scaled feature matrix of shape (n_rows, n_features)
+        """
+        started = time.perf_counter()
+        n_rows = len(columns['amount'])
+        features = dict(columns)
+        features.update(self.pipeline.transform_columns(
+            columns, timestamp or datetime.now(), bin_labels=False
+        ))
+        engineered = time.perf_counter()
+
+        for col, lookup in self.bin_lookup.items():
+            features[col] = lookup[features[col]]
+
+        for col, index in self.category_index.items():
+            if col not in self.bin_lookup:
+                features[col] = np.fromiter(
+                    (index.get(str(value), -1) for value in columns[col]),
+                    dtype=np.float64, count=n_rows
+                )
+        encoded = time.perf_counter()
+
+        matrix = np.empty((n_rows, self.n_features), dtype=np.float64)
+        for i, name in enumerate(self.feature_order):
+            matrix[:, i] = features[name]
+        matrix -= self.mean
+        matrix /= self.scale
+
+        if timings is not None:
+            _add_timing(timings, 'features', engineered - started)
+            _add_timing(timings, 'encoding', encoded - engineered)
+            _add_timing(timings, 'scaling', time.perf_counter() - encoded)
+        return matrix
+
+    def score_one(
+        self,
+        record: Mapping[str, Any],
+        timestamp: Optional[datetime] = None,
+        timings: Optional[Dict[str, float]] = None
+    ) -> Tuple[int, float]:
+        """
+        Score a single transaction with one predict_proba call.
+
+        Returns:
+            Tuple of (prediction, fraud_probability)
+        """
+        features = self.transform_one(record, timestamp, timings)
+        started = time.perf_counter()
+        probabilities = self.model.predict_proba(features)[0]
+        _add_timing(timings, 'inference', time.perf_counter() - started)
+        prediction = self.classes[1] if probabilities[1] > probabilities[0] else self.classes[0]
+        return int(prediction), float(probabilities[1])
+
+    def score_batch(
+        self,
+        columns: Mapping[str, Any],
+        timestamp: Optional[datetime] = None,
+        timings: Optional[Dict[str, float]] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Score many transactions with one predict_proba call.
+
+        Returns:
+            Tuple of (predictions, fraud_probabilities)
+        """
+        features = self.transform_batch(columns, timestamp, timings)
+        started = time.perf_counter()
+        probabilities = self.model.predict_proba(features)
+        _add_timing(timings, 'inference', time.perf_counter() - started)
+        predictions = self.classes[np.argmax(probabilities, axis=1)]
+        return predictions, probabilities[:, 1]
+
+    def score_records(
+        self,
+        records: List[Mapping[str, Any]],
+        timings: Optional[Dict[str, float]] = None
+    ) -> List[Any]:
+        """
+        Score raw transaction records with a single vectorized model call.
+
+        Args:
+            records: Transaction fields as dictionaries
+            timings: Optional dict that per-stage seconds are added to
+
+        Returns:
+            One (prediction, probability) tuple per record, or the Exception
+            raised while scoring that record
+        """
+        columns = {field: [record[field] for record in records] for field in RAW_FEATURES}
+
+        try:
+            predictions, probabilities = self.score_batch(columns, timings=timings)
+        except Exception:
+            # Fall back to row-by-row scoring so errors are attributed to the failing items
+            predictions, probabilities = None, None
+
+        results = []
+        for i, record in enumerate(records):
+            try:
+                if predictions is None:
+                    prediction, probability = self.score_one(record, timings=timings)
+                else:
+                    prediction, probability = predictions[i], probabilities[i]
+
+                if not np.isfinite(probability):
+                    raise ValueError("Model returned a non-finite probability")
+
+                results.append((int(prediction), float(probability)))
+            except Exception as e:
+                results.append(e)
+
+        return results
@@ -4,15 +4,35 @@ Fraud Detection API - FastAPI Application
 Production-ready REST API for fraud detection predictions
 """
 
-from fastapi import FastAPI, HTTPException
-from pydantic import BaseModel, Field
-from typing import List, Optional
-import pickle
-import pandas as pd
-import numpy as np
+import time
+
+# Reference point for time-to-ready reporting (servers import this module first)
+STARTED_AT = time.perf_counter()
+
+from fastapi import FastAPI, Header, HTTPException, Request, Response
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from pydantic import BaseModel, Discriminator, Field, Tag, TypeAdapter, ValidationError
+from typing import Annotated, Any, AsyncIterator, Dict, List, Optional, Tuple, Union
+import asyncio
+import json
+import os
 from datetime import datetime
 from pathlib import Path
-import uvicorn
+import numpy as np
+
+from src.utils.config import load_config, get_section
+from .columnar import (
+    ARROW_MEDIA_TYPE, COLUMNAR_MEDIA_TYPES, NPZ_MEDIA_TYPE, ColumnarFormatError,
+    column_constraints, decode_columns, encode_results, validate_columns
+)
+from .feature_store import OnlineFeatureStore
+from .inference_plan import RAW_FEATURES
+from .metrics import MetricsMiddleware, MetricsRegistry
+from .micro_batcher import MicroBatcher
+from .model_registry import ModelRegistry
+from .prediction_cache import PredictionCache
+from .scoring_executor import ScoringExecutor, ScoringQueueFull
 
 # Initialize FastAPI app
 app = FastAPI(
@@ -21,40 +41,118 @@ app = FastAPI(
     version="1.0.0"
 )
 
+# Load configuration
+config = load_config()
+api_config = get_section(config, 'api')
+batching_config = get_section(config, 'api', 'batching')
+executor_config = get_section(config, 'api', 'executor')
+model_reload_config = get_section(config, 'api', 'model_reload')
+streaming_config = get_section(config, 'api', 'streaming')
+cache_config = get_section(config, 'api', 'cache')
+feature_store_config = get_section(config, 'api', 'feature_store')
+
 # Get correct paths (relative to project root)
 BASE_DIR = Path(__file__).resolve().parent.parent
 MODEL_PATH = BASE_DIR / 'models' / 'saved_models' / 'best_model.pkl'
-PREPROCESSOR_PATH = BASE_DIR / 'models' / 'saved_models' / 'fraud_preprocessor.pkl'
-
-# Load model and preprocessor
-try:
-    with open(MODEL_PATH, 'rb') as f:
-        model = pickle.load(f)
-    with open(PREPROCESSOR_PATH, 'rb') as f:
-        preprocessor = pickle.load(f)
-    print("✅ Model and preprocessor loaded successfully")
-    print(f"   Model path: {MODEL_PATH}")
-except Exception as e:
-    print(f"⚠️  Error loading model: {e}")
-    print(f"   Looking for: {MODEL_PATH}")
-    model = None
-    preprocessor = None
+# Prefer the memory-mapped artifact; the registry falls back to the pickle
+# from older training runs while no .prep exists
+PREPROCESSOR_PATH = BASE_DIR / 'models' / 'saved_models' / 'fraud_preprocessor.prep'
+
+# Admin token for /admin endpoints (open when unset)
+ADMIN_TOKEN = os.getenv('API_ADMIN_TOKEN')
+
+# Model and preprocessor are loaded as a versioned, hot-reloadable bundle.
+# Loading happens in the background at startup; /ready reports when done.
+registry = ModelRegistry(MODEL_PATH, PREPROCESSOR_PATH)
+ready_after_seconds: Optional[float] = None
+
+# Per-stage latency histograms and request/error counters for /metrics
+metrics = MetricsRegistry()
+metrics.describe('stage_seconds', 'Scoring path latency by stage and model version')
+metrics.describe('request_seconds', 'End-to-end request latency by endpoint')
+metrics.describe('requests_total', 'Requests by endpoint and status code')
+metrics.describe('request_errors_total', 'Requests answered with a 4xx/5xx status')
+metrics.describe('predictions_total', 'Transactions answered by endpoint and model version')
+metrics.describe('prediction_errors_total', 'Transactions in a batch or stream that could not be scored')
+
+
+def current_version() -> str:
+    """Version label of the active bundle."""
+    bundle = registry.current
+    return bundle.version if bundle else 'none'
+
+
+def observe_stage(stage: str, seconds: float, version: Optional[str] = None) -> None:
+    """Record the latency of one scoring-path stage."""
+    metrics.observe('stage_seconds', seconds, stage=stage, model_version=version or current_version())
+
+
+def record_stage_timings(timings: Dict[str, float]) -> None:
+    """Record the feature/encoding/scaling/inference timings of a scoring job."""
+    version = current_version()
+    for stage, seconds in timings.items():
+        observe_stage(stage, seconds, version)
+
+
+def observe_parsing(request: Request) -> None:
+    """Record time from request arrival until its body has been parsed."""
+    received_at = getattr(request.state, 'received_at', None)
+    if received_at is not None:
+        observe_stage('parsing', time.perf_counter() - received_at)
+
+
+def count_predictions(endpoint: str, total: int, errors: int = 0) -> None:
+    """Count answered transactions and per-item failures."""
+    version = current_version()
+    if total - errors:
+        metrics.inc('predictions_total', total - errors, endpoint=endpoint, model_version=version)
+    if errors:
+        metrics.inc('prediction_errors_total', errors, endpoint=endpoint, model_version=version)
+
+
+def serialize_json(payload: Any) -> Response:
+    """Serialize a JSON response body, timing the serialization stage."""
+    started = time.perf_counter()
+    body = json.dumps(payload, separators=(",", ":")).encode()
+    observe_stage('serialization', time.perf_counter() - started)
+    return Response(content=body, media_type="application/json")
 
 # Pydantic models for request/response
-class Transaction(BaseModel):
+class TransactionBase(BaseModel):
     amount: float = Field(..., description="Transaction amount")
     merchant_category: str = Field(..., description="Merchant category")
     card_present: int = Field(..., ge=0, le=1, description="Card present (0=No, 1=Yes)")
     transaction_type: str = Field(..., description="Transaction type")
     distance_from_home: float = Field(..., ge=0, description="Distance from home")
-    distance_from_last_transaction: float = Field(..., ge=0)
-    time_since_last_transaction: float = Field(..., ge=0)
     customer_age: int = Field(..., ge=18, le=120)
     customer_tenure_days: int = Field(..., ge=0)
+
+class Transaction(TransactionBase):
+    distance_from_last_transaction: float = Field(..., ge=0)
+    time_since_last_transaction: float = Field(..., ge=0)
     avg_transaction_amount_30d: float = Field(..., ge=0)
     num_transactions_24h: int = Field(..., ge=0)
     num_transactions_7d: int = Field(..., ge=0)
 
+class CustomerTransaction(TransactionBase):
+    """Transaction whose velocity features are filled in from the online feature store"""
+    customer_id: str = Field(..., min_length=1, description="Customer key")
+    transaction_id: Optional[str] = Field(None, description="Client id; a retry with the same id is not counted twice")
+    latitude: Optional[float] = Field(None, ge=-90, le=90)
+    longitude: Optional[float] = Field(None, ge=-180, le=180)
+
+
+def transaction_kind(value: Any) -> str:
+    """Bodies with a customer_id use the feature store; others carry their own counters."""
+    customer_id = value.get('customer_id') if isinstance(value, dict) else getattr(value, 'customer_id', None)
+    return 'customer' if customer_id is not None else 'transaction'
+
+
+PredictRequest = Annotated[
+    Union[Annotated[CustomerTransaction, Tag('customer')], Annotated[Transaction, Tag('transaction')]],
+    Discriminator(transaction_kind)
+]
+
 class PredictionResponse(BaseModel):
     is_fraud: int
     fraud_probability: float
@@ -73,149 +171,617 @@ async def root():
         "message": "Fraud Detection API",
         "version": "1.0.0",
         "endpoints": {
-            "/predict": "POST - Single prediction",
-            "/predict_batch": "POST - Batch predictions",
+            "/predict": "POST - Single prediction (velocity features from the feature store given a customer_id)",
+            "/predict_batch": "POST - Batch predictions (JSON, Arrow IPC or .npz)",
+            "/predict_stream": "POST - Streaming NDJSON predictions",
+            "/batching_stats": "GET - Micro-batching metrics",
+            "/executor_stats": "GET - Scoring pool metrics",
+            "/cache_stats": "GET - Prediction cache metrics",
+            "/feature_store_stats": "GET - Online feature store metrics",
+            "/metrics": "GET - Prometheus metrics (per-stage latency, requests, errors)",
             "/health": "GET - Health check",
-            "/model_info": "GET - Model information"
+            "/ready": "GET - Readiness (model loaded and warmed up)",
+            "/model_info": "GET - Model information",
+            "/admin/reload": "POST - Hot-reload model and preprocessor"
         }
     }
 
 @app.get("/health", response_model=HealthResponse)
 async def health_check():
     """Health check endpoint"""
+    bundle = registry.current
     return HealthResponse(
-        status="healthy" if model else "unhealthy",
-        model_loaded=model is not None,
+        status="healthy" if bundle else "unhealthy",
+        model_loaded=bundle is not None,
         timestamp=datetime.now().isoformat()
     )
 
+@app.get("/ready")
+async def readiness_check():
+    """Readiness endpoint: true once the model is loaded and warmed up"""
+    bundle = registry.current
+    if not bundle:
+        return JSONResponse(status_code=503, content={"ready": False, "last_error": registry.last_error})
+    
+    return {
+        "ready": True,
+        "version": bundle.version,
+        "startup_seconds": ready_after_seconds,
+        "load_timings": bundle.info()['load_timings']
+    }
+
 @app.get("/model_info")
 async def model_info():
     """Get model information"""
-    if not model:
+    bundle = registry.current
+    if not bundle:
         raise HTTPException(status_code=503, detail="Model not loaded")
     
     return {
-        "model_type": type(model).__name__,
         "status": "active",
-        "version": "1.0.0",
-        "last_updated": datetime.now().isoformat()
+        **bundle.info(),
+        "reload_count": registry.reload_count,
+        "last_reload_error": registry.last_error
+    }
+
+@app.post("/admin/reload")
+async def reload_model(x_admin_token: Optional[str] = Header(default=None)):
+    """Load the artifacts on disk in the background and swap them in atomically"""
+    if ADMIN_TOKEN and x_admin_token != ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+    
+    previous = registry.current
+    try:
+        bundle = await registry.reload_async()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Reload failed, keeping current model: {str(e)}")
+    
+    return {
+        "status": "reloaded",
+        "previous_version": previous.version if previous else None,
+        **bundle.info()
     }
 
+def get_risk_level(probability: float) -> str:
+    """Map a fraud probability to a risk level."""
+    if probability >= 0.7:
+        return "HIGH"
+    elif probability >= 0.4:
+        return "MEDIUM"
+    return "LOW"
+
+
+def raise_if_failed(result: Any) -> Tuple[int, float]:
+    """Re-raise a per-record scoring error, otherwise return the result."""
+    if isinstance(result, Exception):
+        raise result
+    return result
+
+
+# Run CPU-bound scoring on a sized pool, off the event loop
+executor = ScoringExecutor(
+    lambda: getattr(registry.current, 'plan', None),
+    kind=executor_config.get('kind', 'thread'),
+    max_workers=api_config.get('workers', 1),
+    max_queue=executor_config.get('max_queue', 256),
+    model_path=MODEL_PATH,
+    preprocessor_path=registry.preprocessor_path,
+    stage_observer=record_stage_timings
+)
+
+# Coalesce concurrent /predict calls into vectorized batches
+batcher = MicroBatcher(
+    executor.score_records,
+    max_batch_size=batching_config.get('max_batch_size', 64),
+    max_wait_ms=batching_config.get('max_wait_ms', 2.0)
+) if batching_config.get('enabled', True) else None
+
+
+@app.get("/batching_stats")
+async def batching_stats():
+    """Get micro-batching batch-size and queue-wait metrics"""
+    if not batcher:
+        return {"enabled": False}
+    
+    return {"enabled": True, **batcher.stats()}
+
+
+@app.get("/cache_stats")
+async def cache_stats():
+    """Get prediction cache hit/miss metrics"""
+    if not prediction_cache:
+        return {"enabled": False}
+    
+    return {"enabled": True, **prediction_cache.stats()}
+
+
+@app.get("/feature_store_stats")
+async def feature_store_stats():
+    """Get online feature store occupancy and update metrics"""
+    if not feature_store:
+        return {"enabled": False}
+    
+    return {"enabled": True, **feature_store.stats()}
+
+
+@app.get("/executor_stats")
+async def executor_stats():
+    """Get scoring pool utilization metrics"""
+    return executor.stats()
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def prometheus_metrics():
+    """Prometheus text-format metrics: per-stage latency, requests, errors and pool state"""
+    bundle = registry.current
+    pool = executor.stats()
+    gauges = {
+        'model_info': [({'model_version': bundle.version}, 1)] if bundle else [],
+        'model_loaded': [({}, int(bundle is not None))],
+        'executor_pending': [({}, pool['pending'])],
+        'executor_max_queue': [({}, pool['max_queue'])]
+    }
+    counters = {
+        'executor_completed_total': [({}, pool['completed_total'])],
+        'executor_rejected_total': [({}, pool['rejected_total'])],
+        'model_reloads_total': [({}, registry.reload_count)]
+    }
+    
+    if batcher:
+        batching = batcher.stats()
+        gauges['batcher_queue_depth'] = [({}, batching['queue_depth'])]
+        counters['batcher_batches_total'] = [({}, batching['batches_total'])]
+        counters['batcher_items_total'] = [({}, batching['items_total'])]
+    
+    if prediction_cache:
+        cache = prediction_cache.stats()
+        gauges['cache_entries'] = [({}, cache['entries'])]
+        gauges['cache_memory_bytes'] = [({}, cache['approx_memory_bytes'])]
+        counters['cache_hits_total'] = [({}, cache['hits'])]
+        counters['cache_misses_total'] = [({}, cache['misses'])]
+        counters['cache_evictions_total'] = [({}, cache['evictions'])]
+    
+    if feature_store:
+        store = feature_store.stats()
+        gauges['feature_store_customers'] = [({}, store['customers'])]
+        gauges['feature_store_memory_bytes'] = [({}, store['approx_memory_bytes'])]
+        counters['feature_store_updates_total'] = [({}, store['updates'])]
+        counters['feature_store_evictions_total'] = [({}, store['evictions'] + store['expirations'])]
+    
+    return PlainTextResponse(
+        metrics.render(gauges=gauges, counters=counters),
+        media_type="text/plain; version=0.0.4"
+    )
+
+
+# Serve retried and duplicate transactions without touching the model
+prediction_cache = PredictionCache(
+    RAW_FEATURES,
+    max_entries=cache_config.get('max_entries', 100000),
+    max_memory_mb=cache_config.get('max_memory_mb', 64),
+    ttl_seconds=cache_config.get('ttl_seconds', 300)
+) if cache_config.get('enabled', True) else None
+
+
+def on_model_swapped(bundle) -> None:
+    """Invalidate cached predictions and recycle process-pool workers."""
+    if prediction_cache:
+        prediction_cache.clear()
+    if executor.kind == 'process':
+        executor.preprocessor_path = bundle.preprocessor_path
+        executor.restart()
+
+
+registry.add_listener(on_model_swapped)
+
+
+# Per-customer velocity windows so /predict need not trust client counters.
+# State is per API process: route a customer's traffic to one process.
+feature_store = OnlineFeatureStore(
+    get_section(config, 'velocity_history'),
+    max_customers=feature_store_config.get('max_customers', 1000000),
+    max_events_per_customer=feature_store_config.get('max_events_per_customer', 4096),
+    ttl_seconds=feature_store_config.get('ttl_seconds'),
+    snapshot_path=BASE_DIR / feature_store_config.get('snapshot_path', 'models/feature_store/snapshot.npz')
+) if feature_store_config.get('enabled', True) else None
+
+
+async def snapshot_feature_store() -> None:
+    """Periodically persist the feature store to local disk."""
+    interval = feature_store_config.get('snapshot_interval_seconds', 60)
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await asyncio.to_thread(feature_store.save_snapshot)
+        except Exception as e:
+            print(f"⚠️  Feature store snapshot failed: {e}")
+
+
+async def load_initial_model() -> None:
+    """Load and warm up the first bundle without blocking startup."""
+    global ready_after_seconds
+    try:
+        await registry.reload_async()
+        ready_after_seconds = round(time.perf_counter() - STARTED_AT, 4)
+        print("✅ Model and preprocessor loaded successfully")
+        print(f"   Model path: {MODEL_PATH}")
+        print(f"   Ready after {ready_after_seconds:.3f}s")
+    except Exception as e:
+        print(f"⚠️  Error loading model: {e}")
+        print(f"   Looking for: {MODEL_PATH}")
+
+
+@app.on_event("startup")
+async def start_model_loading():
+    """Load the model in the background and watch for artifact changes"""
+    app.state.model_loader = asyncio.create_task(load_initial_model())
+    
+    if model_reload_config.get('watch', True):
+        app.state.model_watcher = asyncio.create_task(watch_model_artifacts())
+    
+    if feature_store:
+        try:
+            restored = await asyncio.to_thread(feature_store.load_snapshot)
+            print(f"✅ Feature store restored {restored} customers")
+        except Exception as e:
+            print(f"⚠️  Could not restore feature store snapshot: {e}")
+        app.state.feature_store_snapshots = asyncio.create_task(snapshot_feature_store())
+
+
+async def watch_model_artifacts() -> None:
+    """Hot-reload on artifact changes once the initial load has finished."""
+    await app.state.model_loader
+    await registry.watch(poll_interval=model_reload_config.get('poll_interval_seconds', 10.0))
+
+
+@app.on_event("shutdown")
+async def shutdown_executor():
+    """Release the scoring pool and persist the feature store"""
+    executor.shutdown(wait=False)
+    if feature_store:
+        feature_store.save_snapshot()
+
+
+def queue_full_error(error: ScoringQueueFull) -> HTTPException:
+    """503 response telling clients to back off while scoring is saturated."""
+    return HTTPException(status_code=503, detail=str(error), headers={"Retry-After": "1"})
+
+
 @app.post("/predict", response_model=PredictionResponse)
-async def predict_fraud(transaction: Transaction):
-    """Predict fraud for a single transaction"""
-    if not model or not preprocessor:
+async def predict_fraud(transaction: PredictRequest, request: Request):
+    """
+    Predict fraud for a single transaction.
+    
+    Given a customer_id, the velocity features are computed from the
+    customer's earlier transactions in the online feature store, and the
+    transaction is recorded there; otherwise the body must carry them.
+    """
+    observe_parsing(request)
+    bundle = registry.current
+    if not bundle:
         raise HTTPException(status_code=503, detail="Model not available")
     
+    record = transaction.model_dump()
+    if isinstance(transaction, CustomerTransaction):
+        if not feature_store:
+            raise HTTPException(
+                status_code=422,
+                detail="customer_id requires the online feature store; send the velocity features instead"
+            )
+        started = time.perf_counter()
+        record.update(feature_store.observe(
+            record['customer_id'],
+            amount=record['amount'],
+            latitude=record['latitude'],
+            longitude=record['longitude'],
+            transaction_id=record['transaction_id']
+        ))
+        observe_stage('feature_store', time.perf_counter() - started)
+    
     try:
-        # Convert to DataFrame
-        data = pd.DataFrame([transaction.dict()])
-        
-        # Add timestamp for feature engineering
-        data['timestamp'] = datetime.now()
+        cache_key = prediction_cache.make_key(record, bundle.version) if prediction_cache else None
+        cached = prediction_cache.get(cache_key) if prediction_cache else None
         
-        # Apply feature engineering (same as training)
-        # Amount features
-        data['amount_log'] = np.log1p(data['amount'])
-        data['amount_category'] = pd.cut(data['amount'], bins=[0, 50, 200, 1000, np.inf], 
-                                        labels=['very_low', 'low', 'medium', 'high']).astype(str)
-        data['amount_to_avg_ratio'] = data['amount'] / (data['avg_transaction_amount_30d'] + 1e-5)
+        if cached:
+            prediction, probability = cached
+        else:
+            if batcher:
+                prediction, probability = await batcher.submit(record)
+            else:
+                prediction, probability = raise_if_failed((await executor.score_records([record]))[0])
+            
+            if prediction_cache:
+                prediction_cache.put(cache_key, (prediction, probability))
         
-        # Temporal features
-        data['hour'] = data['timestamp'].dt.hour
-        data['day_of_week'] = data['timestamp'].dt.dayofweek
-        data['day_of_month'] = data['timestamp'].dt.day
-        data['is_weekend'] = (data['day_of_week'] >= 5).astype(int)
-        data['time_of_day'] = pd.cut(data['hour'], bins=[0, 6, 12, 18, 24], 
-                                     labels=['night', 'morning', 'afternoon', 'evening']).astype(str)
-        data['is_peak_hour'] = data['hour'].isin([8, 9, 10, 17, 18, 19]).astype(int)
+        count_predictions('/predict', 1)
+        return serialize_json({
+            "is_fraud": prediction,
+            "fraud_probability": probability,
+            "risk_level": get_risk_level(probability),
+            "timestamp": datetime.now().isoformat()
+        })
+    
+    except ScoringQueueFull as e:
+        raise queue_full_error(e)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Prediction error: {str(e)}")
+
+# Request body documentation for /predict_batch, which parses its own body
+PREDICT_BATCH_OPENAPI = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            "application/json": {
+                "schema": {"type": "array", "items": {"$ref": "#/components/schemas/Transaction"}}
+            },
+            ARROW_MEDIA_TYPE: {
+                "schema": {"type": "string", "format": "binary",
+                           "description": "Arrow IPC stream with one column per Transaction field"}
+            },
+            NPZ_MEDIA_TYPE: {
+                "schema": {"type": "string", "format": "binary",
+                           "description": "numpy .npz archive with one array per Transaction field"}
+            }
+        }
+    }
+}
+
+transaction_list_adapter = TypeAdapter(List[Transaction])
+transaction_constraints = column_constraints(Transaction)
+
+
+@app.post("/predict_batch", openapi_extra=PREDICT_BATCH_OPENAPI)
+async def predict_batch(request: Request):
+    """
+    Predict fraud for multiple transactions in a single vectorized model call.
+    
+    Accepts a JSON list of transactions, or a columnar body (Arrow IPC
+    stream or .npz archive) that is validated column by column and
+    answered in the same format.
+    """
+    if not registry.current:
+        raise HTTPException(status_code=503, detail="Model not available")
+    
+    media_type = request.headers.get('content-type', 'application/json').split(';')[0].strip()
+    if media_type in COLUMNAR_MEDIA_TYPES:
+        return await predict_batch_columnar(request, media_type)
+    
+    try:
+        transactions = transaction_list_adapter.validate_json(await request.body())
+    except ValidationError as e:
+        raise RequestValidationError(e.errors(include_url=False))
+    observe_parsing(request)
+    
+    timestamp = datetime.now().isoformat()
+    results = []
+    
+    if transactions:
+        records = [transaction.model_dump() for transaction in transactions]
+        scored = [None] * len(records)
         
-        # Velocity features
-        data['is_high_frequency_24h'] = (data['num_transactions_24h'] > 5).astype(int)
-        data['is_high_frequency_7d'] = (data['num_transactions_7d'] > 20).astype(int)
-        data['time_since_last_cat'] = pd.cut(data['time_since_last_transaction'], 
-                                             bins=[0, 10, 60, 300, np.inf],
-                                             labels=['recent', 'normal', 'long_gap', 'very_long']).astype(str)
+        # Answer cached items directly and score only the misses
+        if prediction_cache:
+            version = registry.current.version
+            keys = [prediction_cache.make_key(record, version) for record in records]
+            scored = [prediction_cache.get(key) for key in keys]
         
-        # Distance features
-        data['distance_home_cat'] = pd.cut(data['distance_from_home'], 
-                                           bins=[0, 10, 50, 200, np.inf],
-                                           labels=['very_close', 'close', 'medium', 'far']).astype(str)
-        data['is_far_from_home'] = (data['distance_from_home'] > 100).astype(int)
-        data['is_far_from_last'] = (data['distance_from_last_transaction'] > 50).astype(int)
+        misses = [i for i, result in enumerate(scored) if result is None]
+        if misses:
+            try:
+                fresh = await executor.score_records([records[i] for i in misses])
+            except ScoringQueueFull as e:
+                raise queue_full_error(e)
+            
+            for i, result in zip(misses, fresh):
+                scored[i] = result
+                if prediction_cache and not isinstance(result, Exception):
+                    prediction_cache.put(keys[i], result)
         
-        # Risk score (simplified version)
-        data['risk_score'] = (
-            (data['amount'] > 1000).astype(int) * 2 +
-            (data['card_present'] == 0).astype(int) +
-            (data['distance_from_home'] > 100).astype(int) +
-            (data['num_transactions_24h'] > 5).astype(int)
+        for result in scored:
+            if isinstance(result, Exception):
+                results.append({"error": str(result)})
+                continue
+            
+            prediction, probability = result
+            results.append({
+                "is_fraud": prediction,
+                "fraud_probability": probability,
+                "risk_level": get_risk_level(probability),
+                "timestamp": timestamp
+            })
+    
+    count_predictions('/predict_batch', len(results), sum(1 for result in results if "error" in result))
+    return serialize_json({
+        "predictions": results,
+        "total": len(transactions),
+        "timestamp": timestamp
+    })
+
+
+async def predict_batch_columnar(request: Request, media_type: str) -> Response:
+    """Score a columnar batch without creating per-row objects."""
+    try:
+        columns, errors = validate_columns(
+            decode_columns(await request.body(), media_type), transaction_constraints
         )
+    except ColumnarFormatError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    observe_parsing(request)
+    
+    n_rows = len(errors)
+    predictions = np.zeros(n_rows, dtype=np.int64)
+    probabilities = np.full(n_rows, np.nan)
+    valid = errors == ''
+    
+    if valid.any():
+        try:
+            valid_predictions, valid_probabilities = await executor.score_columns(
+                {name: values[valid] for name, values in columns.items()}
+            )
+        except ScoringQueueFull as e:
+            raise queue_full_error(e)
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Prediction error: {str(e)}")
         
-        # Drop timestamp before preprocessing
-        data = data.drop(columns=['timestamp'])
-        
-        # Apply preprocessor components (loaded as dict)
-        df_processed = data.copy()
-        
-        # Encode categorical features
-        for col, encoder in preprocessor['label_encoders'].items():
-            if col in df_processed.columns:
-                df_processed[col] = df_processed[col].astype(str).apply(
-                    lambda x: encoder.transform([x])[0] if x in encoder.classes_ else -1
-                )
-        
-        # Drop unnecessary columns
-        cols_to_drop = [col for col in preprocessor['features_to_drop'] if col in df_processed.columns]
-        df_processed = df_processed.drop(columns=cols_to_drop, errors='ignore')
+        predictions[valid] = valid_predictions
+        probabilities[valid] = valid_probabilities
+        errors[valid & ~np.isfinite(probabilities)] = "Model returned a non-finite probability"
+    
+    n_errors = int((errors != '').sum())
+    count_predictions('/predict_batch', n_rows, n_errors)
+    
+    started = time.perf_counter()
+    content = encode_results(predictions, probabilities, errors, media_type)
+    observe_stage('serialization', time.perf_counter() - started)
+    
+    return Response(
+        content=content,
+        media_type=media_type,
+        headers={"X-Total": str(n_rows), "X-Errors": str(n_errors)}
+    )
+
+
+class NDJSONStreamingResponse(StreamingResponse):
+    """
+    Streaming response that leaves the request body to the generator.
+    
+    StreamingResponse normally listens for client disconnects on receive(),
+    which would compete with the generator for request body chunks. Here a
+    disconnect surfaces through request.stream() instead.
+    """
+    
+    media_type = "application/x-ndjson"
+    
+    async def __call__(self, scope, receive, send) -> None:
+        await self.stream_response(send)
+        if self.background is not None:
+            await self.background()
+
+
+async def score_stream_chunk(chunk: List[Tuple[int, Any]]) -> bytes:
+    """Score one chunk of parsed NDJSON lines and serialize the results."""
+    records = [item for _, item in chunk if isinstance(item, dict)]
+    
+    # Wait for pool capacity instead of failing a stream that has already started
+    while True:
+        try:
+            scored = iter(await executor.score_records(records)) if records else iter(())
+            break
+        except ScoringQueueFull:
+            await asyncio.sleep(0.05)
+    
+    started = time.perf_counter()
+    timestamp = datetime.now().isoformat()
+    lines = []
+    errors = 0
+    for line_number, item in chunk:
+        result = next(scored) if isinstance(item, dict) else item
+        if isinstance(result, Exception):
+            errors += 1
+            lines.append(json.dumps({"line": line_number, "error": str(result)}))
+            continue
         
-        # Scale numeric features
-        numeric_cols = preprocessor['numeric_features']
-        available_numeric = [col for col in numeric_cols if col in df_processed.columns]
-        df_processed[available_numeric] = preprocessor['scaler'].transform(df_processed[available_numeric])
+        prediction, probability = result
+        lines.append(json.dumps({
+            "line": line_number,
+            "is_fraud": prediction,
+            "fraud_probability": probability,
+            "risk_level": get_risk_level(probability),
+            "timestamp": timestamp
+        }))
+    
+    body = ("\n".join(lines) + "\n").encode()
+    observe_stage('serialization', time.perf_counter() - started)
+    count_predictions('/predict_stream', len(chunk), errors)
+    return body
+
+
+async def stream_predictions(request: Request) -> AsyncIterator[bytes]:
+    """Read NDJSON transactions incrementally and yield results chunk by chunk."""
+    chunk_size = streaming_config.get('chunk_size', 1000)
+    max_line_bytes = streaming_config.get('max_line_bytes', 65536)
+    
+    pending = b""
+    discarding = False
+    chunk: List[Tuple[int, Any]] = []
+    line_number = 0
+    oversized = ValueError(f"Line exceeds {max_line_bytes} bytes")
+    parse_seconds = 0.0
+    
+    def parse(line: bytes) -> Any:
+        nonlocal parse_seconds
+        if len(line) > max_line_bytes:
+            return oversized
+        started = time.perf_counter()
+        try:
+            return Transaction.model_validate_json(line).model_dump()
+        except ValidationError as e:
+            return ValueError(str(e))
+        finally:
+            parse_seconds += time.perf_counter() - started
+    
+    async def flush(chunk: List[Tuple[int, Any]]) -> bytes:
+        nonlocal parse_seconds
+        observe_stage('parsing', parse_seconds)
+        parse_seconds = 0.0
+        return await score_stream_chunk(chunk)
+    
+    async for piece in request.stream():
+        pending += piece
+        *lines, pending = pending.split(b"\n")
         
-        # Make prediction
-        prediction = model.predict(df_processed)[0]
-        probability = model.predict_proba(df_processed)[0][1]
+        if discarding and lines:
+            # The first complete line is the tail of an oversized one
+            line_number += 1
+            chunk.append((line_number, oversized))
+            lines = lines[1:]
+            discarding = False
         
-        # Determine risk level
-        if probability >= 0.7:
-            risk_level = "HIGH"
-        elif probability >= 0.4:
-            risk_level = "MEDIUM"
-        else:
-            risk_level = "LOW"
+        for line in lines:
+            if not line.strip():
+                continue
+            line_number += 1
+            chunk.append((line_number, parse(line)))
+            
+            if len(chunk) >= chunk_size:
+                yield await flush(chunk)
+                chunk = []
         
-        return PredictionResponse(
-            is_fraud=int(prediction),
-            fraud_probability=float(probability),
-            risk_level=risk_level,
-            timestamp=datetime.now().isoformat()
-        )
+        # Never buffer more than one maximum-length line
+        if len(pending) > max_line_bytes:
+            pending = b""
+            discarding = True
     
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Prediction error: {str(e)}")
+    if discarding:
+        line_number += 1
+        chunk.append((line_number, oversized))
+    elif pending.strip():
+        line_number += 1
+        chunk.append((line_number, parse(pending)))
+    if chunk:
+        yield await flush(chunk)
 
-@app.post("/predict_batch")
-async def predict_batch(transactions: List[Transaction]):
-    """Predict fraud for multiple transactions"""
-    if not model:
-        raise HTTPException(status_code=503, detail="Model not available")
+
+@app.post("/predict_stream")
+async def predict_stream(request: Request):
+    """
+    Score a (chunked) NDJSON body of transactions and stream NDJSON results.
     
-    results = []
-    for transaction in transactions:
-        try:
-            result = await predict_fraud(transaction)
-            results.append(result)
-        except Exception as e:
-            results.append({"error": str(e)})
+    Lines are validated and scored in fixed-size chunks as they arrive, and
+    each chunk's results are written out before more input is read, so
+    memory stays constant regardless of request size. Results carry the
+    1-based input line number; invalid lines produce an error record.
+    """
+    if not registry.current:
+        raise HTTPException(status_code=503, detail="Model not available")
     
-    return {
-        "predictions": results,
-        "total": len(transactions),
-        "timestamp": datetime.now().isoformat()
-    }
+    return NDJSONStreamingResponse(stream_predictions(request))
+
+
+# Registered last so every route above gets its own endpoint label
+app.add_middleware(MetricsMiddleware, metrics=metrics, endpoints=[route.path for route in app.routes])
+
 
 if __name__ == "__main__":
+    import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
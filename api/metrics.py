@@ -0,0 +1,193 @@
+"""
+Low-overhead metrics for the fraud detection API.
+Fixed-bucket histograms and counters rendered in the Prometheus text
+exposition format, plus a pure ASGI middleware for request counters.
+"""
+
+import bisect
+import math
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+# Latency buckets in seconds (50us .. 5s)
+LATENCY_BUCKETS = (
+    0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005,
+    0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0
+)
+
+LabelSet = Tuple[Tuple[str, str], ...]
+
+
+class Histogram:
+    """Fixed-bucket histogram; observe() is a bisect plus two additions."""
+
+    def __init__(self, buckets: Iterable[float] = LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        """Record one observation."""
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class MetricsRegistry:
+    """Collection of labelled counters, gauges and histograms."""
+
+    def __init__(self, prefix: str = 'fraud_api'):
+        """
+        Initialize metrics registry.
+
+        Args:
+            prefix: Prefix added to every metric name
+        """
+        self.prefix = prefix
+        self._lock = threading.Lock()
+        self._counters: Dict[str, Dict[LabelSet, float]] = {}
+        self._histograms: Dict[str, Dict[LabelSet, Histogram]] = {}
+        self._help: Dict[str, str] = {}
+
+    def describe(self, name: str, help_text: str) -> None:
+        """Set the HELP text of a metric."""
+        self._help[f"{self.prefix}_{name}"] = help_text
+
+    def inc(self, name: str, value: float = 1.0, **labels: str) -> None:
+        """Increment a counter."""
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._counters.setdefault(f"{self.prefix}_{name}", {})
+            series[key] = series.get(key, 0.0) + value
+
+    def observe(self, name: str, value: float, **labels: str) -> None:
+        """Record a histogram observation."""
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._histograms.setdefault(f"{self.prefix}_{name}", {})
+            histogram = series.get(key)
+            if histogram is None:
+                histogram = series[key] = Histogram()
+            histogram.observe(value)
+
+    @staticmethod
+    def _format_labels(labels: Iterable[Tuple[str, Any]]) -> str:
+        """Render a label set as {k="v",...}."""
+        pairs = []
+        for key, value in labels:
+            escaped = str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+            pairs.append(f'{key}="{escaped}"')
+        return '{' + ','.join(pairs) + '}' if pairs else ''
+
+    @staticmethod
+    def _format_value(value: float) -> str:
+        """Render a sample value without losing precision."""
+        value = float(value)
+        if math.isnan(value):
+            return 'NaN'
+        if math.isinf(value):
+            return '+Inf' if value > 0 else '-Inf'
+        return str(int(value)) if value.is_integer() else repr(value)
+
+    def render(
+        self,
+        gauges: Optional[Dict[str, List[Tuple[Dict[str, str], float]]]] = None,
+        counters: Optional[Dict[str, List[Tuple[Dict[str, str], float]]]] = None
+    ) -> str:
+        """
+        Render all metrics in the Prometheus text format.
+
+        Args:
+            gauges: Point-in-time values computed by the caller, as
+                {name: [(labels, value), ...]}
+            counters: Cumulative values kept elsewhere (e.g. executor
+                stats), in the same shape as gauges
+
+        Returns:
+            Exposition text
+        """
+        lines = []
+
+        def header(name: str, kind: str) -> None:
+            if name in self._help:
+                lines.append(f"# HELP {name} {self._help[name]}")
+            lines.append(f"# TYPE {name} {kind}")
+
+        with self._lock:
+            for name, series in sorted(self._counters.items()):
+                header(name, 'counter')
+                for labels, value in sorted(series.items()):
+                    lines.append(f"{name}{self._format_labels(labels)} {self._format_value(value)}")
+
+            for name, series in sorted(self._histograms.items()):
+                header(name, 'histogram')
+                for labels, histogram in sorted(series.items()):
+                    cumulative = 0
+                    for upper, count in zip(histogram.buckets, histogram.counts):
+                        cumulative += count
+                        bucket_labels = labels + (('le', f"{upper:g}"),)
+                        lines.append(f"{name}_bucket{self._format_labels(bucket_labels)} {cumulative}")
+                    inf_labels = labels + (('le', '+Inf'),)
+                    lines.append(f"{name}_bucket{self._format_labels(inf_labels)} {histogram.count}")
+                    lines.append(f"{name}_sum{self._format_labels(labels)} {self._format_value(histogram.sum)}")
+                    lines.append(f"{name}_count{self._format_labels(labels)} {histogram.count}")
+
+        for kind, external in (('counter', counters), ('gauge', gauges)):
+            for name, samples in sorted((external or {}).items()):
+                full_name = f"{self.prefix}_{name}"
+                header(full_name, kind)
+                for labels, value in samples:
+                    label_text = self._format_labels(sorted(labels.items()))
+                    lines.append(f"{full_name}{label_text} {self._format_value(value)}")
+
+        return '\n'.join(lines) + '\n'
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware counting requests and timing them per endpoint.
+
+    It also stamps scope['state']['received_at'] so handlers can measure
+    how long request parsing took before they were invoked.
+    """
+
+    def __init__(self, app, metrics: MetricsRegistry, endpoints: Optional[Iterable[str]] = None):
+        """
+        Initialize middleware.
+
+        Args:
+            app: Wrapped ASGI application
+            metrics: Registry to record into
+            endpoints: Paths to label individually (others are 'other')
+        """
+        self.app = app
+        self.metrics = metrics
+        self.endpoints = set(endpoints) if endpoints is not None else None
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        received_at = time.perf_counter()
+        scope.setdefault('state', {})['received_at'] = received_at
+
+        path = scope.get('path', '')
+        endpoint = path if self.endpoints is None or path in self.endpoints else 'other'
+        status = [500]
+
+        async def send_wrapper(message) -> None:
+            if message['type'] == 'http.response.start':
+                status[0] = message['status']
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            code = str(status[0])
+            self.metrics.inc('requests_total', endpoint=endpoint, status=code)
+            if status[0] >= 400:
+                self.metrics.inc('request_errors_total', endpoint=endpoint, status=code)
+            self.metrics.observe('request_seconds', time.perf_counter() - received_at, endpoint=endpoint)
@@ -0,0 +1,176 @@
+"""
+Adaptive micro-batching for concurrent /predict requests.
+Coalesces requests that arrive within a short window into one vectorized
+scoring call and resolves each caller's future with its own result.
+"""
+
+import asyncio
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Set, Tuple
+
+# Upper bounds of the batch-size histogram buckets
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256, 512)
+
+
+class MicroBatcher:
+    """Coalesce single-item scoring requests into vectorized batches."""
+
+    def __init__(
+        self,
+        score_fn: Callable[[List[Any]], Awaitable[List[Any]]],
+        max_batch_size: int = 64,
+        max_wait_ms: float = 2.0,
+        ewma_alpha: float = 0.2
+    ):
+        """
+        Initialize micro-batcher.
+
+        Args:
+            score_fn: Async callable scoring a list of items, returning one
+                result per item (an Exception instance marks a failed item)
+            max_batch_size: Flush as soon as this many items are queued
+            max_wait_ms: Longest time the first queued item may wait
+            ewma_alpha: Smoothing factor for the observed inter-arrival time
+        """
+        self.score_fn = score_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self.ewma_alpha = ewma_alpha
+
+        self._queue: Deque[Tuple[Any, asyncio.Future, float]] = deque()
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._tasks: Set[asyncio.Task] = set()
+        # Smoothed seconds between submissions; gaps are capped so one idle
+        # period does not hide a burst that follows it
+        self._gap_ewma = float('inf')
+        self._gap_cap = 2 * max_wait_ms / 1000.0
+        self._last_arrival: Optional[float] = None
+
+        # Metrics
+        self.batches_total = 0
+        self.items_total = 0
+        self.max_batch_seen = 0
+        self.queue_wait_sum = 0.0
+        self.queue_wait_max = 0.0
+        self.batch_size_counts = [0] * (len(BATCH_SIZE_BUCKETS) + 1)
+
+    def current_wait_ms(self) -> float:
+        """
+        Current coalescing window.
+
+        The window follows the measured arrival rate: when requests are
+        further apart than max_wait_ms, waiting would not gather a second
+        one, so they are flushed immediately; under steady load the window
+        is the time expected to fill a batch, capped at max_wait_ms.
+        """
+        gap_ms = 1000.0 * self._gap_ewma
+        if gap_ms >= self.max_wait_ms:
+            return 0.0
+        return min(self.max_wait_ms, gap_ms * (self.max_batch_size - 1))
+
+    async def submit(self, item: Any) -> Any:
+        """
+        Queue an item and wait for its result.
+
+        Args:
+            item: Item to score
+
+        Returns:
+            Result produced by score_fn for this item
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        now = time.perf_counter()
+        if self._last_arrival is not None:
+            gap = min(now - self._last_arrival, self._gap_cap)
+            if self._gap_ewma == float('inf'):
+                self._gap_ewma = gap
+            else:
+                self._gap_ewma += self.ewma_alpha * (gap - self._gap_ewma)
+        self._last_arrival = now
+        self._queue.append((item, future, now))
+
+        if len(self._queue) >= self.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.current_wait_ms() / 1000.0, self._flush)
+
+        return await future
+
+    def _flush(self) -> None:
+        """Take up to max_batch_size queued items and dispatch them."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        if not self._queue:
+            return
+
+        size = min(len(self._queue), self.max_batch_size)
+        batch = [self._queue.popleft() for _ in range(size)]
+        self._record_batch(batch)
+        task = asyncio.ensure_future(self._run(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+        # Items left over start a new window
+        if self._queue:
+            loop = asyncio.get_running_loop()
+            self._timer = loop.call_later(self.current_wait_ms() / 1000.0, self._flush)
+
+    async def _run(self, batch: List[Tuple[Any, asyncio.Future, float]]) -> None:
+        """Score a batch and resolve every caller's future."""
+        items = [item for item, _, _ in batch]
+        try:
+            results = await self.score_fn(items)
+        except Exception as e:
+            results = [e] * len(batch)
+
+        for (_, future, _), result in zip(batch, results):
+            if future.done():
+                continue
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+    def _record_batch(self, batch: List[Tuple[Any, asyncio.Future, float]]) -> None:
+        """Update batch-size and queue-wait metrics."""
+        now = time.perf_counter()
+        size = len(batch)
+
+        self.batches_total += 1
+        self.items_total += size
+        self.max_batch_seen = max(self.max_batch_seen, size)
+
+        bucket = len(BATCH_SIZE_BUCKETS)
+        for i, upper in enumerate(BATCH_SIZE_BUCKETS):
+            if size <= upper:
+                bucket = i
+                break
+        self.batch_size_counts[bucket] += 1
+
+        for _, _, enqueued_at in batch:
+            wait = now - enqueued_at
+            self.queue_wait_sum += wait
+            if wait > self.queue_wait_max:
+                self.queue_wait_max = wait
+
+    def stats(self) -> Dict[str, Any]:
+        """Batch-size and queue-wait metrics."""
+        labels = [f"<={upper}" for upper in BATCH_SIZE_BUCKETS] + [f">{BATCH_SIZE_BUCKETS[-1]}"]
+        return {
+            'batches_total': self.batches_total,
+            'items_total': self.items_total,
+            'avg_batch_size': self.items_total / self.batches_total if self.batches_total else 0.0,
+            'max_batch_size_seen': self.max_batch_seen,
+            'batch_size_histogram': dict(zip(labels, self.batch_size_counts)),
+            'avg_queue_wait_ms': 1000.0 * self.queue_wait_sum / self.items_total if self.items_total else 0.0,
+            'max_queue_wait_ms': 1000.0 * self.queue_wait_max,
+            'queue_depth': len(self._queue),
+            'current_wait_ms': self.current_wait_ms(),
+            'arrival_gap_ms': 1000.0 * self._gap_ewma if self._gap_ewma != float('inf') else None,
+            'max_batch_size': self.max_batch_size,
+            'max_wait_ms': self.max_wait_ms
+        }
@@ -0,0 +1,240 @@
+"""
+Model registry for the fraud detection API.
+Loads versioned model/preprocessor bundles, warms them up and swaps them
+in atomically so in-flight requests finish on the version they started with.
+"""
+
+import asyncio
+import hashlib
+import pickle
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from src.features.preprocessor_artifact import PreprocessorArtifact
+
+from .inference_plan import InferencePlan
+
+# Synthetic transactions used to warm a freshly loaded bundle
+WARMUP_RECORDS = [
+    {
+        'amount': amount, 'merchant_category': category, 'card_present': card_present,
+        'transaction_type': 'purchase', 'distance_from_home': distance,
+        'distance_from_last_transaction': 5.0, 'time_since_last_transaction': 30.0,
+        'customer_age': 40, 'customer_tenure_days': 900,
+        'avg_transaction_amount_30d': 80.0, 'num_transactions_24h': 2, 'num_transactions_7d': 12
+    }
+    for amount, category, card_present, distance in [
+        (25.0, 'food', 1, 3.0),
+        (480.0, 'online', 0, 150.0),
+        (2500.0, 'travel', 0, 900.0),
+        (120.0, 'retail', 1, 20.0)
+    ]
+]
+
+
+class ModelBundle:
+    """An immutable, versioned model/preprocessor pair with its compiled plan."""
+
+    def __init__(
+        self,
+        model: Any,
+        preprocessor: PreprocessorArtifact,
+        plan: InferencePlan,
+        version: str,
+        model_path: Path,
+        preprocessor_path: Path,
+        load_timings: Dict[str, float]
+    ):
+        self.model = model
+        self.preprocessor = preprocessor
+        self.plan = plan
+        self.version = version
+        self.model_path = model_path
+        self.preprocessor_path = preprocessor_path
+        self.load_timings = load_timings
+        self.load_seconds = sum(load_timings.values())
+        self.loaded_at = datetime.now().isoformat()
+
+    def info(self) -> Dict[str, Any]:
+        """Describe the bundle for /model_info."""
+        return {
+            'model_type': type(self.model).__name__,
+            'version': self.version,
+            'loaded_at': self.loaded_at,
+            'load_seconds': round(self.load_seconds, 4),
+            'load_timings': {stage: round(seconds, 4) for stage, seconds in self.load_timings.items()},
+            'model_path': str(self.model_path),
+            'preprocessor_path': str(self.preprocessor_path),
+            'n_features': self.plan.n_features
+        }
+
+
+class ModelRegistry:
+    """Hold the active model bundle and hot-reload it from disk."""
+
+    def __init__(self, model_path: Path, preprocessor_path: Path):
+        """
+        Initialize registry.
+
+        Args:
+            model_path: Path to the pickled model
+            preprocessor_path: Path to the preprocessor artifact; a legacy
+                pickle with the same stem is used while the artifact is missing
+        """
+        self.model_path = Path(model_path)
+        self.artifact_preprocessor_path = Path(preprocessor_path)
+        self.preprocessor_path = self.resolve_preprocessor_path()
+
+        self._bundle: Optional[ModelBundle] = None
+        self._reload_lock = threading.Lock()
+        self._listeners: List[Callable[[ModelBundle], None]] = []
+        self._loaded_mtimes: Optional[Tuple[str, float, float]] = None
+        self._failed_mtimes: Optional[Tuple[str, float, float]] = None
+
+        self.reload_count = 0
+        self.last_error: Optional[str] = None
+
+    @property
+    def current(self) -> Optional[ModelBundle]:
+        """Active bundle. Callers should read it once per request."""
+        return self._bundle
+
+    def add_listener(self, callback: Callable[[ModelBundle], None]) -> None:
+        """Register a callback invoked after every successful swap."""
+        self._listeners.append(callback)
+
+    def resolve_preprocessor_path(self) -> Path:
+        """
+        Preprocessor file to load now.
+
+        Resolved on every check rather than once at startup, so a training
+        run that writes the first .prep artifact next to a legacy pickle is
+        picked up together with its model.
+        """
+        if self.artifact_preprocessor_path.exists():
+            return self.artifact_preprocessor_path
+        return self.artifact_preprocessor_path.with_suffix('.pkl')
+
+    def _artifact_mtimes(self) -> Tuple[str, float, float]:
+        """Resolved preprocessor path and modification times of the model and preprocessor."""
+        preprocessor_path = self.resolve_preprocessor_path()
+        return str(preprocessor_path), self.model_path.stat().st_mtime, preprocessor_path.stat().st_mtime
+
+    def load_bundle(self, preprocessor_path: Optional[Path] = None) -> ModelBundle:
+        """
+        Load, compile and warm up a bundle from the artifact paths.
+
+        Each step is timed so slow startups can be attributed.
+
+        Args:
+            preprocessor_path: Preprocessor file (resolved now by default)
+
+        Returns:
+            New ModelBundle (not yet active)
+        """
+        preprocessor_path = Path(preprocessor_path or self.resolve_preprocessor_path())
+        timings: Dict[str, float] = {}
+        start = time.perf_counter()
+
+        def lap(stage: str) -> None:
+            nonlocal start
+            now = time.perf_counter()
+            timings[stage] = now - start
+            start = now
+
+        model_bytes = self.model_path.read_bytes()
+        preprocessor_bytes = preprocessor_path.read_bytes()
+        version = hashlib.sha256(model_bytes + preprocessor_bytes).hexdigest()[:12]
+        lap('read')
+
+        model = pickle.loads(model_bytes)
+        preprocessor = PreprocessorArtifact.from_bytes(preprocessor_bytes)
+        lap('unpickle')
+
+        plan = InferencePlan(model, preprocessor)
+        lap('compile')
+
+        # Warm up so the first real request does not pay lazy-initialization costs
+        for result in plan.score_records(WARMUP_RECORDS):
+            if isinstance(result, Exception):
+                raise RuntimeError(f"Warmup scoring failed: {result}")
+        lap('warmup')
+
+        return ModelBundle(
+            model, preprocessor, plan, version,
+            self.model_path, preprocessor_path, timings
+        )
+
+    def reload(self) -> ModelBundle:
+        """
+        Load a new bundle and atomically make it the active one.
+
+        The previous bundle stays intact, so requests that already hold a
+        reference to it complete on the old version.
+
+        Returns:
+            The newly active bundle
+        """
+        with self._reload_lock:
+            mtimes = self._artifact_mtimes()
+            try:
+                bundle = self.load_bundle(Path(mtimes[0]))
+            except Exception as e:
+                self.last_error = str(e)
+                self._failed_mtimes = mtimes
+                raise
+
+            self._bundle = bundle
+            self._loaded_mtimes = mtimes
+            self.preprocessor_path = bundle.preprocessor_path
+            self.reload_count += 1
+            self.last_error = None
+
+        for callback in self._listeners:
+            callback(bundle)
+
+        print(f"✅ Model version {bundle.version} active (loaded in {bundle.load_seconds:.3f}s)")
+        return bundle
+
+    async def reload_async(self) -> ModelBundle:
+        """Reload on a background thread without blocking the event loop."""
+        return await asyncio.to_thread(self.reload)
+
+    def artifacts_changed(self) -> bool:
+        """Whether the artifacts on disk differ from the loaded (or last failed) ones."""
+        try:
+            mtimes = self._artifact_mtimes()
+        except FileNotFoundError:
+            return False
+        return mtimes != self._loaded_mtimes and mtimes != self._failed_mtimes
+
+    async def watch(self, poll_interval: float = 10.0) -> None:
+        """
+        Poll artifact modification times and reload when they change.
+
+        Args:
+            poll_interval: Seconds between checks
+        """
+        while True:
+            await asyncio.sleep(poll_interval)
+            if not self.artifacts_changed():
+                continue
+
+            # Let a writer finish before reading the new files; a file that
+            # disappears mid-deploy is picked up on a later poll
+            try:
+                mtimes = self._artifact_mtimes()
+                await asyncio.sleep(min(1.0, poll_interval))
+                if self._artifact_mtimes() != mtimes:
+                    continue
+            except FileNotFoundError:
+                continue
+
+            try:
+                await self.reload_async()
+            except Exception as e:
+                print(f"⚠️  Model reload failed, keeping version "
+                      f"{self._bundle.version if self._bundle else None}: {e}")
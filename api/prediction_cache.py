@@ -0,0 +1,143 @@
+"""
+Idempotent prediction cache for the fraud detection API.
+Serves retried and duplicate transactions from memory with LRU eviction,
+a TTL, a memory cap and hit/miss counters.
+"""
+
+import hashlib
+import struct
+import sys
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, Iterable, Mapping, Optional, Tuple
+
+# Approximate per-entry overhead of the OrderedDict node and value tuple
+ENTRY_OVERHEAD_BYTES = 200
+
+
+class PredictionCache:
+    """LRU/TTL cache of (prediction, probability) keyed by transaction and model version."""
+
+    def __init__(
+        self,
+        fields: Iterable[str],
+        max_entries: int = 100000,
+        max_memory_mb: float = 64.0,
+        ttl_seconds: float = 300.0
+    ):
+        """
+        Initialize prediction cache.
+
+        Args:
+            fields: Transaction fields that make up the cache key, in order
+            max_entries: Maximum number of cached predictions
+            max_memory_mb: Approximate memory cap for cached entries
+            ttl_seconds: Seconds a cached prediction stays valid
+        """
+        self.fields = list(fields)
+        self.max_entries = max_entries
+        self.max_bytes = int(max_memory_mb * 1024 * 1024)
+        self.ttl_seconds = ttl_seconds
+
+        self._entries: 'OrderedDict[bytes, Tuple[Tuple[int, float], float]]' = OrderedDict()
+        self._lock = threading.Lock()
+        self._entry_bytes = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def make_key(self, record: Mapping[str, Any], version: str, timestamp: Optional[datetime] = None) -> bytes:
+        """
+        Stable hash of the transaction fields, the model version and the
+        scoring time parts the feature pipeline reads.
+
+        Numbers are packed as float64 so 10 and 10.0 hash the same, as they
+        do after Pydantic validation. Temporal features come from the hour,
+        weekday and day of month of the scoring time (defaults to now), so a
+        result cached in one hour is not served in the next.
+        """
+        timestamp = timestamp or datetime.now()
+        digest = hashlib.blake2b(version.encode(), digest_size=16)
+        digest.update(struct.pack('<BBB', timestamp.hour, timestamp.weekday(), timestamp.day))
+        for field in self.fields:
+            value = record[field]
+            if isinstance(value, str):
+                encoded = value.encode()
+                digest.update(b's' + struct.pack('<I', len(encoded)) + encoded)
+            else:
+                digest.update(b'f' + struct.pack('<d', float(value)))
+        return digest.digest()
+
+    def get(self, key: bytes) -> Optional[Tuple[int, float]]:
+        """Cached result for a key, or None on a miss or expired entry."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            value, expires_at = entry
+            if expires_at < time.monotonic():
+                self._remove(key)
+                self.expirations += 1
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: bytes, value: Tuple[int, float]) -> None:
+        """Cache a result, evicting least recently used entries over the caps."""
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+            self._entries[key] = (value, time.monotonic() + self.ttl_seconds)
+            self._entry_bytes += self._size_of(key)
+
+            while self._entries and (
+                len(self._entries) > self.max_entries or self._entry_bytes > self.max_bytes
+            ):
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        """Drop every entry (e.g. after a model or preprocessor change)."""
+        with self._lock:
+            self._entries.clear()
+            self._entry_bytes = 0
+            self.invalidations += 1
+
+    def _remove(self, key: bytes) -> None:
+        """Remove an entry and release its accounted size."""
+        del self._entries[key]
+        self._entry_bytes -= self._size_of(key)
+
+    @staticmethod
+    def _size_of(key: bytes) -> int:
+        """Approximate memory footprint of one entry."""
+        return sys.getsizeof(key) + ENTRY_OVERHEAD_BYTES
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and occupancy."""
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'approx_memory_bytes': self._entry_bytes,
+            'max_entries': self.max_entries,
+            'max_memory_bytes': self.max_bytes,
+            'ttl_seconds': self.ttl_seconds,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'evictions': self.evictions,
+            'expirations': self.expirations,
+            'invalidations': self.invalidations
+        }
@@ -0,0 +1,179 @@
+"""
+Executor pool for CPU-bound scoring.
+Runs inference off the FastAPI event loop on a sized thread or process
+pool and rejects work once the pool's queue is saturated.
+"""
+
+import asyncio
+import functools
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple
+
+import numpy as np
+
+from .inference_plan import InferencePlan
+
+# Plan loaded inside each process-pool worker
+_worker_plan: Optional[InferencePlan] = None
+
+
+def _init_worker(model_path: str, preprocessor_path: str) -> None:
+    """Load the artifacts once per process-pool worker."""
+    global _worker_plan
+    _worker_plan = InferencePlan.from_files(model_path, preprocessor_path)
+
+
+def _score_in_worker(records: List[Mapping[str, Any]]) -> Tuple[List[Any], Dict[str, float]]:
+    """Score records with the worker's own plan, returning stage timings too."""
+    timings: Dict[str, float] = {}
+    return _worker_plan.score_records(records, timings=timings), timings
+
+
+def _score_columns_in_worker(columns: Mapping[str, Any]) -> Tuple[Tuple[np.ndarray, np.ndarray], Dict[str, float]]:
+    """Score column arrays with the worker's own plan, returning stage timings too."""
+    timings: Dict[str, float] = {}
+    return _worker_plan.score_batch(columns, timings=timings), timings
+
+
+class ScoringQueueFull(Exception):
+    """Raised when the scoring pool has no free queue capacity."""
+
+
+class ScoringExecutor:
+    """Bounded thread or process pool for model inference."""
+
+    def __init__(
+        self,
+        plan_provider: Callable[[], Optional[InferencePlan]],
+        kind: str = 'thread',
+        max_workers: int = 1,
+        max_queue: int = 256,
+        model_path: Optional[str] = None,
+        preprocessor_path: Optional[str] = None,
+        stage_observer: Optional[Callable[[Dict[str, float]], None]] = None
+    ):
+        """
+        Initialize scoring executor.
+
+        Args:
+            plan_provider: Returns the current plan (thread pools score with it)
+            kind: 'thread' or 'process'
+            max_workers: Number of pool workers
+            max_queue: Maximum jobs in flight (running plus waiting)
+            model_path: Model artifact loaded by process-pool workers
+            preprocessor_path: Preprocessor artifact loaded by process-pool workers
+            stage_observer: Called with the per-stage seconds of every scoring job
+        """
+        if kind not in ('thread', 'process'):
+            raise ValueError(f"Unknown executor kind: {kind}")
+
+        self.plan_provider = plan_provider
+        self.kind = kind
+        self.max_workers = max(1, int(max_workers))
+        self.max_queue = max(1, int(max_queue))
+        self.model_path = model_path
+        self.preprocessor_path = preprocessor_path
+        self.stage_observer = stage_observer
+
+        self.pending = 0
+        self.rejected_total = 0
+        self.completed_total = 0
+
+        self._pool = self._create_pool()
+
+    def _create_pool(self) -> Executor:
+        """Create the underlying pool."""
+        if self.kind == 'process':
+            return ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                initializer=_init_worker,
+                initargs=(str(self.model_path), str(self.preprocessor_path))
+            )
+        return ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='scoring')
+
+    def is_saturated(self) -> bool:
+        """Whether new work would be rejected."""
+        return self.pending >= self.max_queue
+
+    async def _run(self, plan_method: str, worker_fn: Callable[[Any], Any], payload: Any) -> Any:
+        """
+        Run a plan method on the pool.
+
+        Raises:
+            ScoringQueueFull: If max_queue jobs are already in flight
+        """
+        if self.is_saturated():
+            self.rejected_total += 1
+            raise ScoringQueueFull(f"Scoring queue is full ({self.pending} jobs in flight)")
+
+        loop = asyncio.get_running_loop()
+        self.pending += 1
+        try:
+            if self.kind == 'process':
+                result, timings = await loop.run_in_executor(self._pool, worker_fn, payload)
+            else:
+                plan = self.plan_provider()
+                if plan is None:
+                    raise RuntimeError("Model not available")
+                timings = {}
+                result = await loop.run_in_executor(
+                    self._pool, functools.partial(getattr(plan, plan_method), payload, timings=timings)
+                )
+        finally:
+            self.pending -= 1
+            self.completed_total += 1
+
+        if self.stage_observer and timings:
+            self.stage_observer(timings)
+        return result
+
+    async def score_records(self, records: List[Mapping[str, Any]]) -> List[Any]:
+        """
+        Score records on the pool.
+
+        Args:
+            records: Transaction fields as dictionaries
+
+        Returns:
+            One (prediction, probability) tuple or Exception per record
+        """
+        return await self._run('score_records', _score_in_worker, records)
+
+    async def score_columns(self, columns: Mapping[str, Any]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Score column arrays on the pool.
+
+        Args:
+            columns: Raw transaction fields as column arrays of equal length
+
+        Returns:
+            Tuple of (predictions, fraud_probabilities)
+        """
+        return await self._run('score_batch', _score_columns_in_worker, columns)
+
+    def restart(self) -> None:
+        """
+        Replace the pool with a fresh one.
+
+        Process-pool workers hold their own copy of the model, so this is how
+        they pick up a reloaded version. Jobs already submitted to the old
+        pool still complete.
+        """
+        old_pool = self._pool
+        self._pool = self._create_pool()
+        old_pool.shutdown(wait=False)
+
+    def stats(self) -> Dict[str, Any]:
+        """Pool utilization metrics."""
+        return {
+            'kind': self.kind,
+            'max_workers': self.max_workers,
+            'max_queue': self.max_queue,
+            'pending': self.pending,
+            'completed_total': self.completed_total,
+            'rejected_total': self.rejected_total
+        }
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Shut down the pool."""
+        self._pool.shutdown(wait=wait)
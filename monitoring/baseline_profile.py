@@ -0,0 +1,163 @@
+"""
+Baseline profile of the training features.
+Written by the training pipeline next to the model, it stands in for the
+raw baseline data in monitoring: per-feature drift sketches (quantile
+points, CDF and PSI histogram), summary moments and quantiles, and
+category frequencies, tagged with the version of the model it belongs to.
+Loading it reads a few arrays instead of the whole feature matrix.
+"""
+
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+from typing import Any, Dict, Mapping, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from monitoring.drift import BaselineSketch
+
+PROFILE_VERSION = 1
+
+QUANTILES = (0.01, 0.05, 0.25, 0.5, 0.75, 0.95, 0.99)
+
+# Numeric columns with at most this many distinct values also get frequencies
+MAX_CATEGORIES = 50
+
+
+def artifact_version(model_path: str, preprocessor_path: str) -> str:
+    """Version of a model/preprocessor pair, the same one the API's ModelRegistry reports."""
+    digest = hashlib.sha256()
+    for path in (model_path, preprocessor_path):
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                digest.update(block)
+    return digest.hexdigest()[:12]
+
+
+def _moments(values: np.ndarray) -> Dict[str, Any]:
+    """Count, missing, mean, std, min, max and quantiles of one column."""
+    present = values[~np.isnan(values)]
+    summary: Dict[str, Any] = {'count': int(len(present)), 'missing': int(len(values) - len(present))}
+    if len(present) == 0:
+        return summary
+    summary.update({
+        'mean': float(present.mean()),
+        'std': float(present.std(ddof=1)) if len(present) > 1 else 0.0,
+        'min': float(present.min()),
+        'max': float(present.max()),
+        'quantiles': dict(zip(map(str, QUANTILES), np.quantile(present, QUANTILES).tolist()))
+    })
+    return summary
+
+
+class BaselineProfile:
+    """Drift sketches, moments and category frequencies of a model's training features."""
+
+    def __init__(
+        self,
+        sketch: BaselineSketch,
+        moments: Mapping[str, Dict[str, Any]],
+        categories: Mapping[str, Dict[str, float]],
+        n_rows: int,
+        model_version: Optional[str] = None,
+        created_at: Optional[float] = None
+    ):
+        """
+        Args:
+            sketch: Drift sketches of the numeric features
+            moments: Feature name to count, missing, mean, std, min, max and quantiles
+            categories: Feature name to value frequencies (missing values under 'nan')
+            n_rows: Rows the profile was built from
+            model_version: artifact_version() of the model it was built for
+            created_at: Unix time the profile was built
+        """
+        self.sketch = sketch
+        self.moments = dict(moments)
+        self.categories = dict(categories)
+        self.n_rows = n_rows
+        self.model_version = model_version
+        self.created_at = created_at if created_at is not None else time.time()
+
+    @classmethod
+    def from_frame(
+        cls,
+        df: pd.DataFrame,
+        model_version: Optional[str] = None,
+        n_points: int = 1024,
+        psi_bins: int = 10,
+        max_categories: int = MAX_CATEGORIES
+    ) -> 'BaselineProfile':
+        """
+        Profile a feature matrix.
+
+        Args:
+            df: Baseline features
+            model_version: artifact_version() of the model trained on them
+            n_points: Drift sketch points per numeric feature
+            psi_bins: Quantile bins of the PSI histogram
+            max_categories: Distinct values up to which numeric columns also get frequencies
+
+        Returns:
+            BaselineProfile
+        """
+        numeric = df.select_dtypes(include=[np.number, 'bool']).columns
+        sketch = BaselineSketch.from_frame(df, numeric, n_points=n_points, psi_bins=psi_bins)
+
+        moments = {}
+        categories = {}
+        for col in df.columns:
+            if col in numeric:
+                moments[col] = _moments(df[col].to_numpy(dtype=np.float64, na_value=np.nan))
+                if df[col].nunique() > max_categories:
+                    continue
+            frequencies = df[col].value_counts(normalize=True, dropna=False)
+            categories[col] = {str(value): float(share) for value, share in frequencies.items()}
+
+        return cls(sketch, moments, categories, len(df), model_version)
+
+    def histogram(self, feature: str) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Baseline PSI histogram of a numeric feature.
+
+        Returns:
+            (edges, proportions): inner bin edges and the share of baseline
+            values in each of the len(edges) + 1 bins
+        """
+        sketch = self.sketch.features[feature]
+        return sketch.points[sketch.psi_edges], sketch.psi_expected
+
+    def metadata(self) -> Dict[str, Any]:
+        """JSON-serializable part of the profile."""
+        return {
+            'version': PROFILE_VERSION,
+            'model_version': self.model_version,
+            'created_at': self.created_at,
+            'n_rows': self.n_rows,
+            'moments': self.moments,
+            'categories': self.categories
+        }
+
+    def save(self, path: str) -> None:
+        """Write the profile as a single .npz archive, replacing any previous one atomically."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(path.name + '.tmp')
+        with open(tmp_path, 'wb') as f:
+            np.savez(f, profile=np.array(json.dumps(self.metadata())), **self.sketch.to_arrays())
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> 'BaselineProfile':
+        """Read a profile written by save()."""
+        with np.load(path, allow_pickle=False) as data:
+            metadata = json.loads(str(data['profile']))
+            if metadata['version'] != PROFILE_VERSION:
+                raise ValueError(f"Unsupported baseline profile version {metadata['version']}")
+            sketch = BaselineSketch.from_arrays(data)
+        return cls(
+            sketch, metadata['moments'], metadata['categories'], metadata['n_rows'],
+            metadata['model_version'], metadata['created_at']
+        )
@@ -0,0 +1,360 @@
+"""
+Streaming drift detection against a precomputed baseline sketch.
+The baseline is reduced once to a fixed number of sorted points per
+feature, with its exact CDF at those points; production values are binned
+against the points, so KS and PSI statistics cost O(points) no matter how
+large the baseline was.
+
+Windows are counted in observations and built from panes of `slide`
+observations: each pane keeps per-cell counts, and a window's counts are a
+running sum of its panes, so sliding by one pane adds one pane and removes
+one. Tumbling windows are the special case slide == window_size.
+"""
+
+from collections import deque
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Deque, Dict, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+SKETCH_VERSION = 1
+
+# Floor for bin proportions so empty bins keep PSI finite
+PSI_EPSILON = 1e-4
+
+
+class FeatureSketch:
+    """Sorted baseline points of one feature with the baseline CDF at each point."""
+
+    def __init__(
+        self,
+        points: np.ndarray,
+        cdf_left: np.ndarray,
+        cdf_right: np.ndarray,
+        n: int,
+        psi_edges: np.ndarray
+    ):
+        """
+        Args:
+            points: Unique sorted baseline values (quantiles of the baseline)
+            cdf_left: Baseline P(x < point)
+            cdf_right: Baseline P(x <= point)
+            n: Baseline sample size
+            psi_edges: Indices into points of the PSI bin edges
+        """
+        self.points = points
+        self.cdf_left = cdf_left
+        self.cdf_right = cdf_right
+        self.n = n
+        self.psi_edges = psi_edges
+
+        # Expected PSI bin proportions: bins are [edge_{b-1}, edge_b)
+        cumulative = np.concatenate([[0.0], cdf_left[psi_edges], [1.0]])
+        self.psi_expected = np.diff(cumulative)
+
+    @classmethod
+    def from_values(cls, values: np.ndarray, n_points: int = 1024, psi_bins: int = 10) -> 'FeatureSketch':
+        """Sketch a feature from its baseline values (NaNs ignored)."""
+        values = np.sort(values[~np.isnan(values)])
+        if len(values) == 0:
+            raise ValueError("Cannot sketch a feature without values")
+
+        ranks = np.linspace(0, len(values) - 1, min(n_points, len(values))).round().astype(np.int64)
+        points = np.unique(values[ranks])
+        cdf_left = np.searchsorted(values, points, side='left') / len(values)
+        cdf_right = np.searchsorted(values, points, side='right') / len(values)
+
+        # PSI edges at baseline quantiles, snapped to sketch points
+        targets = np.arange(1, psi_bins) / psi_bins
+        psi_edges = np.unique(np.searchsorted(cdf_left, targets, side='left').clip(1, len(points) - 1))
+        if len(points) == 1:
+            psi_edges = np.zeros(0, dtype=np.int64)
+        return cls(points, cdf_left, cdf_right, len(values), psi_edges)
+
+    def cell_counts(self, values: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Bin values against the sketch points.
+
+        Returns:
+            (cells, matches): cells[i] counts values with exactly i points
+            below them; matches[i] counts values equal to points[i]
+        """
+        values = values[~np.isnan(values)]
+        n_points = len(self.points)
+        cells = np.searchsorted(self.points, values, side='left')
+        exact = cells < n_points
+        exact[exact] = self.points[cells[exact]] == values[exact]
+        return (
+            np.bincount(cells, minlength=n_points + 1),
+            np.bincount(cells[exact], minlength=n_points)
+        )
+
+    def compare(self, cells: np.ndarray, matches: np.ndarray) -> Dict[str, float]:
+        """
+        KS statistic, asymptotic two-sample p-value and PSI of a window's counts.
+
+        Args:
+            cells: Window cell counts from cell_counts()
+            matches: Window exact-match counts from cell_counts()
+
+        Returns:
+            Dict with n, statistic, p_value and psi
+        """
+        n = int(cells.sum())
+        if n == 0:
+            return {'n': 0, 'statistic': 0.0, 'p_value': 1.0, 'psi': 0.0}
+
+        # Window CDF just after (right) and just before (left) every point
+        right = np.cumsum(cells[:-1]) / n
+        left = right - matches / n
+        statistic = float(max(
+            np.abs(right - self.cdf_right).max(initial=0.0),
+            np.abs(left - self.cdf_left).max(initial=0.0)
+        ))
+        effective_n = n * self.n / (n + self.n)
+        p_value = float(stats.kstwo.sf(statistic, max(1, round(effective_n))))
+
+        cumulative = np.concatenate([[0.0], left[self.psi_edges], [1.0]])
+        actual = np.maximum(np.diff(cumulative), PSI_EPSILON)
+        expected = np.maximum(self.psi_expected, PSI_EPSILON)
+        psi = float(np.sum((actual - expected) * np.log(actual / expected)))
+        return {'n': n, 'statistic': statistic, 'p_value': p_value, 'psi': psi}
+
+
+class BaselineSketch:
+    """Per-feature sketches of the baseline data, built once and reusable from disk."""
+
+    def __init__(self, features: Mapping[str, FeatureSketch]):
+        """
+        Args:
+            features: Feature name to sketch, in the order drift is reported
+        """
+        self.features = dict(features)
+
+    @classmethod
+    def from_frame(
+        cls,
+        df: pd.DataFrame,
+        columns: Optional[Sequence[str]] = None,
+        n_points: int = 1024,
+        psi_bins: int = 10
+    ) -> 'BaselineSketch':
+        """
+        Sketch the numeric columns of a baseline DataFrame.
+
+        Args:
+            df: Baseline data
+            columns: Columns to sketch (numeric columns in frame order by default)
+            n_points: Sketch points per feature (KS resolution is about 1/n_points)
+            psi_bins: Quantile bins used for PSI
+
+        Returns:
+            BaselineSketch
+        """
+        if columns is None:
+            columns = df.select_dtypes(include=[np.number, 'bool']).columns.tolist()
+
+        features = {}
+        for col in columns:
+            values = df[col].to_numpy(dtype=np.float64, na_value=np.nan)
+            if np.isnan(values).all():
+                continue
+            features[col] = FeatureSketch.from_values(values, n_points=n_points, psi_bins=psi_bins)
+        return cls(features)
+
+    def to_arrays(self) -> Dict[str, np.ndarray]:
+        """Flat name-to-array mapping for .npz archives."""
+        arrays: Dict[str, np.ndarray] = {
+            'version': np.array(SKETCH_VERSION),
+            'names': np.array(list(self.features), dtype=str)
+        }
+        for i, sketch in enumerate(self.features.values()):
+            arrays[f'points_{i}'] = sketch.points
+            arrays[f'cdf_left_{i}'] = sketch.cdf_left
+            arrays[f'cdf_right_{i}'] = sketch.cdf_right
+            arrays[f'n_{i}'] = np.array(sketch.n)
+            arrays[f'psi_edges_{i}'] = sketch.psi_edges
+        return arrays
+
+    @classmethod
+    def from_arrays(cls, data: Mapping[str, np.ndarray]) -> 'BaselineSketch':
+        """Rebuild a sketch from to_arrays() output (or an opened .npz)."""
+        if int(data['version']) != SKETCH_VERSION:
+            raise ValueError(f"Unsupported baseline sketch version {int(data['version'])}")
+        features = {
+            str(name): FeatureSketch(
+                data[f'points_{i}'], data[f'cdf_left_{i}'], data[f'cdf_right_{i}'],
+                int(data[f'n_{i}']), data[f'psi_edges_{i}']
+            )
+            for i, name in enumerate(data['names'])
+        }
+        return cls(features)
+
+    def save(self, path: str) -> None:
+        """Write the sketch as a .npz archive."""
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        with open(path, 'wb') as f:
+            np.savez(f, **self.to_arrays())
+
+    @classmethod
+    def load(cls, path: str) -> 'BaselineSketch':
+        """Read a sketch written by save()."""
+        with np.load(path, allow_pickle=False) as data:
+            return cls.from_arrays(data)
+
+    def compare_frame(self, df: pd.DataFrame) -> Dict[str, Dict[str, float]]:
+        """KS/PSI of a batch of values against the baseline, per shared feature."""
+        results = {}
+        for name, sketch in self.features.items():
+            if name in df.columns:
+                values = df[name].to_numpy(dtype=np.float64, na_value=np.nan)
+                results[name] = sketch.compare(*sketch.cell_counts(values))
+        return results
+
+
+class StreamingDriftDetector:
+    """Per-feature sliding/tumbling windows over production values with incremental KS/PSI."""
+
+    def __init__(
+        self,
+        baseline: BaselineSketch,
+        window_size: int = 1000,
+        slide: Optional[int] = None,
+        p_value_threshold: float = 0.05,
+        psi_threshold: float = 0.2,
+        record_batch: int = 256,
+        on_result: Optional[Callable[[Dict[str, Any]], None]] = None
+    ):
+        """
+        Initialize detector.
+
+        Args:
+            baseline: Baseline sketch
+            window_size: Observations per window
+            slide: Observations between window closes (window_size for tumbling
+                windows); must divide window_size
+            p_value_threshold: KS p-value below which a feature drifted
+            psi_threshold: PSI above which a feature drifted
+            record_batch: Records buffered by add_record() before binning
+            on_result: Called with every drift result as its window closes
+        """
+        slide = slide or window_size
+        if window_size % slide:
+            raise ValueError(f"slide ({slide}) must divide window_size ({window_size})")
+
+        self.baseline = baseline
+        self.window_size = window_size
+        self.slide = slide
+        self.panes_per_window = window_size // slide
+        self.p_value_threshold = p_value_threshold
+        self.psi_threshold = psi_threshold
+        self.record_batch = record_batch
+        self.on_result = on_result
+
+        self.observed = 0
+        self.windows_closed = 0
+        self._pending: List[Mapping[str, Any]] = []
+        self._pane_rows = 0
+        self._pane = self._empty_counts()
+        self._panes: Deque[Dict[str, List[np.ndarray]]] = deque()
+        self._window = self._empty_counts()
+
+    def _empty_counts(self) -> Dict[str, List[np.ndarray]]:
+        """Zeroed [cells, matches] counts per feature."""
+        return {
+            name: [np.zeros(len(sketch.points) + 1, dtype=np.int64), np.zeros(len(sketch.points), dtype=np.int64)]
+            for name, sketch in self.baseline.features.items()
+        }
+
+    def add_record(self, record: Mapping[str, Any]) -> List[Dict[str, Any]]:
+        """Buffer one observation; bins the buffer every record_batch records."""
+        self._pending.append(record)
+        if len(self._pending) < self.record_batch:
+            return []
+        return self.flush()
+
+    def flush(self) -> List[Dict[str, Any]]:
+        """Bin buffered records."""
+        if not self._pending:
+            return []
+        df = pd.DataFrame.from_records(self._pending)
+        self._pending = []
+        return self.update(df)
+
+    def update(self, df: pd.DataFrame) -> List[Dict[str, Any]]:
+        """
+        Add a batch of observations.
+
+        Args:
+            df: Production feature values (missing columns and NaNs are skipped)
+
+        Returns:
+            Drift results of the windows that closed within the batch
+        """
+        columns = {
+            name: df[name].to_numpy(dtype=np.float64, na_value=np.nan)
+            for name in self.baseline.features if name in df.columns
+        }
+        results = []
+        start = 0
+        while start < len(df):
+            stop = min(len(df), start + self.slide - self._pane_rows)
+            for name, values in columns.items():
+                cells, matches = self.baseline.features[name].cell_counts(values[start:stop])
+                self._pane[name][0] += cells
+                self._pane[name][1] += matches
+            self._pane_rows += stop - start
+            self.observed += stop - start
+            start = stop
+
+            if self._pane_rows == self.slide:
+                result = self._close_pane()
+                if result is not None:
+                    results.append(result)
+        return results
+
+    def _close_pane(self) -> Optional[Dict[str, Any]]:
+        """Slide the window by one pane; returns a result once the window is full."""
+        pane = self._pane
+        self._panes.append(pane)
+        for name, counts in pane.items():
+            self._window[name][0] += counts[0]
+            self._window[name][1] += counts[1]
+        if len(self._panes) > self.panes_per_window:
+            expired = self._panes.popleft()
+            for name, counts in expired.items():
+                self._window[name][0] -= counts[0]
+                self._window[name][1] -= counts[1]
+        self._pane = self._empty_counts()
+        self._pane_rows = 0
+
+        if len(self._panes) < self.panes_per_window:
+            return None
+        return self._result()
+
+    def _result(self) -> Dict[str, Any]:
+        """Drift result of the current window, features in baseline order."""
+        result = {
+            'timestamp': datetime.now().isoformat(),
+            'window_end': self.observed,
+            'window_size': self.window_size,
+            'features': {},
+            'features_with_drift': [],
+            'drift_detected': False
+        }
+        for name, (cells, matches) in self._window.items():
+            comparison = self.baseline.features[name].compare(cells, matches)
+            result['features'][name] = comparison
+            if comparison['n'] and (
+                comparison['p_value'] < self.p_value_threshold or comparison['psi'] > self.psi_threshold
+            ):
+                result['features_with_drift'].append({'feature': name, **comparison})
+        result['drift_detected'] = bool(result['features_with_drift'])
+
+        self.windows_closed += 1
+        if self.on_result:
+            self.on_result(result)
+        return result
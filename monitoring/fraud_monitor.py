@@ -6,52 +6,193 @@ Tracks model performance, data drift, and system health
 
 import pandas as pd
 import numpy as np
-from scipy import stats
+from collections import deque
 from datetime import datetime, timedelta
 import json
+import sys
+import time
 from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
 import warnings
 warnings.filterwarnings('ignore')
 
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from monitoring.baseline_profile import BaselineProfile, artifact_version
+from monitoring.drift import StreamingDriftDetector
+from monitoring.performance import DAY_SECONDS, WindowedPerformance
+from monitoring.rollups import MonitoringRollups
+from src.utils.config import load_config, get_section
+from src.utils.segment_log import SegmentLog
+
+MODELS_DIR = Path(__file__).parent.parent / 'models' / 'saved_models'
+MODEL_PATH = MODELS_DIR / 'best_model.pkl'
+PREPROCESSOR_PATH = MODELS_DIR / 'fraud_preprocessor.prep'
+BASELINE_PROFILE_PATH = MODELS_DIR / 'baseline_profile.npz'
+
 class FraudMonitor:
     """Production monitoring system for fraud detection model."""
     
-    def __init__(self, baseline_data_path: str = '../data/processed/X_processed.csv'):
-        """Initialize monitor with baseline data."""
-        self.baseline_data = pd.read_csv(baseline_data_path)
-        self.predictions_log = []
-        self.performance_log = []
-        self.drift_log = []
+    def __init__(
+        self,
+        baseline_data_path: str = '../data/processed/X_processed.csv',
+        prediction_log_options: Optional[Dict[str, Any]] = None,
+        baseline_profile_path: Optional[str] = str(BASELINE_PROFILE_PATH),
+        model_path: str = str(MODEL_PATH),
+        preprocessor_path: str = str(PREPROCESSOR_PATH)
+    ):
+        """
+        Initialize monitor with the training baseline.
+        
+        Args:
+            baseline_data_path: Reference feature data, read only when there
+                is no baseline profile
+            prediction_log_options: SegmentLog options for the prediction log
+                (defaults to the `monitoring.prediction_log` config section)
+            baseline_profile_path: Baseline profile written by the training pipeline
+            model_path: Deployed model, checked against the profile's model version
+            preprocessor_path: Deployed preprocessor, checked with the model
+        """
+        config = load_config()
+        monitoring_config = get_section(config, 'monitoring')
+        drift_config = get_section(config, 'monitoring', 'drift')
+        performance_config = get_section(config, 'monitoring', 'performance')
+        
+        # Drift checks only touch the profile's sketches, so the raw baseline
+        # is only read (and profiled) when no profile was shipped
+        if baseline_profile_path and Path(baseline_profile_path).exists():
+            self.baseline_profile = BaselineProfile.load(baseline_profile_path)
+            if Path(model_path).exists() and Path(preprocessor_path).exists():
+                deployed = artifact_version(model_path, preprocessor_path)
+                if self.baseline_profile.model_version != deployed:
+                    raise ValueError(
+                        f"Baseline profile {baseline_profile_path} was built for model "
+                        f"{self.baseline_profile.model_version}, deployed model is {deployed}"
+                    )
+        else:
+            self.baseline_profile = BaselineProfile.from_frame(
+                pd.read_csv(baseline_data_path),
+                n_points=drift_config.get('sketch_points', 1024),
+                psi_bins=drift_config.get('psi_bins', 10)
+            )
+        self.baseline_sketch = self.baseline_profile.sketch
+        
+        self.performance_log = deque(maxlen=performance_config.get('max_results', 1000))
+        self.drift_log = deque(maxlen=drift_config.get('max_results', 1000))
+        
+        # Minute/hour/day counters behind the report summaries, persisted
+        # so reports over past ranges survive restarts
+        rollup_config = get_section(config, 'monitoring', 'rollups')
+        self.rollups = MonitoringRollups(
+            '../logs/monitoring/rollups.npz',
+            score_bins=rollup_config.get('score_bins', 10),
+            retention=rollup_config.get('retention'),
+            save_interval_seconds=rollup_config.get('save_interval_seconds', 60)
+        )
+        
+        # Logged features feed sliding windows; results land in drift_log
+        # as each window closes
+        self.drift_detector = StreamingDriftDetector(
+            self.baseline_sketch,
+            window_size=drift_config.get('window_size', 1000),
+            slide=drift_config.get('slide'),
+            p_value_threshold=monitoring_config.get('drift_threshold', 0.05),
+            psi_threshold=drift_config.get('psi_threshold', 0.2),
+            on_result=self._record_drift
+        )
         
         # Create logs directory
         Path('../logs/monitoring').mkdir(parents=True, exist_ok=True)
         
+        # Predictions are appended to size-rotated JSONL segments by a
+        # background writer; only a bounded buffer is held in memory
+        if prediction_log_options is None:
+            prediction_log_options = get_section(config, 'monitoring', 'prediction_log')
+        self.prediction_log = SegmentLog(
+            '../logs/monitoring/predictions', prefix='predictions', **prediction_log_options
+        )
+        
+        # Predictions with a transaction id are counted per time window and
+        # joined to chargeback labels as they arrive
+        self.window_performance = WindowedPerformance(
+            window_seconds=performance_config.get('window_hours', 24) * 3600,
+            max_label_delay_seconds=performance_config.get('max_label_delay_days', 60) * DAY_SECONDS,
+            max_windows=performance_config.get('max_windows', 120)
+        )
+        
+        # Restart from the last snapshot and replay only what was logged
+        # after it; without a snapshot, only segments written within the
+        # label horizon are replayed
+        self.window_performance_path = Path('../logs/monitoring/window_performance.npz')
+        replay_since = time.time() - self.window_performance.max_label_delay_seconds
+        if self.window_performance_path.exists():
+            replay_since = max(replay_since, self.window_performance.load(self.window_performance_path))
+        if performance_config.get('replay_log', True):
+            self.window_performance.replay(
+                self.prediction_log.records(modified_since=replay_since), since=replay_since
+            )
+        
     def log_prediction(self, features: dict, prediction: int, probability: float, 
-                      actual: int = None):
+                      actual: int = None, transaction_id: Optional[str] = None):
         """Log a prediction for monitoring."""
+        now = time.time()
         log_entry = {
-            'timestamp': datetime.now().isoformat(),
+            'timestamp': datetime.fromtimestamp(now).isoformat(),
+            'transaction_id': transaction_id,
             'features': features,
             'prediction': prediction,
             'probability': probability,
             'actual': actual
         }
-        self.predictions_log.append(log_entry)
+        self.prediction_log.append(log_entry)
+        self.rollups.add_prediction(now, prediction, probability)
+        self.drift_detector.add_record(features)
+        if transaction_id is not None:
+            self.window_performance.add_prediction(transaction_id, now, prediction, actual)
+    
+    def log_label(self, transaction_id: str, actual: int) -> bool:
+        """
+        Record the label of an earlier prediction (e.g. a chargeback).
         
-        # Save to file periodically
-        if len(self.predictions_log) % 100 == 0:
-            self._save_predictions_log()
+        Returns:
+            False if no prediction within the label delay horizon has this id
+        """
+        self.prediction_log.append({
+            'timestamp': datetime.now().isoformat(),
+            'type': 'label',
+            'transaction_id': transaction_id,
+            'actual': actual
+        })
+        return self.window_performance.add_label(transaction_id, actual)
     
-    def _save_predictions_log(self):
-        """Save predictions log to file."""
-        filepath = Path('../logs/monitoring/predictions_log.json')
-        with open(filepath, 'w') as f:
-            json.dump(self.predictions_log, f, indent=2)
+    def iter_predictions(self) -> Iterator[Dict[str, Any]]:
+        """Iterate over every logged prediction on disk, oldest first."""
+        return (record for record in self.prediction_log if record.get('type') != 'label')
+    
+    def performance_by_window(self, last: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Precision, recall and F1 per time window from the streaming accumulators."""
+        return self.window_performance.windows(last)
+    
+    def close(self):
+        """Write buffered predictions, close the prediction log and save the rollups and windows."""
+        self.prediction_log.close()
+        self.rollups.save()
+        self.window_performance.save(self.window_performance_path)
+    
+    def _record_drift(self, drift_results: dict):
+        """Keep a drift result and count it in the rollups."""
+        self.drift_log.append(drift_results)
+        self.rollups.add_drift(time.time(), drift_results['drift_detected'])
     
     def detect_data_drift(self, new_data: pd.DataFrame, threshold: float = 0.05):
         """
         Detect data drift using Kolmogorov-Smirnov test.
         
+        The batch is compared with the precomputed baseline sketch, so the
+        cost does not depend on the baseline size; features are reported in
+        baseline column order.
+        
         Args:
             new_data: Recent production data
             threshold: P-value threshold for drift detection
@@ -65,28 +206,17 @@ class FraudMonitor:
             'drift_detected': False
         }
         
-        common_cols = list(set(self.baseline_data.columns) & set(new_data.columns))
-        
-        for col in common_cols:
-            # KS test for numerical features
-            try:
-                baseline_vals = self.baseline_data[col].dropna()
-                new_vals = new_data[col].dropna()
-                
-                if len(baseline_vals) > 0 and len(new_vals) > 0:
-                    statistic, p_value = stats.ks_2samp(baseline_vals, new_vals)
-                    
-                    if p_value < threshold:
-                        drift_results['features_with_drift'].append({
-                            'feature': col,
-                            'p_value': p_value,
-                            'statistic': statistic
-                        })
-                        drift_results['drift_detected'] = True
-            except:
-                continue
+        for col, comparison in self.baseline_sketch.compare_frame(new_data).items():
+            if comparison['n'] and comparison['p_value'] < threshold:
+                drift_results['features_with_drift'].append({
+                    'feature': col,
+                    'p_value': comparison['p_value'],
+                    'statistic': comparison['statistic'],
+                    'psi': comparison['psi']
+                })
+                drift_results['drift_detected'] = True
         
-        self.drift_log.append(drift_results)
+        self._record_drift(drift_results)
         return drift_results
     
     def calculate_performance_metrics(self, predictions: list, actuals: list):
@@ -103,6 +233,7 @@ class FraudMonitor:
         }
         
         self.performance_log.append(metrics)
+        self.rollups.add_performance(time.time(), metrics['precision'], metrics['recall'])
         return metrics
     
     def check_for_alerts(self, performance_metrics: dict, 
@@ -128,6 +259,8 @@ class FraudMonitor:
             })
         
         if alerts:
+            for alert in alerts:
+                self.rollups.add_alert(time.time(), alert['severity'])
             self._save_alerts(alerts)
         
         return alerts
@@ -153,18 +286,41 @@ class FraudMonitor:
         for alert in alerts:
             print(f"   [{alert['severity']}] {alert['message']}")
     
-    def generate_monitoring_report(self):
-        """Generate comprehensive monitoring report."""
+    def generate_monitoring_report(self, start: Optional[datetime] = None, end: Optional[datetime] = None):
+        """
+        Generate comprehensive monitoring report.
+        
+        The summary is served from the rollups, so its cost does not grow
+        with the monitored period.
+        
+        Args:
+            start: Beginning of the summarized range (default: oldest rollup)
+            end: End of the summarized range (default: now)
+        """
+        summary = self.rollups.summary(
+            start.timestamp() if start else None,
+            end.timestamp() if end else None
+        )
+        summary['start'] = datetime.fromtimestamp(summary['start']).isoformat()
+        summary['end'] = datetime.fromtimestamp(summary['end']).isoformat()
+        
+        # The prediction log also holds label records and restarts its
+        # counters, so the all-time count comes from the persisted rollups
+        total_predictions = self.rollups.summary()['predictions'] if start or end else summary['predictions']
+        
         report = {
             'generated_at': datetime.now().isoformat(),
-            'total_predictions': len(self.predictions_log),
-            'performance_metrics': self.performance_log[-10:] if self.performance_log else [],
-            'drift_detections': self.drift_log[-5:] if self.drift_log else [],
-            'summary': {
-                'avg_precision': np.mean([m['precision'] for m in self.performance_log]) if self.performance_log else 0,
-                'avg_recall': np.mean([m['recall'] for m in self.performance_log]) if self.performance_log else 0,
-                'drift_detected_count': sum([1 for d in self.drift_log if d['drift_detected']])
-            }
+            'total_predictions': total_predictions,
+            'prediction_log': self.prediction_log.stats(),
+            'baseline': {
+                'model_version': self.baseline_profile.model_version,
+                'n_rows': self.baseline_profile.n_rows
+            },
+            'performance_metrics': list(self.performance_log)[-10:],
+            'drift_detections': list(self.drift_log)[-5:],
+            'window_performance': self.window_performance.windows(last=10),
+            'label_join': self.window_performance.stats(),
+            'summary': summary
         }
         
         # Save report
@@ -0,0 +1,266 @@
+"""
+Windowed model performance with delayed labels.
+Every prediction is assigned to a fixed time window by its event time and
+indexed by transaction id, so a label arriving days later (chargebacks
+take up to 60 days) updates the confusion matrix of the right window in
+O(1). Precision, recall and F1 of any window are read from its counts
+without rescanning predictions.
+"""
+
+import os
+import time
+from collections import OrderedDict
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Mapping, Optional
+
+import numpy as np
+
+DAY_SECONDS = 86400
+
+SNAPSHOT_VERSION = 1
+
+# Confusion-matrix cells of a window's counts, followed by the prediction count
+TP, FP, FN, TN, PREDICTIONS = range(5)
+
+
+def _cell(prediction: int, actual: int) -> int:
+    """Confusion-matrix cell of a labelled prediction."""
+    return (1 - prediction) * 2 + (1 - actual)
+
+
+def _metrics_from_counts(window_start: float, window_seconds: float, counts: List[int]) -> Dict[str, Any]:
+    """Precision, recall, F1 and label coverage of one window's counts."""
+    tp, fp, fn, tn, predictions = counts
+    labelled = tp + fp + fn + tn
+    precision = tp / (tp + fp) if tp + fp else 0.0
+    recall = tp / (tp + fn) if tp + fn else 0.0
+    return {
+        'window_start': datetime.fromtimestamp(window_start).isoformat(),
+        'window_end': datetime.fromtimestamp(window_start + window_seconds).isoformat(),
+        'n_predictions': predictions,
+        'n_samples': labelled,
+        'pending_labels': predictions - labelled,
+        'tp': tp,
+        'fp': fp,
+        'fn': fn,
+        'tn': tn,
+        'precision': precision,
+        'recall': recall,
+        'f1_score': 2 * precision * recall / (precision + recall) if precision + recall else 0.0,
+        'fraud_rate': (tp + fn) / labelled if labelled else 0.0
+    }
+
+
+class WindowedPerformance:
+    """Confusion-matrix accumulators per time window, joined to late labels by transaction id."""
+
+    def __init__(
+        self,
+        window_seconds: float = DAY_SECONDS,
+        max_label_delay_seconds: float = 60 * DAY_SECONDS,
+        max_windows: Optional[int] = 120
+    ):
+        """
+        Initialize accumulators.
+
+        Args:
+            window_seconds: Width of a window (predictions are bucketed by event time)
+            max_label_delay_seconds: How long a prediction stays joinable to a label;
+                older index entries are dropped as newer predictions arrive
+            max_windows: Most recent windows kept (None keeps all)
+        """
+        self.window_seconds = window_seconds
+        self.max_label_delay_seconds = max_label_delay_seconds
+        self.max_windows = max_windows
+
+        # transaction_id -> [timestamp, window_start, prediction, actual or None],
+        # in arrival order so expired entries are popped from the front
+        self._index: 'OrderedDict[str, List[Any]]' = OrderedDict()
+        self._windows: Dict[float, List[int]] = {}
+        self._latest = float('-inf')
+
+        self.labels_joined = 0
+        self.labels_unmatched = 0
+        self.expired = 0
+
+    def _window_start(self, timestamp: float) -> float:
+        return timestamp - timestamp % self.window_seconds
+
+    def add_prediction(
+        self,
+        transaction_id: str,
+        timestamp: float,
+        prediction: int,
+        actual: Optional[int] = None
+    ) -> None:
+        """
+        Count a prediction in its window and index it for a later label.
+
+        Args:
+            transaction_id: Key the label will arrive with
+            timestamp: Event time (Unix seconds)
+            prediction: Predicted class (0/1)
+            actual: Label, if already known
+        """
+        previous = self._index.pop(transaction_id, None)
+        if previous is not None:
+            self._uncount(previous)
+
+        window = self._window_start(timestamp)
+        counts = self._windows.get(window)
+        if counts is None:
+            counts = self._windows[window] = [0, 0, 0, 0, 0]
+            self._trim_windows()
+        counts[PREDICTIONS] += 1
+
+        entry = [timestamp, window, int(prediction), None]
+        self._index[transaction_id] = entry
+        if actual is not None:
+            self._label(entry, int(actual))
+
+        if timestamp > self._latest:
+            self._latest = timestamp
+            self._expire()
+
+    def add_label(self, transaction_id: str, actual: int) -> bool:
+        """
+        Attach a (possibly late or corrected) label to an indexed prediction.
+
+        Returns:
+            False if the prediction is unknown or older than the label delay horizon
+        """
+        entry = self._index.get(transaction_id)
+        if entry is None:
+            self.labels_unmatched += 1
+            return False
+        self._label(entry, int(actual))
+        self.labels_joined += 1
+        return True
+
+    def _label(self, entry: List[Any], actual: int) -> None:
+        counts = self._windows.get(entry[1])
+        if counts is not None:
+            if entry[3] is not None:
+                counts[_cell(entry[2], entry[3])] -= 1
+            counts[_cell(entry[2], actual)] += 1
+        entry[3] = actual
+
+    def _uncount(self, entry: List[Any]) -> None:
+        """Remove a replaced prediction from its window."""
+        counts = self._windows.get(entry[1])
+        if counts is None:
+            return
+        counts[PREDICTIONS] -= 1
+        if entry[3] is not None:
+            counts[_cell(entry[2], entry[3])] -= 1
+
+    def _expire(self) -> None:
+        """Drop index entries that can no longer receive a label."""
+        horizon = self._latest - self.max_label_delay_seconds
+        while self._index:
+            if next(iter(self._index.values()))[0] >= horizon:
+                break
+            self._index.popitem(last=False)
+            self.expired += 1
+
+    def _trim_windows(self) -> None:
+        if self.max_windows is not None and len(self._windows) > self.max_windows:
+            for window in sorted(self._windows)[:len(self._windows) - self.max_windows]:
+                del self._windows[window]
+
+    def window(self, timestamp: float) -> Optional[Dict[str, Any]]:
+        """Metrics of the window containing a timestamp (None if it has no predictions)."""
+        window = self._window_start(timestamp)
+        counts = self._windows.get(window)
+        if counts is None:
+            return None
+        return _metrics_from_counts(window, self.window_seconds, counts)
+
+    def windows(self, last: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Metrics of every kept window (or the last few), oldest first."""
+        starts = sorted(self._windows)
+        if last is not None:
+            starts = starts[-last:] if last else []
+        return [_metrics_from_counts(start, self.window_seconds, self._windows[start]) for start in starts]
+
+    def replay(self, records: Iterable[Mapping[str, Any]], since: Optional[float] = None) -> None:
+        """
+        Rebuild the accumulators from prediction log records.
+
+        Prediction records need transaction_id, an ISO timestamp and the
+        prediction; records with type 'label' carry transaction_id and actual.
+
+        Args:
+            records: Log records, oldest first
+            since: Skip records logged before this Unix time (already
+                reflected in a loaded snapshot, or past the label horizon)
+        """
+        for record in records:
+            transaction_id = record.get('transaction_id')
+            if transaction_id is None:
+                continue
+            timestamp = datetime.fromisoformat(record['timestamp']).timestamp()
+            if since is not None and timestamp < since:
+                continue
+            if record.get('type') == 'label':
+                self.add_label(transaction_id, record['actual'])
+            else:
+                self.add_prediction(transaction_id, timestamp, record['prediction'], record.get('actual'))
+
+    def save(self, path: str) -> None:
+        """Snapshot the join index and window counts to path atomically."""
+        entries = list(self._index.values())
+        starts = sorted(self._windows)
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(path.name + '.tmp')
+        with open(tmp_path, 'wb') as f:
+            np.savez(
+                f,
+                version=np.array(SNAPSHOT_VERSION),
+                saved_at=np.array(time.time()),
+                latest=np.array(self._latest),
+                counters=np.array([self.labels_joined, self.labels_unmatched, self.expired], dtype=np.int64),
+                ids=np.array([str(transaction_id) for transaction_id in self._index], dtype=str),
+                timestamps=np.array([entry[0] for entry in entries], dtype=np.float64),
+                entry_windows=np.array([entry[1] for entry in entries], dtype=np.float64),
+                predictions=np.array([entry[2] for entry in entries], dtype=np.int8),
+                actuals=np.array([-1 if entry[3] is None else entry[3] for entry in entries], dtype=np.int8),
+                window_starts=np.array(starts, dtype=np.float64),
+                window_counts=np.array([self._windows[start] for start in starts], dtype=np.int64).reshape(-1, 5)
+            )
+        os.replace(tmp_path, path)
+
+    def load(self, path: str) -> float:
+        """
+        Replace the accumulators with a snapshot written by save().
+
+        Returns:
+            Unix time the snapshot was taken; records logged from then on
+            still need to be replayed
+        """
+        with np.load(path, allow_pickle=False) as data:
+            if int(data['version']) != SNAPSHOT_VERSION:
+                raise ValueError(f"Unsupported window performance snapshot {path}")
+            self._latest = float(data['latest'])
+            self.labels_joined, self.labels_unmatched, self.expired = data['counters'].tolist()
+            self._index = OrderedDict(
+                (transaction_id, [timestamp, window, prediction, None if actual < 0 else actual])
+                for transaction_id, timestamp, window, prediction, actual in zip(
+                    data['ids'].tolist(), data['timestamps'].tolist(), data['entry_windows'].tolist(),
+                    data['predictions'].tolist(), data['actuals'].tolist()
+                )
+            )
+            self._windows = dict(zip(data['window_starts'].tolist(), data['window_counts'].tolist()))
+            return float(data['saved_at'])
+
+    def stats(self) -> Dict[str, Any]:
+        """Index size and join counters."""
+        return {
+            'indexed_predictions': len(self._index),
+            'windows': len(self._windows),
+            'labels_joined': self.labels_joined,
+            'labels_unmatched': self.labels_unmatched,
+            'expired': self.expired
+        }
@@ -0,0 +1,243 @@
+"""
+Pre-aggregated monitoring rollups.
+Prediction, score, alert, drift and performance events are added to
+minute, hour and day buckets as they arrive, so a report over any time
+range sums a bounded number of buckets (whole days, then hours and
+minutes at the edges) instead of rescanning logs. Tables are snapshotted
+to a local .npz file and restored at startup.
+"""
+
+import math
+import os
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Mapping, Optional
+
+import numpy as np
+
+ROLLUP_VERSION = 1
+
+# Coarsest first; a range is covered by the coarsest buckets that fit inside it
+RESOLUTIONS = {'day': 86400, 'hour': 3600, 'minute': 60}
+
+# Buckets kept per resolution (None keeps all)
+DEFAULT_RETENTION = {'day': None, 'hour': 24 * 90, 'minute': 60 * 48}
+
+# Counter columns of a bucket; the score histogram follows them
+FIELDS = (
+    'predictions', 'predicted_fraud', 'score_sum',
+    'alerts', 'alerts_high', 'alerts_critical',
+    'drift_checks', 'drift_detected',
+    'performance_checks', 'precision_sum', 'recall_sum'
+)
+_COLUMN = {name: i for i, name in enumerate(FIELDS)}
+
+
+class MonitoringRollups:
+    """Minute/hour/day counters of monitoring events with range queries."""
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        score_bins: int = 10,
+        retention: Optional[Mapping[str, Optional[int]]] = None,
+        save_interval_seconds: float = 60.0
+    ):
+        """
+        Initialize rollups, restoring them from path if it exists.
+
+        Args:
+            path: Snapshot file (.npz); None keeps the rollups in memory only
+            score_bins: Equal-width bins of the fraud probability histogram
+            retention: Buckets kept per resolution (defaults to DEFAULT_RETENTION)
+            save_interval_seconds: Minimum time between snapshots taken while
+                events are added (close() always saves)
+        """
+        self.path = Path(path) if path else None
+        self.score_bins = score_bins
+        self.retention = {**DEFAULT_RETENTION, **(retention or {})}
+        self.save_interval_seconds = save_interval_seconds
+        self.width = len(FIELDS) + score_bins
+
+        self._tables: Dict[str, Dict[int, List[float]]] = {name: {} for name in RESOLUTIONS}
+        self._last_save = time.monotonic()
+        if self.path is not None and self.path.exists():
+            self.load()
+
+    def _add(self, timestamp: float, values: Mapping[int, float]) -> None:
+        """Add column increments to the bucket of every resolution containing timestamp."""
+        for name, seconds in RESOLUTIONS.items():
+            table = self._tables[name]
+            start = int(timestamp // seconds * seconds)
+            bucket = table.get(start)
+            if bucket is None:
+                bucket = table[start] = [0.0] * self.width
+                limit = self.retention[name]
+                if limit is not None and len(table) > limit:
+                    del table[min(table)]
+            for column, value in values.items():
+                bucket[column] += value
+
+        if self.path is not None and time.monotonic() - self._last_save >= self.save_interval_seconds:
+            self.save()
+
+    def add_prediction(self, timestamp: float, prediction: int, probability: float) -> None:
+        """Count a prediction and its score."""
+        score_bin = len(FIELDS) + min(max(int(probability * self.score_bins), 0), self.score_bins - 1)
+        self._add(timestamp, {
+            _COLUMN['predictions']: 1,
+            _COLUMN['predicted_fraud']: int(prediction),
+            _COLUMN['score_sum']: probability,
+            score_bin: 1
+        })
+
+    def add_alert(self, timestamp: float, severity: str) -> None:
+        """Count an alert."""
+        values = {_COLUMN['alerts']: 1}
+        column = _COLUMN.get(f'alerts_{severity.lower()}')
+        if column is not None:
+            values[column] = 1
+        self._add(timestamp, values)
+
+    def add_drift(self, timestamp: float, drift_detected: bool) -> None:
+        """Count a drift check and whether it flagged drift."""
+        self._add(timestamp, {_COLUMN['drift_checks']: 1, _COLUMN['drift_detected']: int(drift_detected)})
+
+    def add_performance(self, timestamp: float, precision: float, recall: float) -> None:
+        """Count a performance check for range averages of precision and recall."""
+        self._add(timestamp, {
+            _COLUMN['performance_checks']: 1,
+            _COLUMN['precision_sum']: precision,
+            _COLUMN['recall_sum']: recall
+        })
+
+    def _oldest(self, name: str) -> float:
+        table = self._tables[name]
+        return min(table) if table else math.inf
+
+    def _cover(self, start: float, end: float, level: int, total: np.ndarray) -> int:
+        """
+        Add the buckets covering [start, end) to total.
+
+        Whole buckets of this resolution are used where they fit; the edges
+        go to the next finer resolution, or are rounded out to this one when
+        the finer buckets are no longer retained.
+
+        Returns:
+            Buckets read
+        """
+        names = list(RESOLUTIONS)
+        name = names[level]
+        seconds = RESOLUTIONS[name]
+        table = self._tables[name]
+        finest = level == len(names) - 1 or self._oldest(names[level + 1]) > start
+
+        if finest:
+            first, last = math.floor(start / seconds) * seconds, math.ceil(end / seconds) * seconds
+        else:
+            first, last = math.ceil(start / seconds) * seconds, math.floor(end / seconds) * seconds
+
+        read = 0
+        for bucket_start in range(int(first), int(last), seconds):
+            bucket = table.get(bucket_start)
+            if bucket is not None:
+                total += bucket
+                read += 1
+
+        if not finest:
+            if first >= last:
+                return read + self._cover(start, end, level + 1, total)
+            read += self._cover(start, first, level + 1, total) if start < first else 0
+            read += self._cover(last, end, level + 1, total) if last < end else 0
+        return read
+
+    def _describe(self, values: np.ndarray) -> Dict[str, Any]:
+        """Report fields of summed bucket counters."""
+        counts = {name: float(values[i]) for name, i in _COLUMN.items()}
+        predictions = counts['predictions']
+        checks = counts['performance_checks']
+        histogram = values[len(FIELDS):]
+        return {
+            'predictions': int(predictions),
+            'predicted_fraud': int(counts['predicted_fraud']),
+            'mean_score': counts['score_sum'] / predictions if predictions else 0.0,
+            'score_histogram': {
+                'edges': np.linspace(0, 1, self.score_bins + 1).round(6).tolist(),
+                'counts': histogram.astype(int).tolist()
+            },
+            'alerts': int(counts['alerts']),
+            'alerts_high': int(counts['alerts_high']),
+            'alerts_critical': int(counts['alerts_critical']),
+            'drift_checks': int(counts['drift_checks']),
+            'drift_detected_count': int(counts['drift_detected']),
+            'avg_precision': counts['precision_sum'] / checks if checks else 0,
+            'avg_recall': counts['recall_sum'] / checks if checks else 0
+        }
+
+    def summary(self, start: Optional[float] = None, end: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Aggregate counters over [start, end).
+
+        Args:
+            start: Unix time (default: oldest retained day)
+            end: Unix time (default: now)
+
+        Returns:
+            Counts, mean score, score histogram, alert and drift counts and
+            average precision/recall of the range
+        """
+        if start is None:
+            start = min(self._oldest('day'), time.time())
+        if end is None:
+            end = time.time()
+
+        total = np.zeros(self.width)
+        read = self._cover(start, end, 0, total) if start < end else 0
+        return {'start': start, 'end': end, 'buckets_read': read, **self._describe(total)}
+
+    def series(self, resolution: str, start: float, end: float) -> List[Dict[str, Any]]:
+        """Per-bucket counters of one resolution within [start, end), oldest first."""
+        table = self._tables[resolution]
+        return [
+            {'start': bucket_start, **self._describe(np.array(table[bucket_start]))}
+            for bucket_start in sorted(table) if start <= bucket_start < end
+        ]
+
+    def save(self) -> None:
+        """Snapshot every table to path atomically."""
+        if self.path is None:
+            return
+        arrays: Dict[str, np.ndarray] = {
+            'version': np.array(ROLLUP_VERSION),
+            'fields': np.array(FIELDS),
+            'score_bins': np.array(self.score_bins)
+        }
+        for name, table in self._tables.items():
+            starts = sorted(table)
+            arrays[f'{name}_starts'] = np.array(starts, dtype=np.int64)
+            arrays[f'{name}_values'] = (
+                np.array([table[s] for s in starts]) if starts else np.zeros((0, self.width))
+            )
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(self.path.name + '.tmp')
+        with open(tmp_path, 'wb') as f:
+            np.savez(f, **arrays)
+        os.replace(tmp_path, self.path)
+        self._last_save = time.monotonic()
+
+    def load(self) -> None:
+        """Replace the tables with the snapshot at path."""
+        with np.load(self.path, allow_pickle=False) as data:
+            if int(data['version']) != ROLLUP_VERSION or tuple(data['fields']) != FIELDS:
+                raise ValueError(f"Unsupported rollup snapshot {self.path}")
+            if int(data['score_bins']) != self.score_bins:
+                raise ValueError(
+                    f"Rollup snapshot {self.path} has {int(data['score_bins'])} score bins, "
+                    f"expected {self.score_bins}"
+                )
+            for name in RESOLUTIONS:
+                self._tables[name] = {
+                    int(start): values.tolist()
+                    for start, values in zip(data[f'{name}_starts'], data[f'{name}_values'])
+                }
@@ -0,0 +1,91 @@
+"""
+Feature engineering scaling benchmark.
+Runs FeatureEngineer.fit_transform on a synthetic frame with 1 to N worker
+processes, checks every parallel result against the single-process one and
+reports wall time, throughput and speedup per worker count.
+"""
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.features.feature_engineer import FeatureEngineer
+
+
+def make_frame(n_rows: int, seed: int = 42) -> pd.DataFrame:
+    """Synthetic raw transactions with the columns the feature pipeline reads."""
+    rng = np.random.default_rng(seed)
+    amounts = np.clip(rng.lognormal(3.5, 1.5, n_rows), 0.15, 20000)
+    return pd.DataFrame({
+        'timestamp': np.datetime64('2023-01-01', 'ns') + (np.arange(n_rows) * 300).astype('timedelta64[s]'),
+        'amount': amounts,
+        'merchant_category': pd.Categorical.from_codes(
+            rng.integers(0, 6, n_rows), ['food', 'gas', 'retail', 'entertainment', 'travel', 'online']
+        ),
+        'card_present': rng.integers(0, 2, n_rows),
+        'distance_from_home': rng.gamma(2, 25, n_rows),
+        'distance_from_last_transaction': rng.gamma(2, 15, n_rows),
+        'time_since_last_transaction': rng.gamma(2, 60, n_rows),
+        'avg_transaction_amount_30d': amounts * rng.uniform(0.3, 1.5, n_rows),
+        'num_transactions_24h': rng.poisson(3, n_rows),
+        'num_transactions_7d': rng.poisson(15, n_rows)
+    })
+
+
+def main():
+    """Run the feature engineering scaling benchmark."""
+    parser = argparse.ArgumentParser(description='Benchmark parallel feature engineering')
+    parser.add_argument('--rows', type=int, default=10000000, help='Synthetic transactions to engineer')
+    parser.add_argument(
+        '--jobs', default=None,
+        help='Comma-separated worker counts (default: powers of two up to every CPU)'
+    )
+    parser.add_argument('--repeat', type=int, default=3, help='Timed runs per worker count (best is reported)')
+    args = parser.parse_args()
+
+    cpus = os.cpu_count() or 1
+    if args.jobs:
+        jobs = [int(n) for n in args.jobs.split(',')]
+    else:
+        jobs = sorted({min(2 ** i, cpus) for i in range(cpus.bit_length() + 1)})
+
+    print("="*70)
+    print("FEATURE ENGINEERING SCALING BENCHMARK")
+    print("="*70)
+    print(f"{args.rows} rows, {cpus} CPUs")
+
+    df = make_frame(args.rows)
+    baseline = None
+    serial_seconds = None
+
+    print(f"\n   {'workers':>8}{'seconds':>10}{'M rows/s':>10}{'speedup':>10}")
+    for n_jobs in jobs:
+        engineer = FeatureEngineer(n_jobs=n_jobs)
+        best = float('inf')
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            result = engineer.fit_transform(df)
+            best = min(best, time.perf_counter() - start)
+
+        if baseline is None:
+            baseline = FeatureEngineer(n_jobs=1).fit_transform(df) if n_jobs != 1 else result
+            serial_seconds = best if n_jobs == 1 else None
+        pd.testing.assert_frame_equal(result, baseline)
+        del result
+
+        speedup = f"{serial_seconds / best:.2f}x" if serial_seconds else '-'
+        print(f"   {n_jobs:>8}{best:>10.2f}{args.rows / best / 1e6:>10.2f}{speedup:>10}")
+
+    print("\nEvery parallel result matches the single-process output")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+"""
+Feature engineering benchmark.
+Compares the compiled FeaturePipeline with the previous pandas
+implementation (one DataFrame copy per feature group, string bins) on a
+training-size frame and on single rows, and checks that both produce the
+same features.
+"""
+
+import argparse
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.features.feature_pipeline import FeaturePipeline
+
+
+def legacy_fit_transform(df: pd.DataFrame) -> pd.DataFrame:
+    """Previous FeatureEngineer.fit_transform, kept as the baseline."""
+    df = df.copy()
+    df['amount_log'] = np.log1p(df['amount'])
+    df['amount_category'] = pd.cut(
+        df['amount'], bins=[0, 50, 200, 1000, np.inf],
+        labels=['very_low', 'low', 'medium', 'high']
+    ).astype(str)
+    df['amount_to_avg_ratio'] = df['amount'] / (df['avg_transaction_amount_30d'] + 1e-5)
+
+    df = df.copy()
+    if not pd.api.types.is_datetime64_any_dtype(df['timestamp']):
+        df['timestamp'] = pd.to_datetime(df['timestamp'])
+    df['hour'] = df['timestamp'].dt.hour
+    df['day_of_week'] = df['timestamp'].dt.dayofweek
+    df['day_of_month'] = df['timestamp'].dt.day
+    df['is_weekend'] = (df['day_of_week'] >= 5).astype(int)
+    df['time_of_day'] = pd.cut(
+        df['hour'], bins=[0, 6, 12, 18, 24],
+        labels=['night', 'morning', 'afternoon', 'evening']
+    ).astype(str)
+    df['is_peak_hour'] = df['hour'].isin([8, 9, 10, 17, 18, 19]).astype(int)
+
+    df = df.copy()
+    df['is_high_frequency_24h'] = (df['num_transactions_24h'] > 5).astype(int)
+    df['is_high_frequency_7d'] = (df['num_transactions_7d'] > 20).astype(int)
+    df['time_since_last_cat'] = pd.cut(
+        df['time_since_last_transaction'], bins=[0, 10, 60, 300, np.inf],
+        labels=['recent', 'normal', 'long_gap', 'very_long']
+    ).astype(str)
+
+    df = df.copy()
+    df['distance_home_cat'] = pd.cut(
+        df['distance_from_home'], bins=[0, 10, 50, 200, np.inf],
+        labels=['very_close', 'close', 'medium', 'far']
+    ).astype(str)
+    df['is_far_from_home'] = (df['distance_from_home'] > 100).astype(int)
+    df['is_far_from_last'] = (df['distance_from_last_transaction'] > 50).astype(int)
+
+    df = df.copy()
+    df['risk_score'] = (
+        (df['amount'] > 1000).astype(int) * 2 +
+        (df['card_present'] == 0).astype(int) +
+        (df['distance_from_home'] > 100).astype(int) +
+        (df['num_transactions_24h'] > 5).astype(int) +
+        (df.get('is_weekend', 0) * 0.5).astype(int) +
+        (df.get('is_peak_hour', 0) == 0).astype(int)
+    )
+    return df
+
+
+def make_transactions(n_rows: int, seed: int = 42) -> pd.DataFrame:
+    """Synthetic transactions including bin edges and out-of-range values."""
+    rng = np.random.default_rng(seed)
+    amount = np.round(rng.lognormal(4, 1.5, n_rows), 2)
+    amount[::97] = 0.0
+    amount[1::97] = 50.0
+    start = datetime(2024, 1, 1)
+
+    return pd.DataFrame({
+        'transaction_id': np.arange(n_rows),
+        'timestamp': [start + timedelta(minutes=int(m)) for m in rng.integers(0, 60 * 24 * 60, n_rows)],
+        'amount': amount,
+        'merchant_category': rng.choice(['online', 'food', 'travel', 'retail'], n_rows),
+        'card_present': rng.integers(0, 2, n_rows),
+        'transaction_type': rng.choice(['purchase', 'refund', 'withdrawal'], n_rows),
+        'distance_from_home': np.round(rng.exponential(60, n_rows), 1),
+        'distance_from_last_transaction': np.round(rng.exponential(30, n_rows), 1),
+        'time_since_last_transaction': np.round(rng.exponential(120, n_rows)),
+        'customer_age': rng.integers(18, 90, n_rows),
+        'customer_tenure_days': rng.integers(0, 5000, n_rows),
+        'avg_transaction_amount_30d': np.round(rng.lognormal(4, 1, n_rows), 2),
+        'num_transactions_24h': rng.integers(0, 12, n_rows),
+        'num_transactions_7d': rng.integers(0, 40, n_rows)
+    })
+
+
+def timed(fn, runs: int) -> float:
+    """Median wall time of fn over several runs."""
+    durations = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        durations.append(time.perf_counter() - start)
+    return statistics.median(durations)
+
+
+def check_parity(expected: pd.DataFrame, actual: pd.DataFrame, features: list) -> list:
+    """Names of features whose values differ between the two implementations."""
+    mismatched = []
+    for name in features:
+        left, right = expected[name].to_numpy(), actual[name].to_numpy()
+        if left.dtype == object or right.dtype == object:
+            same = np.array_equal(left.astype(str), right.astype(str))
+        else:
+            same = np.allclose(left.astype(float), right.astype(float), equal_nan=True)
+        if not same:
+            mismatched.append(name)
+    return mismatched
+
+
+def main():
+    """Run the feature engineering benchmark."""
+    parser = argparse.ArgumentParser(description='Benchmark feature engineering')
+    parser.add_argument('--rows', type=int, default=100000, help='Rows in the batch benchmark')
+    parser.add_argument('--runs', type=int, default=5, help='Repetitions per measurement')
+    parser.add_argument('--single', type=int, default=1000, help='Single-row transformations to time')
+    args = parser.parse_args()
+
+    print("="*70)
+    print("FEATURE ENGINEERING BENCHMARK")
+    print("="*70)
+
+    pipeline = FeaturePipeline()
+    df = make_transactions(args.rows)
+
+    expected, actual = legacy_fit_transform(df), pipeline.transform_frame(df)
+    mismatched = check_parity(expected, actual, pipeline.output_names)
+    print(f"Parity on {args.rows} rows: {'OK' if not mismatched else 'MISMATCH ' + str(mismatched)}")
+
+    binned = list(pipeline.binned_features)
+    legacy_bytes = expected[binned].memory_usage(deep=True, index=False).sum()
+    compiled_bytes = actual[binned].memory_usage(deep=True, index=False).sum()
+    print(f"Binned feature memory: strings {legacy_bytes / 1e6:.1f} MB, "
+          f"int8 categoricals {compiled_bytes / 1e6:.1f} MB")
+
+    legacy = timed(lambda: legacy_fit_transform(df), args.runs)
+    compiled = timed(lambda: pipeline.transform_frame(df), args.runs)
+    print(f"\nBatch ({args.rows} rows, median of {args.runs}):")
+    print(f"   pandas per-group copies   {legacy*1000:9.1f} ms")
+    print(f"   compiled pipeline         {compiled*1000:9.1f} ms   ({legacy / compiled:.1f}x)")
+
+    rows = df.head(args.single)
+    records = rows.to_dict('records')
+    legacy_single = timed(lambda: [legacy_fit_transform(rows.iloc[[i]]) for i in range(len(rows))], 1)
+    compiled_single = timed(
+        lambda: [pipeline.transform_record(record, record['timestamp'].to_pydatetime()) for record in records], 1
+    )
+    print(f"\nSingle row (mean of {len(records)}):")
+    print(f"   pandas per-group copies   {legacy_single / len(records) * 1e6:9.1f} us")
+    print(f"   compiled pipeline         {compiled_single / len(records) * 1e6:9.1f} us   "
+          f"({legacy_single / compiled_single:.0f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Training memory benchmark.
+Runs extraction, feature engineering, preprocessing, splitting, SMOTE and
+model fitting on synthetic data with default (int64/float64) and compact
+(int8/float32) dtypes, each in a fresh process, and reports peak RSS,
+feature matrix size and validation ROC-AUC.
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.parent
+
+# Runs inside a fresh interpreter so peak RSS covers one mode only
+PROBE_SCRIPT = """
+import json, resource, sys, time
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.metrics import roc_auc_score
+from src.data.data_extractor import DataExtractor
+from src.data.data_splitter import DataSplitter
+from src.features.feature_engineer import FeatureEngineer
+from src.features.preprocessor import DataPreprocessor
+
+compact, n_rows = %s, %d
+
+def peak_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+stages = {'imports': peak_mb()}
+start = time.perf_counter()
+raw = DataExtractor(compact_dtypes=compact)._generate_synthetic_data(n_samples=n_rows)
+stages['extract'] = peak_mb()
+engineered = FeatureEngineer(compact_dtypes=compact).fit_transform(raw)
+del raw
+stages['features'] = peak_mb()
+preprocessor = DataPreprocessor(target_col='is_fraud', compact_dtypes=compact)
+X, y = preprocessor.fit_transform(engineered)
+del engineered
+stages['preprocess'] = peak_mb()
+splitter = DataSplitter()
+splits = splitter.split_data(X, y)
+X_train, y_train = splitter.apply_smote(splits['X_train'], splits['y_train'])
+stages['smote'] = peak_mb()
+model = RandomForestClassifier(n_estimators=20, max_depth=10, random_state=42, n_jobs=1)
+model.fit(X_train, y_train)
+stages['fit'] = peak_mb()
+
+print(json.dumps({
+    'stages': stages,
+    'seconds': time.perf_counter() - start,
+    'matrix_mb': X.memory_usage(index=False).sum() / 1e6,
+    'smote_matrix_mb': X_train.memory_usage(index=False).sum() / 1e6,
+    'dtypes': sorted({str(dtype) for dtype in X_train.dtypes}),
+    'roc_auc': roc_auc_score(splits['y_val'], model.predict_proba(splits['X_val'])[:, 1])
+}))
+"""
+
+
+def run_probe(compact: bool, n_rows: int) -> dict:
+    """Run the training stages in a fresh interpreter and parse its report."""
+    output = subprocess.run(
+        [sys.executable, '-c', PROBE_SCRIPT % (compact, n_rows)],
+        cwd=PROJECT_ROOT, capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    """Run the training memory benchmark."""
+    parser = argparse.ArgumentParser(description='Benchmark training memory with compact dtypes')
+    parser.add_argument('--rows', type=int, default=200000, help='Synthetic transactions to train on')
+    args = parser.parse_args()
+
+    print("="*70)
+    print("TRAINING MEMORY BENCHMARK")
+    print("="*70)
+
+    reports = {
+        'default': run_probe(False, args.rows),
+        'compact': run_probe(True, args.rows)
+    }
+
+    baseline = reports['default']['stages']['imports']
+    print(f"\nPeak RSS after each stage ({args.rows} rows, MB above import baseline):")
+    print(f"   {'stage':<12}{'default':>12}{'compact':>12}")
+    for stage in reports['default']['stages']:
+        if stage == 'imports':
+            continue
+        row = [reports[mode]['stages'][stage] - reports[mode]['stages']['imports'] for mode in reports]
+        print(f"   {stage:<12}{row[0]:>12.1f}{row[1]:>12.1f}")
+
+    default_peak = reports['default']['stages']['fit'] - baseline
+    compact_peak = reports['compact']['stages']['fit'] - reports['compact']['stages']['imports']
+    print(f"\nPeak reduction: {1 - compact_peak / default_peak:.0%}")
+
+    for mode, report in reports.items():
+        print(f"\n{mode}:")
+        print(f"   Feature matrix        {report['matrix_mb']:8.1f} MB")
+        print(f"   After SMOTE           {report['smote_matrix_mb']:8.1f} MB   {', '.join(report['dtypes'])}")
+        print(f"   Validation ROC-AUC    {report['roc_auc']:8.4f}")
+        print(f"   Wall time             {report['seconds']:8.1f} s")
+
+
+if __name__ == "__main__":
+    main()
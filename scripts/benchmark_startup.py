@@ -0,0 +1,84 @@
+"""
+API startup benchmark.
+Measures import time and time-to-ready of the fraud detection API in fresh
+processes, plus the per-stage model load timings reported by /ready.
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.parent
+
+# Runs inside a fresh interpreter so every measurement is a cold start
+PROBE_SCRIPT = """
+import json, time
+start = time.perf_counter()
+import api.main as main
+imported = time.perf_counter()
+from fastapi.testclient import TestClient
+with TestClient(main.app) as client:
+    while True:
+        response = client.get('/ready')
+        if response.status_code == 200:
+            break
+        if main.app.state.model_loader.done():
+            raise SystemExit('Model failed to load: ' + str(main.registry.last_error))
+        time.sleep(0.005)
+    ready = time.perf_counter()
+    client.post('/predict', json=%s)
+    first_request = time.perf_counter()
+print(json.dumps({
+    'import_seconds': imported - start,
+    'time_to_ready_seconds': ready - start,
+    'first_request_seconds': first_request - ready,
+    'load_timings': response.json()['load_timings']
+}))
+"""
+
+SAMPLE_TRANSACTION = {
+    'amount': 500.0, 'merchant_category': 'online', 'card_present': 0,
+    'transaction_type': 'purchase', 'distance_from_home': 150.0,
+    'distance_from_last_transaction': 50.0, 'time_since_last_transaction': 10.0,
+    'customer_age': 35, 'customer_tenure_days': 1000,
+    'avg_transaction_amount_30d': 100.0, 'num_transactions_24h': 5, 'num_transactions_7d': 20
+}
+
+
+def run_probe() -> dict:
+    """Start the API in a fresh interpreter and measure its startup."""
+    result = subprocess.run(
+        [sys.executable, '-c', PROBE_SCRIPT % repr(SAMPLE_TRANSACTION)],
+        cwd=PROJECT_ROOT, capture_output=True, text=True, check=True
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    """Run the startup benchmark."""
+    parser = argparse.ArgumentParser(description='Benchmark API cold start')
+    parser.add_argument('--runs', type=int, default=5, help='Number of cold starts to measure')
+    args = parser.parse_args()
+
+    print("="*70)
+    print("FRAUD DETECTION API - STARTUP BENCHMARK")
+    print("="*70)
+
+    runs = [run_probe() for _ in range(args.runs)]
+
+    for metric in ['import_seconds', 'time_to_ready_seconds', 'first_request_seconds']:
+        values = [run[metric] for run in runs]
+        print(f"{metric:<24} median {statistics.median(values)*1000:8.1f} ms   "
+              f"max {max(values)*1000:8.1f} ms")
+
+    print("\nModel load stages (median):")
+    for stage in runs[0]['load_timings']:
+        values = [run['load_timings'][stage] for run in runs]
+        print(f"   {stage:<10} {statistics.median(values)*1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
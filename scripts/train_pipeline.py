@@ -3,6 +3,7 @@ Complete training pipeline script.
 Executes the full ML pipeline from data extraction to model saving.
 """
 
+import argparse
 import sys
 from pathlib import Path
 
@@ -14,82 +15,303 @@ from src.data.data_explorer import DataExplorer
 from src.features.feature_engineer import FeatureEngineer
 from src.features.preprocessor import DataPreprocessor
 from src.data.data_splitter import DataSplitter
+from src.data.partitioned_dataset import PartitionedDataset
+from src.features.feature_pipeline import FeaturePipeline
+from src.features.preprocessor_artifact import PreprocessorArtifact
 from src.models.trainer import ModelTrainer
+from src.utils import dtypes
+from src.utils.config import load_config, get_section
+from src.utils.stage_cache import StageCache, code_fingerprint, hash_file
+from monitoring.baseline_profile import BaselineProfile, artifact_version
+from typing import Any, Mapping
 import os
+import pandas as pd
 from dotenv import load_dotenv
 
+SOURCE_PATH = 'data/fraud_dataset.csv'
+PREPROCESSOR_PATH = 'models/saved_models/fraud_preprocessor.prep'
+MODEL_PATH = 'models/saved_models/best_model.pkl'
+BASELINE_PROFILE_PATH = 'models/saved_models/baseline_profile.npz'
 
-def main():
-    """Execute complete training pipeline."""
-    
-    # Load environment variables
-    load_dotenv()
-    
-    print("="*70)
-    print("BANK ANTI-FRAUD - TRAINING PIPELINE")
-    print("="*70)
-    
-    # Phase 0: Data Extraction
-    print("\n📥 PHASE 0: Data Extraction")
-    extractor = DataExtractor(
-        api_key=os.getenv('API_AIRTABLE', 'simulated'),
-        base_id=os.getenv('AIRTABLE_BASE_ID'),
-        table_name=os.getenv('AIRTABLE_TABLE_NAME', 'FraudBank')
-    )
-    
+# Columns every training dataset must provide
+REQUIRED_COLUMNS = ['amount', 'merchant_category', 'transaction_type', 'is_fraud']
+
+SPLITS = ('train', 'val', 'test')
+
+# Rows generated when no usable source dataset exists
+SYNTHETIC_ROWS = 10000
+
+SPLIT_CONFIG = {'test_size': 0.2, 'val_size': 0.2, 'random_state': 42}
+SMOTE_CONFIG = {'sampling_strategy': 0.3}
+
+# Cached stages of the in-memory pipeline, in execution order
+STAGES = ('extract', 'eda', 'features', 'preprocess', 'split', 'smote')
+
+
+def extract_stage(extractor: DataExtractor) -> dict:
+    """Load the source dataset (or a synthetic one) and keep a raw copy."""
     # Try to load existing data, but validate it has required columns
-    required_cols = ['amount', 'merchant_category', 'transaction_type', 'is_fraud']
-    
     try:
-        raw_data = extractor.extract_from_source(source_path='data/fraud_dataset.csv')
+        raw_data = extractor.extract_from_source(source_path=SOURCE_PATH)
         
         # Validate columns
-        missing_cols = [col for col in required_cols if col not in raw_data.columns]
+        missing_cols = [col for col in REQUIRED_COLUMNS if col not in raw_data.columns]
         if missing_cols:
             print(f"⚠️  Local dataset missing required columns: {missing_cols}")
             print("🔄 Generating synthetic dataset with all required features...")
-            raw_data = extractor._generate_synthetic_data(n_samples=10000)
+            raw_data = extractor._generate_synthetic_data(n_samples=SYNTHETIC_ROWS)
     except Exception as e:
         print(f"⚠️  Error loading data: {e}")
         print("🔄 Generating synthetic dataset...")
-        raw_data = extractor._generate_synthetic_data(n_samples=10000)
+        raw_data = extractor._generate_synthetic_data(n_samples=SYNTHETIC_ROWS)
     
     extractor.save_raw_data(raw_data, filename='raw_fraud_transactions.csv')
+    return {'raw_data': raw_data}
+
+
+def eda_stage(raw_data: pd.DataFrame) -> dict:
+    """Summarize the raw dataset."""
+    explorer = DataExplorer(raw_data, target_col='is_fraud')
+    return {'summary': explorer.generate_summary_report()}
+
+
+def features_stage(engineer: FeatureEngineer, raw_data: pd.DataFrame) -> dict:
+    """Add the engineered features."""
+    data_engineered = engineer.fit_transform(raw_data)
+    print(f"Features after engineering: {len(data_engineered.columns)}")
+    return {'data_engineered': data_engineered}
+
+
+def preprocess_stage(args, engineer: FeatureEngineer, data_engineered: pd.DataFrame) -> dict:
+    """Fit the preprocessor, save it and transform the data."""
+    preprocessor = DataPreprocessor(target_col='is_fraud', compact_dtypes=args.compact_dtypes)
+    preprocessor.feature_config = engineer.pipeline.config
+    X_processed, y = preprocessor.fit_transform(data_engineered)
+    print(f"Feature matrix memory: {X_processed.memory_usage(index=False).sum() / 1e6:.1f} MB")
+    preprocessor.save_preprocessor(PREPROCESSOR_PATH)
+    return {'X': X_processed, 'y': y, 'preprocessor': Path(PREPROCESSOR_PATH)}
+
+
+def split_stage(X: pd.DataFrame, y: pd.Series) -> dict:
+    """Split into train, validation and test sets."""
+    return DataSplitter(**SPLIT_CONFIG).split_data(X, y)
+
+
+def smote_stage(splits: Mapping[str, Any]) -> dict:
+    """Oversample the training set and save every split."""
+    splitter = DataSplitter(**SPLIT_CONFIG)
+    balanced = {name: splits[name] for name in splits}
+    balanced['X_train'], balanced['y_train'] = splitter.apply_smote(
+        splits['X_train'],
+        splits['y_train'],
+        **SMOTE_CONFIG
+    )
+    splitter.save_splits(balanced)
+    return {'X_train': balanced['X_train'], 'y_train': balanced['y_train']}
+
+
+def prepare_in_memory(args, extractor: DataExtractor, cache: StageCache) -> dict:
+    """
+    Load the whole dataset, then engineer, preprocess, split and oversample it.
+    
+    Every phase is a cached stage: it is skipped when its upstream stages,
+    config and code are unchanged since a previous run, and its outputs
+    are only read from the cache if a later stage needs them.
+    """
+    source = hash_file(SOURCE_PATH) if Path(SOURCE_PATH).exists() else 'no-source'
+    extracted = cache.run(
+        'extract', lambda: extract_stage(extractor),
+        inputs=[source],
+        config={'source': SOURCE_PATH, 'synthetic_rows': SYNTHETIC_ROWS, 'compact_dtypes': args.compact_dtypes},
+        code=code_fingerprint(DataExtractor, dtypes, extract_stage)
+    )
     
     # Phase 1: EDA
     print("\n🔍 PHASE 1: Exploratory Data Analysis")
-    explorer = DataExplorer(raw_data, target_col='is_fraud')
-    summary = explorer.generate_summary_report()
-    print(f"Dataset shape: {summary['shape']}")
+    explored = cache.run(
+        'eda', lambda: eda_stage(extracted['raw_data']),
+        inputs=[extracted.key],
+        code=code_fingerprint(DataExplorer, eda_stage)
+    )
+    summary = explored['summary']
+    print(f"Dataset shape: {tuple(summary['shape'])}")
     print(f"Fraud rate: {summary.get('imbalance_ratio', 'N/A')}")
     
     # Phase 3: Feature Engineering
     print("\n🔧 PHASE 3: Feature Engineering")
-    engineer = FeatureEngineer()
-    data_engineered = engineer.fit_transform(raw_data)
-    print(f"Features after engineering: {len(data_engineered.columns)}")
+    engineer = FeatureEngineer(compact_dtypes=args.compact_dtypes, n_jobs=args.feature_jobs)
+    engineered = cache.run(
+        'features', lambda: features_stage(engineer, extracted['raw_data']),
+        inputs=[extracted.key],
+        config={'features': engineer.pipeline.config, 'compact_dtypes': args.compact_dtypes},
+        code=code_fingerprint(FeatureEngineer, FeaturePipeline, dtypes, features_stage)
+    )
     
     # Phase 3: Preprocessing
     print("\n⚙️  PHASE 3: Data Preprocessing")
-    preprocessor = DataPreprocessor(target_col='is_fraud')
-    X_processed, y = preprocessor.fit_transform(data_engineered)
-    preprocessor.save_preprocessor('models/saved_models/fraud_preprocessor.pkl')
+    preprocessed = cache.run(
+        'preprocess', lambda: preprocess_stage(args, engineer, engineered['data_engineered']),
+        inputs=[engineered.key],
+        config={'features': engineer.pipeline.config, 'compact_dtypes': args.compact_dtypes},
+        code=code_fingerprint(DataPreprocessor, PreprocessorArtifact, dtypes, preprocess_stage)
+    )
     
     # Phase 4: Data Split
     print("\n✂️  PHASE 4: Data Split & SMOTE")
-    splitter = DataSplitter(test_size=0.2, val_size=0.2, random_state=42)
-    splits = splitter.split_data(X_processed, y)
+    split = cache.run(
+        'split', lambda: split_stage(preprocessed['X'], preprocessed['y']),
+        inputs=[preprocessed.key],
+        config=SPLIT_CONFIG,
+        code=code_fingerprint(DataSplitter, split_stage)
+    )
     
     # Apply SMOTE to training data
-    X_train_balanced, y_train_balanced = splitter.apply_smote(
+    balanced = cache.run(
+        'smote', lambda: smote_stage(split),
+        inputs=[split.key],
+        config={**SPLIT_CONFIG, **SMOTE_CONFIG},
+        code=code_fingerprint(DataSplitter, smote_stage)
+    )
+    
+    splits = {name: split[name] for name in split if name not in ('X_train', 'y_train')}
+    splits['X_reference'] = split['X_train']
+    splits['X_train'] = balanced['X_train']
+    splits['y_train'] = balanced['y_train']
+    return splits
+
+
+def prepare_chunked(args, extractor: DataExtractor) -> dict:
+    """
+    Stream the source in chunks and build the splits out of core.
+    
+    Pass 1 fits the preprocessor chunk by chunk (scaler partial_fit,
+    accumulated vocabularies); pass 2 transforms every chunk, assigns its
+    rows to train/val/test and writes them as Parquet partitions. Only
+    the transformed splits are read back for SMOTE and model fitting.
+    """
+    # Same fallback as the in-memory path: stream a synthetic CSV instead
+    source_path = SOURCE_PATH
+    if not Path(source_path).exists():
+        print(f"⚠️  {source_path} not found")
+        source_path = None
+    else:
+        missing_cols = [col for col in REQUIRED_COLUMNS if col not in pd.read_csv(source_path, nrows=0).columns]
+        if missing_cols:
+            print(f"⚠️  Local dataset missing required columns: {missing_cols}")
+            source_path = None
+    
+    if source_path is None:
+        print("🔄 Generating synthetic dataset with all required features...")
+        source_path = extractor.save_raw_data(
+            extractor._generate_synthetic_data(n_samples=SYNTHETIC_ROWS), filename='raw_fraud_transactions.csv'
+        )
+    
+    engineer = FeatureEngineer(compact_dtypes=args.compact_dtypes, n_jobs=args.feature_jobs)
+    preprocessor = DataPreprocessor(target_col='is_fraud', compact_dtypes=args.compact_dtypes)
+    preprocessor.feature_config = engineer.pipeline.config
+    splitter = DataSplitter(**SPLIT_CONFIG)
+    dataset = PartitionedDataset(args.partitions_dir)
+    
+    # Pass 1: fit the preprocessor incrementally
+    print(f"\n🔧 PHASE 3: Feature Engineering & Preprocessing (chunks of {args.chunk_size} rows)")
+    n_rows = 0
+    for chunk in extractor.iter_chunks(source_path, chunksize=args.chunk_size):
+        preprocessor.partial_fit(engineer.fit_transform(chunk))
+        n_rows += len(chunk)
+    print(f"Fitted preprocessor on {n_rows} rows")
+    
+    # Pass 2: transform, split and write partitions
+    dataset.clear()
+    for index, chunk in enumerate(extractor.iter_chunks(source_path, chunksize=args.chunk_size)):
+        X_chunk, y_chunk = preprocessor.transform(engineer.fit_transform(chunk))
+        if index == 0:
+            preprocessor.feature_dtypes = {col: str(dtype) for col, dtype in X_chunk.dtypes.items()}
+        labels = splitter.split_labels(y_chunk, chunk_index=index)
+        for split in SPLITS:
+            rows = labels == split
+            dataset.write_partition(X_chunk[rows].assign(is_fraud=y_chunk.to_numpy()[rows]), split, index)
+    preprocessor.save_preprocessor(PREPROCESSOR_PATH)
+    print(f"💾 Partitions written to: {args.partitions_dir}")
+    
+    # Phase 4: read the splits back
+    print("\n✂️  PHASE 4: Data Split & SMOTE")
+    splits = {}
+    for split in SPLITS:
+        df = dataset.read(split)
+        splits[f'X_{split}'] = df.drop(columns=['is_fraud'])
+        splits[f'y_{split}'] = df['is_fraud']
+        print(f"   {split}: {len(df)} samples")
+    
+    splits['X_reference'] = splits['X_train']
+    splits['X_train'], splits['y_train'] = splitter.apply_smote(
         splits['X_train'],
         splits['y_train'],
-        sampling_strategy=0.3
+        **SMOTE_CONFIG
     )
-    splits['X_train'] = X_train_balanced
-    splits['y_train'] = y_train_balanced
+    return splits
+
+
+def main():
+    """Execute complete training pipeline."""
+    data_config = get_section(load_config(), 'data')
+    parser = argparse.ArgumentParser(description='Run the training pipeline')
+    parser.add_argument(
+        '--compact-dtypes', action=argparse.BooleanOptionalAction,
+        default=data_config.get('compact_dtypes', False),
+        help='Downcast to int8/float32 from extraction through model fitting (roughly halves peak memory)'
+    )
+    parser.add_argument(
+        '--chunk-size', type=int, default=data_config.get('chunk_size'),
+        help='Stream the source in chunks of this many rows and build the splits out of core'
+    )
+    parser.add_argument(
+        '--partitions-dir', default=data_config.get('partitions_dir', 'data/partitions'),
+        help='Where the chunked pipeline writes its Parquet partitions'
+    )
+    parser.add_argument(
+        '--feature-jobs', type=int, default=data_config.get('feature_jobs', 1),
+        help='Worker processes for feature engineering over row partitions (-1 uses every CPU)'
+    )
+    parser.add_argument(
+        '--stage-cache', action=argparse.BooleanOptionalAction,
+        default=data_config.get('stage_cache', True),
+        help='Skip data preparation stages whose inputs, config and code are unchanged'
+    )
+    parser.add_argument(
+        '--rerun-from', choices=STAGES, default=None,
+        help='Recompute this stage and every later one, ignoring cached outputs'
+    )
+    parser.add_argument(
+        '--cache-dir', default=data_config.get('stage_cache_dir', 'data/cache/stages'),
+        help='Where cached stage outputs are stored'
+    )
+    args = parser.parse_args()
     
-    splitter.save_splits(splits)
+    # Load environment variables
+    load_dotenv()
+    
+    print("="*70)
+    print("BANK ANTI-FRAUD - TRAINING PIPELINE")
+    print("="*70)
+    if args.compact_dtypes:
+        print("Compact dtypes: int8/float32 features")
+    
+    # Phase 0: Data Extraction
+    print("\n📥 PHASE 0: Data Extraction")
+    extractor = DataExtractor(
+        api_key=os.getenv('API_AIRTABLE', 'simulated'),
+        base_id=os.getenv('AIRTABLE_BASE_ID'),
+        table_name=os.getenv('AIRTABLE_TABLE_NAME', 'FraudBank'),
+        compact_dtypes=args.compact_dtypes
+    )
+    
+    if args.chunk_size:
+        splits = prepare_chunked(args, extractor)
+    else:
+        cache = StageCache(STAGES, root=args.cache_dir, enabled=args.stage_cache, rerun_from=args.rerun_from)
+        splits = prepare_in_memory(args, extractor, cache)
+        print("\n🗃️  Stage cache:")
+        print(cache.report())
     
     # Phase 5: Model Training
     print("\n🤖 PHASE 5: Model Training")
@@ -102,7 +324,18 @@ def main():
     )
     
     # Save best model
-    trainer.save_best_model(best_model_name)
+    trainer.save_best_model(best_model_name, filepath=MODEL_PATH)
+    
+    # Profile the training features (before oversampling) for monitoring
+    drift_config = get_section(load_config(), 'monitoring', 'drift')
+    profile = BaselineProfile.from_frame(
+        splits['X_reference'],
+        model_version=artifact_version(MODEL_PATH, PREPROCESSOR_PATH),
+        n_points=drift_config.get('sketch_points', 1024),
+        psi_bins=drift_config.get('psi_bins', 10)
+    )
+    profile.save(BASELINE_PROFILE_PATH)
+    print(f"💾 Baseline profile ({profile.model_version}) saved to: {BASELINE_PROFILE_PATH}")
     
     print("\n" + "="*70)
     print("🎉 TRAINING PIPELINE COMPLETED!")
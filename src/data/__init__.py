@@ -1,14 +1,28 @@
 """Data handling modules."""
 
-from .data_extractor import DataExtractor
-from .data_explorer import DataExplorer
-from .data_visualizer import DataVisualizer
-from .data_splitter import DataSplitter
+import importlib
+
+# Classes are imported on first access so that importing src.data does not
+# pull in heavy dependencies (e.g. matplotlib/seaborn via DataVisualizer)
+_LAZY_IMPORTS = {
+    'DataExtractor': '.data_extractor',
+    'DataExplorer': '.data_explorer',
+    'DataVisualizer': '.data_visualizer',
+    'DataSplitter': '.data_splitter',
+    'PartitionedDataset': '.partitioned_dataset'
+}
 
 __all__ = [
     'DataExtractor',
     'DataExplorer', 
     'DataVisualizer',
-    'DataSplitter'
+    'DataSplitter',
+    'PartitionedDataset'
 ]
 
+
+def __getattr__(name):
+    if name in _LAZY_IMPORTS:
+        module = importlib.import_module(_LAZY_IMPORTS[name], __name__)
+        return getattr(module, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -8,9 +8,10 @@ import requests
 import pandas as pd
 import numpy as np
 from pathlib import Path
-from typing import Tuple, Optional
+from typing import Iterator, Tuple, Optional
 from datetime import datetime, timedelta
 
+from ..utils.dtypes import downcast_frame
 from ..utils.logger import ProjectLogger
 
 
@@ -28,7 +29,8 @@ class DataExtractor:
         self, 
         api_key: str = "simulated_key",
         base_id: Optional[str] = None,
-        table_name: str = "FraudBank"
+        table_name: str = "FraudBank",
+        compact_dtypes: bool = False
     ):
         """
         Initialize data extractor.
@@ -37,10 +39,13 @@ class DataExtractor:
             api_key: Airtable API key
             base_id: Airtable base ID
             table_name: Airtable table name
+            compact_dtypes: Downcast numeric columns (int8/int16/int32, float32)
+                of every extracted dataset
         """
         self.api_key = api_key
         self.base_id = base_id
         self.table_name = table_name
+        self.compact_dtypes = compact_dtypes
         self.base_url = "https://api.airtable.com/v0"
         self.logger = ProjectLogger()
         
@@ -61,6 +66,17 @@ class DataExtractor:
         self.logger.error("❌ Authentication failed or API key is default/placeholder.")
         return False
     
+    def _apply_dtypes(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Downcast numeric columns when compact dtypes are enabled."""
+        if not self.compact_dtypes:
+            return df
+        
+        before = df.memory_usage(index=False).sum()
+        df = downcast_frame(df)
+        after = df.memory_usage(index=False).sum()
+        self.logger.info(f"Downcast numeric columns: {before / 1e6:.1f} MB -> {after / 1e6:.1f} MB")
+        return df
+    
     def _validate_data(self, df: pd.DataFrame, min_rows: int = 50) -> Tuple[bool, str]:
         """
         Validate extracted data meets quality requirements.
@@ -110,7 +126,7 @@ class DataExtractor:
             if not offset:
                 break
         
-        df = pd.DataFrame(all_records)
+        df = self._apply_dtypes(pd.DataFrame(all_records))
         self.logger.info(f"✅ Fetched {len(df)} records from Airtable")
         return df
     
@@ -192,7 +208,7 @@ class DataExtractor:
         self.logger.info(f"Generated data shape: {df.shape}")
         self.logger.info(f"Fraud rate: {fraud_percentage:.2f}%")
         
-        return df
+        return self._apply_dtypes(df)
     
     def extract_from_source(
         self, 
@@ -233,7 +249,7 @@ class DataExtractor:
         if source_path and Path(source_path).exists():
             try:
                 self.logger.info(f"📂 Loading data from local file: {source_path}")
-                df = pd.read_csv(source_path)
+                df = self._apply_dtypes(pd.read_csv(source_path))
                 is_valid, message = self._validate_data(df, min_rows=50)
                 
                 if is_valid:
@@ -255,6 +271,22 @@ class DataExtractor:
         else:
             raise RuntimeError(f"Synthetic data generation failed: {message}")
     
+    def iter_chunks(self, source_path: str, chunksize: int = 100000) -> Iterator[pd.DataFrame]:
+        """
+        Stream a local CSV file in fixed-size chunks.
+        
+        Args:
+            source_path: Path to local CSV file
+            chunksize: Rows per chunk
+            
+        Yields:
+            DataFrame per chunk (downcast when compact dtypes are enabled)
+        """
+        self.logger.info(f"📂 Streaming {source_path} in chunks of {chunksize} rows")
+        with pd.read_csv(source_path, chunksize=chunksize) as reader:
+            for chunk in reader:
+                yield self._apply_dtypes(chunk)
+    
     def save_raw_data(self, df: pd.DataFrame, filename: Optional[str] = None) -> str:
         """
         Save extracted data to raw data directory.
@@ -88,6 +88,36 @@ class DataSplitter:
         
         return splits
     
+    def split_labels(self, y: pd.Series, chunk_index: int = 0) -> np.ndarray:
+        """
+        Assign rows of one chunk to the train/validation/test sets.
+        
+        Used by the chunked pipeline, where split_data cannot see the whole
+        dataset: each class is shuffled and cut in the configured
+        proportions, so every chunk (and therefore the whole dataset) is
+        stratified. The assignment is reproducible per chunk index.
+        
+        Args:
+            y: Target values of the chunk
+            chunk_index: Position of the chunk in the source
+            
+        Returns:
+            Array of 'train', 'val' or 'test' per row
+        """
+        rng = np.random.default_rng([self.random_state, chunk_index])
+        y = np.asarray(y)
+        labels = np.empty(len(y), dtype=object)
+        
+        for cls in np.unique(y):
+            rows = rng.permutation(np.flatnonzero(y == cls))
+            n_test = round(len(rows) * self.test_size)
+            n_val = round(len(rows) * self.val_size)
+            labels[rows[:n_test]] = 'test'
+            labels[rows[n_test:n_test + n_val]] = 'val'
+            labels[rows[n_test + n_val:]] = 'train'
+        
+        return labels
+    
     def apply_smote(
         self,
         X_train: pd.DataFrame,
@@ -119,9 +149,12 @@ class DataSplitter:
         
         X_resampled, y_resampled = smote.fit_resample(X_train, y_train)
         
-        # Convert back to DataFrame/Series
-        X_resampled = pd.DataFrame(X_resampled, columns=X_train.columns)
-        y_resampled = pd.Series(y_resampled, name=y_train.name)
+        # Convert back to DataFrame/Series, keeping the input dtypes (compact
+        # int8/float32 columns stay compact; interpolated codes are truncated)
+        X_resampled = pd.DataFrame(X_resampled, columns=X_train.columns).astype(
+            X_train.dtypes.to_dict(), copy=False
+        )
+        y_resampled = pd.Series(y_resampled, name=y_train.name).astype(y_train.dtype, copy=False)
         
         # Log results
         new_fraud = y_resampled.sum()
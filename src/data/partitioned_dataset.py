@@ -0,0 +1,108 @@
+"""
+Partitioned on-disk dataset.
+Stores transformed training data as one Parquet file per split and chunk,
+so out-of-core pipelines can write chunks as they are produced and
+training can read each split back (optionally only some columns).
+"""
+
+import shutil
+from pathlib import Path
+from typing import Iterator, List, Optional
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+from ..utils.logger import ProjectLogger
+
+
+class PartitionedDataset:
+    """Directory of Parquet partitions laid out as <root>/split=<name>/part-<index>.parquet."""
+
+    def __init__(self, root: str = 'data/partitions'):
+        """
+        Initialize dataset.
+
+        Args:
+            root: Dataset directory
+        """
+        if not HAS_PYARROW:
+            raise ImportError("Partitioned datasets require pyarrow, which is not installed")
+
+        self.root = Path(root)
+        self.logger = ProjectLogger()
+
+    def _split_dir(self, split: str) -> Path:
+        return self.root / f'split={split}'
+
+    def clear(self) -> None:
+        """Remove all partitions written by a previous run."""
+        for split_dir in self.root.glob('split=*'):
+            shutil.rmtree(split_dir)
+
+    def write_partition(self, df: pd.DataFrame, split: str, index: int) -> Path:
+        """
+        Write one chunk of a split.
+
+        Args:
+            df: Transformed rows (features and target)
+            split: Split name, e.g. 'train'
+            index: Chunk index (determines the file name and read order)
+
+        Returns:
+            Path of the written partition
+        """
+        split_dir = self._split_dir(split)
+        split_dir.mkdir(parents=True, exist_ok=True)
+        path = split_dir / f'part-{index:05d}.parquet'
+        pq.write_table(pa.Table.from_pandas(df, preserve_index=False), path)
+        return path
+
+    def partitions(self, split: str) -> List[Path]:
+        """Partition files of a split, in chunk order."""
+        return sorted(self._split_dir(split).glob('part-*.parquet'))
+
+    def iter_partitions(
+        self,
+        split: str,
+        columns: Optional[List[str]] = None
+    ) -> Iterator[pd.DataFrame]:
+        """
+        Read a split one partition at a time.
+
+        Args:
+            split: Split name
+            columns: Columns to read (all if None)
+
+        Yields:
+            One DataFrame per partition
+        """
+        for path in self.partitions(split):
+            yield pq.read_table(path, columns=columns).to_pandas()
+
+    def read(self, split: str, columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """
+        Read a whole split.
+
+        Partitions are concatenated with pandas, so integer columns that were
+        downcast to different widths per chunk are widened consistently.
+
+        Args:
+            split: Split name
+            columns: Columns to read (all if None)
+
+        Returns:
+            DataFrame with the rows of every partition
+        """
+        frames = list(self.iter_partitions(split, columns))
+        if not frames:
+            raise FileNotFoundError(f"No partitions for split '{split}' in {self.root}")
+
+        df = pd.concat(frames, ignore_index=True)
+        self.logger.info(f"Read {split} split: {len(df)} rows from {len(frames)} partitions")
+        return df
@@ -1,7 +1,21 @@
 """Feature engineering and preprocessing modules."""
 
-from .feature_engineer import FeatureEngineer
-from .preprocessor import DataPreprocessor
+import importlib
 
-__all__ = ['FeatureEngineer', 'DataPreprocessor']
+# Classes are imported on first access to keep package import cheap
+_LAZY_IMPORTS = {
+    'CustomerHistoryAggregator': '.customer_history',
+    'FeatureEngineer': '.feature_engineer',
+    'FeaturePipeline': '.feature_pipeline',
+    'DataPreprocessor': '.preprocessor',
+    'PreprocessorArtifact': '.preprocessor_artifact'
+}
 
+__all__ = ['CustomerHistoryAggregator', 'FeatureEngineer', 'FeaturePipeline', 'DataPreprocessor', 'PreprocessorArtifact']
+
+
+def __getattr__(name):
+    if name in _LAZY_IMPORTS:
+        module = importlib.import_module(_LAZY_IMPORTS[name], __name__)
+        return getattr(module, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
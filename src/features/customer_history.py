@@ -0,0 +1,206 @@
+"""
+Point-in-time customer history aggregates.
+Derives the velocity inputs (transaction counts over trailing windows,
+trailing average amount, time since the previous transaction) from a
+timestamped transaction log keyed by customer, for offline backfill.
+
+Every aggregate for a transaction only uses that customer's transactions
+strictly before it, so no label information leaks from the future. The
+log is sorted once per partition by (customer, time); window bounds are
+then found with binary search and window sums with a cumulative sum, so
+the cost is O(n log n) regardless of window sizes. Customers are split
+into partitions that are processed in parallel threads (numpy sorting and
+searching release the GIL).
+"""
+
+import copy
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Mapping, Optional
+
+import numpy as np
+
+from ..utils.config import get_section, load_config
+
+# empty_window_mean value that falls back to the transaction's own amount
+CURRENT_AMOUNT = 'current_amount'
+
+DEFAULT_HISTORY_CONFIG: Dict[str, Any] = {
+    # Output name -> trailing window in seconds, counted over [t - window, t)
+    'count_windows': {
+        'num_transactions_24h': 24 * 3600,
+        'num_transactions_7d': 7 * 24 * 3600
+    },
+    # Output name -> trailing window in seconds, mean amount over [t - window, t)
+    'mean_windows': {
+        'avg_transaction_amount_30d': 30 * 24 * 3600
+    },
+    # Gap to the previous transaction, in units of this many seconds (minutes)
+    'gap_feature': 'time_since_last_transaction',
+    'gap_unit_seconds': 60,
+    # Reported for a customer's first transaction (30 days, in gap units)
+    'first_transaction_gap': 30 * 24 * 60,
+    # Reported as the mean amount when a window holds no earlier transaction:
+    # CURRENT_AMOUNT uses the transaction's own amount (amount-to-average
+    # ratio 1), or a fixed number
+    'empty_window_mean': CURRENT_AMOUNT,
+    'n_jobs': -1,
+    'partitions_per_job': 4
+}
+
+# Timestamp resolutions tried for the sort key, finest first (divisors of ns)
+_RESOLUTIONS = (1, 1000, 1000000, 1000000000)
+
+_KEY_LIMIT = 2 ** 62
+
+
+class CustomerHistoryAggregator:
+    """Computes point-in-time per-customer rolling aggregates over a transaction log."""
+
+    def __init__(self, config: Optional[Mapping[str, Any]] = None):
+        """
+        Initialize aggregator.
+
+        Args:
+            config: `velocity_history:` config section; missing keys use DEFAULT_HISTORY_CONFIG
+        """
+        self.config = copy.deepcopy(DEFAULT_HISTORY_CONFIG)
+        self.config.update(config or {})
+
+        self.output_names = (
+            list(self.config['count_windows'])
+            + list(self.config['mean_windows'])
+            + [self.config['gap_feature']]
+        )
+
+    @classmethod
+    def from_config(cls, config_path: Optional[str] = None) -> 'CustomerHistoryAggregator':
+        """Build the aggregator from the `velocity_history:` section of the project config."""
+        return cls(get_section(load_config(config_path), 'velocity_history'))
+
+    def _n_jobs(self, n_jobs: Optional[int]) -> int:
+        n_jobs = self.config['n_jobs'] if n_jobs is None else n_jobs
+        if n_jobs is None or n_jobs < 1:
+            return os.cpu_count() or 1
+        return n_jobs
+
+    def transform(
+        self,
+        customers: Any,
+        timestamps: Any,
+        amounts: Any,
+        n_jobs: Optional[int] = None
+    ) -> Dict[str, np.ndarray]:
+        """
+        Compute the aggregates for every transaction of a log.
+
+        Args:
+            customers: Customer key per transaction (any hashable dtype)
+            timestamps: datetime64 array (naive, one time zone)
+            amounts: Transaction amounts
+            n_jobs: Worker threads (defaults to config; -1 uses every CPU)
+
+        Returns:
+            Mapping of feature name to array, in the input row order
+        """
+        import pandas as pd
+
+        timestamps = np.asarray(timestamps, dtype='datetime64[ns]')
+        if np.isnat(timestamps).any():
+            raise ValueError("Transaction log contains missing timestamps")
+
+        codes, _ = pd.factorize(np.asarray(customers), use_na_sentinel=False)
+        times = timestamps.view(np.int64)
+        amounts = np.asarray(amounts, dtype=np.float64)
+
+        # Partition customers by code; code // n_partitions stays a dense
+        # customer index within its partition, which keeps sort keys small
+        n_jobs = self._n_jobs(n_jobs)
+        n_partitions = max(1, min(n_jobs * self.config['partitions_per_job'], codes.max(initial=0) + 1))
+        partition = codes % n_partitions
+        rows_by_partition = np.argsort(partition)
+        bounds = np.concatenate([[0], np.cumsum(np.bincount(partition, minlength=n_partitions))])
+        chunks = [rows_by_partition[bounds[p]:bounds[p + 1]] for p in range(n_partitions)]
+
+        def run(rows: np.ndarray) -> Dict[str, np.ndarray]:
+            return self._aggregate(codes[rows] // n_partitions, times[rows], amounts[rows])
+
+        if n_jobs > 1 and n_partitions > 1:
+            with ThreadPoolExecutor(max_workers=n_jobs) as pool:
+                results = list(pool.map(run, chunks))
+        else:
+            results = [run(rows) for rows in chunks]
+
+        output = {}
+        for name in self.output_names:
+            first = next((result[name] for result in results if len(result[name])), None)
+            values = np.empty(len(codes), dtype=first.dtype if first is not None else np.float64)
+            for rows, result in zip(chunks, results):
+                values[rows] = result[name]
+            output[name] = values
+        return output
+
+    def _aggregate(self, codes: np.ndarray, times: np.ndarray, amounts: np.ndarray) -> Dict[str, np.ndarray]:
+        """Aggregates for one partition, in the partition's row order."""
+        if len(codes) == 0:
+            return {name: np.empty(0) for name in self.output_names}
+
+        windows = list(self.config['count_windows'].values()) + list(self.config['mean_windows'].values())
+        max_window_ns = int(max(windows, default=0) * 1e9)
+
+        # Single int64 sort key per transaction: customer * stride + time, where
+        # the stride exceeds the time span plus the widest window so windows
+        # never reach into the previous customer's range
+        times = times - times.min()
+        for resolution in _RESOLUTIONS:
+            stride = (int(times.max()) + max_window_ns) // resolution + 2
+            if (int(codes.max()) + 1) * stride < _KEY_LIMIT:
+                break
+        else:
+            raise ValueError("Transaction log spans too long a period for one partition; use more partitions")
+        keys = codes.astype(np.int64) * stride + times // resolution
+
+        # Rows with equal keys are treated alike, so the sort need not be stable
+        order = np.argsort(keys)
+        keys = keys[order]
+
+        # Transactions strictly before each one end at the first row with the
+        # same key (simultaneous transactions do not see each other)
+        run_start = np.empty(len(keys), dtype=bool)
+        run_start[0] = True
+        np.not_equal(keys[1:], keys[:-1], out=run_start[1:])
+        end = np.maximum.accumulate(np.where(run_start, np.arange(len(keys)), 0))
+
+        result = {}
+        starts = {}
+        for name, window in self.config['count_windows'].items():
+            starts[window] = np.searchsorted(keys, keys - int(window * 1e9) // resolution, side='left')
+            result[name] = end - starts[window]
+
+        if self.config['mean_windows']:
+            cumulative = np.concatenate([[0.0], np.cumsum(amounts[order])])
+            for name, window in self.config['mean_windows'].items():
+                if window not in starts:
+                    starts[window] = np.searchsorted(keys, keys - int(window * 1e9) // resolution, side='left')
+                count = end - starts[window]
+                total = cumulative[end] - cumulative[starts[window]]
+                if self.config['empty_window_mean'] == CURRENT_AMOUNT:
+                    mean = amounts[order]
+                else:
+                    mean = np.full(len(keys), float(self.config['empty_window_mean']))
+                np.divide(total, count, out=mean, where=count > 0)
+                result[name] = mean
+
+        previous = end - 1
+        sorted_codes = codes[order]
+        has_previous = (previous >= 0) & (sorted_codes[np.maximum(previous, 0)] == sorted_codes)
+        sorted_times = times[order]
+        gap = (sorted_times - sorted_times[np.maximum(previous, 0)]) / (self.config['gap_unit_seconds'] * 1e9)
+        result[self.config['gap_feature']] = np.where(has_previous, gap, float(self.config['first_transaction_gap']))
+
+        # Back to the partition's row order
+        for name, values in result.items():
+            unsorted = np.empty_like(values)
+            unsorted[order] = values
+            result[name] = unsorted
+        return result
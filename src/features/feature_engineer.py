@@ -4,121 +4,110 @@ Creates advanced features from raw transaction data.
 """
 
 import pandas as pd
-import numpy as np
-from typing import List
+from typing import Any, Dict, Optional
 
 from ..utils.logger import ProjectLogger
+from ..utils.dtypes import downcast_array
+from .customer_history import CustomerHistoryAggregator
+from .feature_pipeline import FeaturePipeline
 
 
 class FeatureEngineer:
     """Create engineered features for fraud detection."""
     
-    def __init__(self):
-        """Initialize feature engineer."""
+    def __init__(
+        self,
+        config: Optional[Dict[str, Any]] = None,
+        compact_dtypes: bool = False,
+        n_jobs: Optional[int] = 1
+    ):
+        """
+        Initialize feature engineer.
+        
+        Args:
+            config: `features:` config section (defaults to config/config.yaml)
+            compact_dtypes: Emit int8/float32 features instead of int64/float64
+            n_jobs: Worker processes for fit_transform over row partitions
+                (-1 uses every CPU; small frames run in-process)
+        """
         self.logger = ProjectLogger()
+        self.compact_dtypes = compact_dtypes
+        self.n_jobs = n_jobs
+        self.pipeline = FeaturePipeline(config) if config is not None else FeaturePipeline.from_config()
         self.logger.info("FeatureEngineer initialized")
     
-    def create_amount_features(self, df: pd.DataFrame) -> pd.DataFrame:
-        """Create amount-based features."""
-        df = df.copy()
-        
-        # Log transformation
-        df['amount_log'] = np.log1p(df['amount'])
+    def create_history_features(
+        self,
+        df: pd.DataFrame,
+        customer_col: str = 'customer_id',
+        datetime_col: str = 'timestamp',
+        amount_col: str = 'amount',
+        n_jobs: Optional[int] = None,
+        config: Optional[Dict[str, Any]] = None
+    ) -> pd.DataFrame:
+        """
+        Derive the velocity inputs from a transaction log keyed by customer.
+        
+        Fills num_transactions_24h, num_transactions_7d,
+        avg_transaction_amount_30d and time_since_last_transaction from each
+        customer's earlier transactions only (point-in-time correct), for
+        backfilling training data from raw history.
+        
+        Args:
+            df: Transaction log (any row order)
+            customer_col: Customer key column
+            datetime_col: Transaction time column
+            amount_col: Transaction amount column
+            n_jobs: Worker threads (defaults to the `velocity_history:` config)
+            config: `velocity_history:` config section (defaults to config/config.yaml)
+            
+        Returns:
+            New DataFrame with the history features added (or replaced)
+        """
+        aggregator = (
+            CustomerHistoryAggregator(config) if config is not None
+            else CustomerHistoryAggregator.from_config()
+        )
         
-        # Categorical bins
-        df['amount_category'] = pd.cut(
-            df['amount'],
-            bins=[0, 50, 200, 1000, np.inf],
-            labels=['very_low', 'low', 'medium', 'high']
-        ).astype(str)
+        stamps = pd.to_datetime(df[datetime_col])
+        if getattr(stamps.dt, 'tz', None) is not None:
+            stamps = stamps.dt.tz_localize(None)
         
-        # Ratio to average
-        df['amount_to_avg_ratio'] = df['amount'] / (df['avg_transaction_amount_30d'] + 1e-5)
+        features = aggregator.transform(
+            df[customer_col].to_numpy(), stamps.to_numpy(dtype='datetime64[ns]'),
+            df[amount_col].to_numpy(), n_jobs=n_jobs
+        )
+        if self.compact_dtypes:
+            features = {name: downcast_array(values) for name, values in features.items()}
         
-        return df
+        self.logger.info(f"Derived {len(features)} history features for {len(df)} transactions")
+        return df.assign(**features)
+    
+    def create_amount_features(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Create amount-based features."""
+        return self.pipeline.transform_frame(df, groups=['amount'], compact_dtypes=self.compact_dtypes)
     
     def create_temporal_features(
-        self, 
+        self,
         df: pd.DataFrame,
         datetime_col: str = 'timestamp'
     ) -> pd.DataFrame:
         """Create time-based features."""
-        df = df.copy()
-        
-        if datetime_col in df.columns:
-            # Ensure datetime type
-            if not pd.api.types.is_datetime64_any_dtype(df[datetime_col]):
-                df[datetime_col] = pd.to_datetime(df[datetime_col])
-            
-            # Extract temporal features
-            df['hour'] = df[datetime_col].dt.hour
-            df['day_of_week'] = df[datetime_col].dt.dayofweek
-            df['day_of_month'] = df[datetime_col].dt.day
-            df['is_weekend'] = (df['day_of_week'] >= 5).astype(int)
-            
-            # Time of day categories
-            df['time_of_day'] = pd.cut(
-                df['hour'],
-                bins=[0, 6, 12, 18, 24],
-                labels=['night', 'morning', 'afternoon', 'evening']
-            ).astype(str)
-            
-            # Peak hours (8-10 AM, 5-7 PM)
-            df['is_peak_hour'] = df['hour'].isin([8, 9, 10, 17, 18, 19]).astype(int)
-        
-        return df
+        return self.pipeline.transform_frame(
+            df, datetime_col=datetime_col, groups=['temporal'], compact_dtypes=self.compact_dtypes
+        )
     
     def create_velocity_features(self, df: pd.DataFrame) -> pd.DataFrame:
         """Create transaction velocity features."""
-        df = df.copy()
-        
-        # High frequency flags
-        df['is_high_frequency_24h'] = (df['num_transactions_24h'] > 5).astype(int)
-        df['is_high_frequency_7d'] = (df['num_transactions_7d'] > 20).astype(int)
-        
-        # Time since last transaction categories
-        df['time_since_last_cat'] = pd.cut(
-            df['time_since_last_transaction'],
-            bins=[0, 10, 60, 300, np.inf],
-            labels=['recent', 'normal', 'long_gap', 'very_long']
-        ).astype(str)
-        
-        return df
+        return self.pipeline.transform_frame(df, groups=['velocity'], compact_dtypes=self.compact_dtypes)
     
     def create_distance_features(self, df: pd.DataFrame) -> pd.DataFrame:
         """Create distance-based features."""
-        df = df.copy()
-        
-        # Distance from home categories
-        df['distance_home_cat'] = pd.cut(
-            df['distance_from_home'],
-            bins=[0, 10, 50, 200, np.inf],
-            labels=['very_close', 'close', 'medium', 'far']
-        ).astype(str)
-        
-        # Far from home flag
-        df['is_far_from_home'] = (df['distance_from_home'] > 100).astype(int)
-        
-        # Far from last transaction flag
-        df['is_far_from_last'] = (df['distance_from_last_transaction'] > 50).astype(int)
-        
-        return df
+        return self.pipeline.transform_frame(df, groups=['distance'], compact_dtypes=self.compact_dtypes)
     
     def create_risk_score(self, df: pd.DataFrame) -> pd.DataFrame:
         """Create composite risk score."""
-        df = df.copy()
-        
-        # Composite risk score (0-7 range)
-        df['risk_score'] = (
-            (df['amount'] > 1000).astype(int) * 2 +  # High amount
-            (df['card_present'] == 0).astype(int) +   # Card not present
-            (df['distance_from_home'] > 100).astype(int) +  # Far from home
-            (df['num_transactions_24h'] > 5).astype(int) +  # High frequency
-            (df.get('is_weekend', 0) * 0.5).astype(int) +   # Weekend
-            (df.get('is_peak_hour', 0) == 0).astype(int)    # Off-peak hours
-        )
-        
-        return df
+        return self.pipeline.transform_frame(df, groups=['risk'], compact_dtypes=self.compact_dtypes)
     
     def fit_transform(self, df: pd.DataFrame) -> pd.DataFrame:
         """Apply all feature engineering transformations."""
@@ -127,21 +116,8 @@ class FeatureEngineer:
         # Track feature count
         initial_features = len(df.columns)
         
-        # Apply all transformations
-        self.logger.info("Creating amount-based features...")
-        df = self.create_amount_features(df)
-        
-        self.logger.info("Creating temporal features...")
-        df = self.create_temporal_features(df)
-        
-        self.logger.info("Creating velocity features...")
-        df = self.create_velocity_features(df)
-        
-        self.logger.info("Creating distance features...")
-        df = self.create_distance_features(df)
-        
-        self.logger.info("Creating risk score...")
-        df = self.create_risk_score(df)
+        # All feature groups are computed from numpy columns and added in one step
+        df = self.pipeline.transform_frame(df, compact_dtypes=self.compact_dtypes, n_jobs=self.n_jobs)
         
         # Log results
         final_features = len(df.columns)
@@ -150,4 +126,3 @@ class FeatureEngineer:
         self.logger.info(f"Feature engineering completed. Created {new_features} new features")
         
         return df
-
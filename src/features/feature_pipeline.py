@@ -0,0 +1,499 @@
+"""
+Compiled feature pipeline shared by training and serving.
+Describes every engineered feature once as a node in a small declarative
+graph, parameterized by the `features:` section of config/config.yaml, and
+evaluates it on column arrays (training frames, API batches) or on a single
+record without building intermediate DataFrames.
+"""
+
+import bisect
+import copy
+import math
+import operator
+from datetime import datetime
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+from ..utils.config import get_section, load_config
+from ..utils.dtypes import downcast_array
+
+INF = float('inf')
+
+DEFAULT_FEATURE_CONFIG: Dict[str, Any] = {
+    'amount_bins': [0, 50, 200, 1000, INF],
+    'time_of_day_bins': [0, 6, 12, 18, 24],
+    'time_since_last_bins': [0, 10, 60, 300, INF],
+    'distance_home_bins': [0, 10, 50, 200, INF],
+    'peak_hours': [8, 9, 10, 17, 18, 19],
+    'weekend_start_day': 5,
+    'distance_thresholds': {
+        'far_from_home': 100,
+        'far_from_last': 50
+    },
+    'velocity_thresholds': {
+        'high_frequency_24h': 5,
+        'high_frequency_7d': 20
+    },
+    'risk_amount_threshold': 1000,
+    'risk_weights': {
+        'high_amount': 2,
+        'card_not_present': 1,
+        'far_from_home': 1,
+        'high_frequency_24h': 1,
+        'weekend': 0.5,
+        'off_peak': 1
+    }
+}
+
+# Category labels of the binned features (fixed: label encoders are fitted on them)
+BIN_LABELS = {
+    'amount_category': ['very_low', 'low', 'medium', 'high'],
+    'time_of_day': ['night', 'morning', 'afternoon', 'evening'],
+    'time_since_last_cat': ['recent', 'normal', 'long_gap', 'very_long'],
+    'distance_home_cat': ['very_close', 'close', 'medium', 'far']
+}
+
+# Label pandas gives out-of-range values after pd.cut(...).astype(str)
+OUT_OF_RANGE_LABEL = 'nan'
+
+# Timestamp parts made available to temporal nodes
+TIMESTAMP_PARTS = ('hour', 'day_of_week', 'day_of_month')
+
+_COMPARISONS = {
+    'gt': (operator.gt, np.greater),
+    'ge': (operator.ge, np.greater_equal),
+    'eq': (operator.eq, np.equal)
+}
+
+
+class FeatureNode:
+    """One feature of the graph with its batch and single-row kernels."""
+
+    def __init__(
+        self,
+        name: str,
+        group: str,
+        inputs: Sequence[str],
+        vector_fn: Callable[[Dict[str, Any]], Any],
+        scalar_fn: Callable[[Dict[str, Any]], Any],
+        output: bool = True,
+        bins: Optional[Tuple[List[float], List[str]]] = None
+    ):
+        """
+        Initialize node.
+
+        Args:
+            name: Feature name
+            group: Feature family ('amount', 'temporal', 'velocity', 'distance', 'risk')
+            inputs: Raw columns, timestamp parts or other nodes this node reads
+            vector_fn: Kernel over numpy arrays (or broadcastable scalars)
+            scalar_fn: Kernel over Python scalars
+            output: Whether the feature is emitted (False for intermediates)
+            bins: (edges, labels) for binned features, which yield bin codes
+        """
+        self.name = name
+        self.group = group
+        self.inputs = list(inputs)
+        self.vector_fn = vector_fn
+        self.scalar_fn = scalar_fn
+        self.output = output
+        self.bins = bins
+
+
+def _merge_config(defaults: Dict[str, Any], overrides: Mapping[str, Any]) -> Dict[str, Any]:
+    """Overlay a (possibly partial) config section on the defaults."""
+    merged = copy.deepcopy(defaults)
+    for key, value in (overrides or {}).items():
+        if isinstance(merged.get(key), dict) and isinstance(value, Mapping):
+            merged[key] = _merge_config(merged[key], value)
+        else:
+            merged[key] = value
+    return merged
+
+
+def _log1p(name: str, group: str, source: str) -> FeatureNode:
+    return FeatureNode(
+        name, group, [source],
+        lambda v: np.log1p(v[source]),
+        lambda v: math.log1p(v[source])
+    )
+
+
+def _ratio(name: str, group: str, numerator: str, denominator: str, epsilon: float) -> FeatureNode:
+    return FeatureNode(
+        name, group, [numerator, denominator],
+        lambda v: v[numerator] / (v[denominator] + epsilon),
+        lambda v: v[numerator] / (v[denominator] + epsilon)
+    )
+
+
+def _compare(name: str, group: str, source: str, op: str, value: float, output: bool = True) -> FeatureNode:
+    scalar_op, vector_op = _COMPARISONS[op]
+    return FeatureNode(
+        name, group, [source],
+        lambda v: vector_op(v[source], value).astype(np.int64),
+        lambda v: int(scalar_op(v[source], value)),
+        output=output
+    )
+
+
+def _isin(name: str, group: str, source: str, values: Iterable[float]) -> FeatureNode:
+    values = sorted(values)
+    members = frozenset(values)
+    return FeatureNode(
+        name, group, [source],
+        lambda v: np.isin(v[source], values).astype(np.int64),
+        lambda v: int(v[source] in members)
+    )
+
+
+def _timestamp_part(name: str) -> FeatureNode:
+    return FeatureNode(name, 'temporal', [name], lambda v: v[name], lambda v: v[name])
+
+
+def _bin(name: str, group: str, source: str, edges: Sequence[float]) -> FeatureNode:
+    """
+    Right-inclusive bins matching pd.cut(..., right=True).
+
+    Codes are 0..n_bins-1; values on or below the first edge get -1 and values
+    above the last edge (or NaN) get n_bins, both meaning 'out of range'.
+    """
+    labels = BIN_LABELS[name]
+    edges = [float(edge) for edge in edges]
+    if len(edges) != len(labels) + 1:
+        raise ValueError(f"{name} needs {len(labels) + 1} bin edges, got {len(edges)}")
+    edge_array = np.asarray(edges, dtype=np.float64)
+
+    return FeatureNode(
+        name, group, [source],
+        lambda v: np.searchsorted(edge_array, v[source], side='left') - 1,
+        lambda v: bisect.bisect_left(edges, v[source]) - 1,
+        bins=(edges, labels)
+    )
+
+
+def _weighted_sum(name: str, group: str, terms: Sequence[Tuple[str, float]]) -> FeatureNode:
+    """Sum of weight * flag, each term truncated to int like Series.astype(int)."""
+    terms = [(source, weight) for source, weight in terms if weight]
+    # Integer weights need no truncation
+    integral = [(source, int(weight)) for source, weight in terms if float(weight).is_integer()]
+    fractional = [(source, weight) for source, weight in terms if not float(weight).is_integer()]
+
+    def vector_fn(v: Dict[str, Any]) -> Any:
+        total = 0
+        for source, weight in integral:
+            total = total + v[source] * weight
+        for source, weight in fractional:
+            total = total + np.trunc(np.multiply(v[source], weight)).astype(np.int64)
+        return total
+
+    def scalar_fn(v: Dict[str, Any]) -> int:
+        total = 0
+        for source, weight in integral:
+            total += v[source] * weight
+        for source, weight in fractional:
+            total += int(v[source] * weight)
+        return total
+
+    return FeatureNode(name, group, [source for source, _ in terms], vector_fn, scalar_fn)
+
+
+def build_feature_graph(config: Mapping[str, Any]) -> List[FeatureNode]:
+    """
+    Build the feature graph in output order.
+
+    Args:
+        config: Merged feature configuration
+
+    Returns:
+        Nodes in dependency (and column) order
+    """
+    distance = config['distance_thresholds']
+    velocity = config['velocity_thresholds']
+    weights = config['risk_weights']
+
+    return [
+        # Amount
+        _log1p('amount_log', 'amount', 'amount'),
+        _bin('amount_category', 'amount', 'amount', config['amount_bins']),
+        _ratio('amount_to_avg_ratio', 'amount', 'amount', 'avg_transaction_amount_30d', 1e-5),
+
+        # Temporal
+        _timestamp_part('hour'),
+        _timestamp_part('day_of_week'),
+        _timestamp_part('day_of_month'),
+        _compare('is_weekend', 'temporal', 'day_of_week', 'ge', config['weekend_start_day']),
+        _bin('time_of_day', 'temporal', 'hour', config['time_of_day_bins']),
+        _isin('is_peak_hour', 'temporal', 'hour', config['peak_hours']),
+
+        # Velocity
+        _compare('is_high_frequency_24h', 'velocity', 'num_transactions_24h', 'gt',
+                 velocity['high_frequency_24h']),
+        _compare('is_high_frequency_7d', 'velocity', 'num_transactions_7d', 'gt',
+                 velocity['high_frequency_7d']),
+        _bin('time_since_last_cat', 'velocity', 'time_since_last_transaction',
+             config['time_since_last_bins']),
+
+        # Distance
+        _bin('distance_home_cat', 'distance', 'distance_from_home', config['distance_home_bins']),
+        _compare('is_far_from_home', 'distance', 'distance_from_home', 'gt', distance['far_from_home']),
+        _compare('is_far_from_last', 'distance', 'distance_from_last_transaction', 'gt',
+                 distance['far_from_last']),
+
+        # Risk score and its intermediate flags
+        _compare('high_amount', 'risk', 'amount', 'gt', config['risk_amount_threshold'], output=False),
+        _compare('card_not_present', 'risk', 'card_present', 'eq', 0, output=False),
+        _compare('off_peak', 'risk', 'is_peak_hour', 'eq', 0, output=False),
+        _weighted_sum('risk_score', 'risk', [
+            ('high_amount', weights['high_amount']),
+            ('card_not_present', weights['card_not_present']),
+            ('is_far_from_home', weights['far_from_home']),
+            ('is_high_frequency_24h', weights['high_frequency_24h']),
+            ('is_weekend', weights['weekend']),
+            ('off_peak', weights['off_peak'])
+        ])
+    ]
+
+
+class FeaturePipeline:
+    """Compiled feature graph evaluated on columns or on a single record."""
+
+    def __init__(self, config: Optional[Mapping[str, Any]] = None):
+        """
+        Compile the pipeline.
+
+        Args:
+            config: `features:` config section; missing keys use DEFAULT_FEATURE_CONFIG
+        """
+        self.config = _merge_config(DEFAULT_FEATURE_CONFIG, config or {})
+        self.nodes = build_feature_graph(self.config)
+        self._by_name = {node.name: node for node in self.nodes}
+
+        self.output_names = [node.name for node in self.nodes if node.output]
+        self.binned_features: Dict[str, Tuple[str, List[float], List[str]]] = {
+            node.name: (node.inputs[0], node.bins[0], node.bins[1])
+            for node in self.nodes if node.bins
+        }
+
+        # Raw columns read by the graph (everything that is neither a node nor a timestamp part)
+        self.raw_inputs = sorted({
+            name for node in self.nodes for name in node.inputs
+            if name not in self._by_name and name not in TIMESTAMP_PARTS
+        })
+
+        # Flat (name, kernel) list so the single-row path is one tight loop;
+        # timestamp parts are filled in directly and need no kernel
+        self._scalar_kernels = [
+            (node.name, node.scalar_fn) for node in self.nodes if node.name not in TIMESTAMP_PARTS
+        ]
+
+        # Categories of binned features in code order; out-of-range is the last one
+        self.bin_categories = {
+            name: labels + [OUT_OF_RANGE_LABEL]
+            for name, (_, _, labels) in self.binned_features.items()
+        }
+
+        self._label_arrays = {
+            name: np.array(labels + [OUT_OF_RANGE_LABEL], dtype=object)
+            for name, (_, _, labels) in self.binned_features.items()
+        }
+
+    def compact_codes(self, name: str, codes: Any) -> np.ndarray:
+        """
+        Normalize raw bin codes to int8 indices into bin_categories[name].
+
+        Both out-of-range codes (-1 and n_bins) become n_bins, the index of
+        the 'nan' category.
+        """
+        n_bins = len(self.binned_features[name][2])
+        codes = np.asarray(codes)
+        return np.where((codes < 0) | (codes >= n_bins), n_bins, codes).astype(np.int8)
+
+    @classmethod
+    def from_config(cls, config_path: Optional[str] = None) -> 'FeaturePipeline':
+        """Build the pipeline from the `features:` section of the project config."""
+        return cls(get_section(load_config(config_path), 'features'))
+
+    def _select(self, groups: Optional[Iterable[str]]) -> Tuple[List[FeatureNode], List[str]]:
+        """Nodes to evaluate (requested groups plus dependencies) and names to emit."""
+        if groups is None:
+            return self.nodes, self.output_names
+
+        groups = set(groups)
+        needed = {node.name for node in self.nodes if node.group in groups}
+        for node in reversed(self.nodes):
+            if node.name in needed:
+                needed.update(name for name in node.inputs if name in self._by_name)
+
+        nodes = [node for node in self.nodes if node.name in needed]
+        outputs = [node.name for node in nodes if node.output and node.group in groups]
+        return nodes, outputs
+
+    @staticmethod
+    def timestamp_parts(timestamps: Any) -> Dict[str, Any]:
+        """
+        Hour, weekday (Monday=0) and day of month.
+
+        Args:
+            timestamps: A datetime, or a datetime64 array (naive local time)
+
+        Returns:
+            Mapping of part name to scalar or integer array
+        """
+        if isinstance(timestamps, datetime):
+            return {
+                'hour': timestamps.hour,
+                'day_of_week': timestamps.weekday(),
+                'day_of_month': timestamps.day
+            }
+
+        stamps = np.asarray(timestamps, dtype='datetime64[ns]')
+        days = stamps.astype('datetime64[D]')
+        return {
+            'hour': ((stamps - days) // np.timedelta64(1, 'h')).astype(np.int64),
+            # 1970-01-01 was a Thursday
+            'day_of_week': (days.astype(np.int64) + 3) % 7,
+            'day_of_month': (days - days.astype('datetime64[M]')).astype(np.int64) + 1
+        }
+
+    def transform_columns(
+        self,
+        columns: Mapping[str, Any],
+        timestamps: Any = None,
+        bin_labels: bool = True,
+        groups: Optional[Iterable[str]] = None
+    ) -> Dict[str, Any]:
+        """
+        Compute engineered features for column arrays.
+
+        Args:
+            columns: Raw transaction fields as arrays of equal length
+            timestamps: A datetime applied to every row, a datetime64 array,
+                or None to skip temporal features
+            bin_labels: Return binned features as labels (True) or as bin
+                codes (False, -1/n_bins meaning out of range)
+            groups: Restrict output to these feature groups
+
+        Returns:
+            Mapping of feature name to array (or broadcastable scalar)
+        """
+        nodes, outputs = self._select(groups)
+        values: Dict[str, Any] = {
+            name: np.asarray(columns[name], dtype=np.float64)
+            for name in self.raw_inputs if name in columns
+        }
+        parts = self.timestamp_parts(timestamps) if timestamps is not None else None
+        if parts is None:
+            outputs = [name for name in outputs if self._by_name[name].group != 'temporal']
+
+        # Names holding one value for every row (a single scoring timestamp);
+        # nodes reading only those run their scalar kernel once
+        constants = set()
+        if parts is not None:
+            values.update(parts)
+            if isinstance(timestamps, datetime):
+                constants.update(parts)
+
+        for node in nodes:
+            if parts is None and node.group == 'temporal':
+                # No timestamp: temporal features are absent and read as 0 downstream
+                values[node.name] = 0
+                continue
+            if constants and all(name in constants for name in node.inputs):
+                values[node.name] = node.scalar_fn(values)
+                constants.add(node.name)
+            else:
+                values[node.name] = node.vector_fn(values)
+
+        result = {}
+        for name in outputs:
+            value = values[name]
+            if bin_labels and name in self._label_arrays:
+                value = self._label_arrays[name][value]
+            result[name] = value
+        return result
+
+    def transform_record(
+        self,
+        record: Mapping[str, Any],
+        timestamp: Optional[datetime] = None,
+        bin_labels: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Compute engineered features for a single transaction with scalar kernels.
+
+        Args:
+            record: Raw transaction fields
+            timestamp: Scoring time (defaults to now)
+            bin_labels: Return binned features as labels instead of bin codes
+
+        Returns:
+            Mapping of feature name to scalar
+        """
+        values: Dict[str, Any] = {name: float(record[name]) for name in self.raw_inputs}
+        values.update(self.timestamp_parts(timestamp or datetime.now()))
+        for name, kernel in self._scalar_kernels:
+            values[name] = kernel(values)
+
+        result = {name: values[name] for name in self.output_names}
+        if bin_labels:
+            for name, labels in self._label_arrays.items():
+                result[name] = labels[result[name]]
+        return result
+
+    def transform_frame(
+        self,
+        df: 'pd.DataFrame',
+        datetime_col: str = 'timestamp',
+        groups: Optional[Iterable[str]] = None,
+        compact_dtypes: bool = False,
+        n_jobs: Optional[int] = 1
+    ) -> 'pd.DataFrame':
+        """
+        Add engineered features to a DataFrame with a single assign.
+
+        Binned features are added as pandas categoricals backed by int8
+        codes, so no per-row label strings are created.
+
+        Args:
+            df: Raw transactions
+            datetime_col: Timestamp column for temporal features (skipped if absent)
+            groups: Restrict to these feature groups
+            compact_dtypes: Store flags and counts as the smallest integer
+                type and float features as float32
+            n_jobs: Worker processes over row partitions (-1 uses every
+                CPU); see parallel_transform
+
+        Returns:
+            New DataFrame with the engineered columns added
+        """
+        import pandas as pd
+
+        converted = {}
+        timestamps = None
+        if datetime_col in df.columns:
+            stamps = df[datetime_col]
+            if not pd.api.types.is_datetime64_any_dtype(stamps):
+                stamps = converted[datetime_col] = pd.to_datetime(stamps)
+            if getattr(stamps.dt, 'tz', None) is not None:
+                stamps = stamps.dt.tz_localize(None)
+            timestamps = stamps.to_numpy(dtype='datetime64[ns]')
+
+        columns = {name: df[name].to_numpy() for name in self.raw_inputs if name in df.columns}
+        if n_jobs == 1:
+            features = self.transform_columns(columns, timestamps, bin_labels=False, groups=groups)
+        else:
+            from .parallel_transform import transform_columns_parallel
+            features = transform_columns_parallel(self, columns, timestamps, groups=groups, n_jobs=n_jobs)
+        for name in features:
+            if name in self.bin_categories:
+                features[name] = pd.Categorical.from_codes(
+                    self.compact_codes(name, features[name]), categories=self.bin_categories[name]
+                )
+            elif compact_dtypes:
+                features[name] = downcast_array(features[name])
+        return df.assign(**converted, **features)
@@ -5,29 +5,33 @@ Handles encoding, scaling, and data transformation.
 
 import pandas as pd
 import numpy as np
-import pickle
-from pathlib import Path
 from typing import Tuple, Dict, Any, List
 from sklearn.preprocessing import StandardScaler, LabelEncoder
 
+from ..utils.dtypes import COMPACT_FLOAT, downcast_array
 from ..utils.logger import ProjectLogger
+from .preprocessor_artifact import PreprocessorArtifact
 
 
 class DataPreprocessor:
     """Preprocess data for model training."""
     
-    def __init__(self, target_col: str = 'is_fraud'):
+    def __init__(self, target_col: str = 'is_fraud', compact_dtypes: bool = False):
         """
         Initialize preprocessor.
         
         Args:
             target_col: Name of target variable column
+            compact_dtypes: Scale in float32 and keep category codes in the
+                smallest integer type instead of float64/int64
         """
         self.target_col = target_col
+        self.compact_dtypes = compact_dtypes
         self.logger = ProjectLogger()
         
         # Preprocessing components
         self.label_encoders: Dict[str, LabelEncoder] = {}
+        self.category_mappings: Dict[str, List[str]] = {}
         self.scaler: StandardScaler = None
         
         # Feature lists (will be populated during fit)
@@ -35,6 +39,14 @@ class DataPreprocessor:
         self.categorical_features: List[str] = []
         self.features_to_drop: List[str] = []
         
+        # Output columns and dtypes of the fitted transform (the model input schema)
+        self.feature_order: List[str] = []
+        self.feature_dtypes: Dict[str, str] = {}
+        
+        # Feature pipeline parameters the data was engineered with (saved so
+        # serving rebuilds exactly the same features)
+        self.feature_config: Dict[str, Any] = {}
+        
         self.logger.info("DataPreprocessor initialized")
     
     def identify_feature_types(self, df: pd.DataFrame) -> None:
@@ -67,6 +79,9 @@ class DataPreprocessor:
         """
         Encode categorical features using Label Encoding.
         
+        Columns that are already pandas categoricals (e.g. binned features)
+        keep their integer codes; only their category labels are stored.
+        
         Args:
             df: Input DataFrame
             fit: Whether to fit encoders (True for train, False for test)
@@ -79,21 +94,50 @@ class DataPreprocessor:
         for col in self.categorical_features:
             if col in df_encoded.columns:
                 if fit:
+                    if isinstance(df_encoded[col].dtype, pd.CategoricalDtype):
+                        self.category_mappings[col] = [str(c) for c in df_encoded[col].cat.categories]
+                    else:
+                        self.category_mappings.pop(col, None)
+                
+                if col in self.category_mappings:
+                    # Map labels to their stored codes; unseen categories get -1
+                    df_encoded[col] = pd.Categorical(
+                        df_encoded[col], categories=self.category_mappings[col]
+                    ).codes
+                elif fit:
                     self.label_encoders[col] = LabelEncoder()
-                    df_encoded[col] = self.label_encoders[col].fit_transform(
+                    codes = self.label_encoders[col].fit_transform(
                         df_encoded[col].astype(str)
                     )
+                    df_encoded[col] = downcast_array(codes) if self.compact_dtypes else codes
                 else:
                     if col in self.label_encoders:
                         # Handle unseen categories
-                        le = self.label_encoders[col]
-                        df_encoded[col] = df_encoded[col].astype(str).apply(
-                            lambda x: le.transform([x])[0] if x in le.classes_ else -1
+                        df_encoded[col] = self.label_codes(
+                            df_encoded[col], self.label_encoders[col].classes_
                         )
         
         print(f"✅ Encoded {len(self.categorical_features)} categorical features")
         return df_encoded
     
+    @staticmethod
+    def label_codes(values: pd.Series, classes: np.ndarray) -> np.ndarray:
+        """
+        Vectorized LabelEncoder.transform that maps unseen labels to -1.
+        
+        The whole column is matched against the fitted classes in one hash
+        lookup; codes use the smallest integer type that fits the number of
+        classes, so high-cardinality columns are supported.
+        
+        Args:
+            values: Column to encode (compared as strings, like at fit time)
+            classes: Fitted LabelEncoder.classes_ (sorted, unique)
+            
+        Returns:
+            Encoded values
+        """
+        return pd.Categorical(values.astype(str), categories=classes).codes
+    
     def scale_numeric_features(
         self, 
         df: pd.DataFrame,
@@ -102,6 +146,8 @@ class DataPreprocessor:
         """
         Scale numeric features using StandardScaler.
         
+        In compact mode the features are scaled (and returned) as float32.
+        
         Args:
             df: Input DataFrame
             fit: Whether to fit scaler (True for train, False for test)
@@ -110,17 +156,16 @@ class DataPreprocessor:
             DataFrame with scaled features
         """
         df_scaled = df.copy()
+        numeric = df_scaled[self.numeric_features]
+        if self.compact_dtypes:
+            numeric = numeric.astype(COMPACT_FLOAT)
         
         if fit:
             self.scaler = StandardScaler()
-            df_scaled[self.numeric_features] = self.scaler.fit_transform(
-                df_scaled[self.numeric_features]
-            )
+            df_scaled[self.numeric_features] = self.scaler.fit_transform(numeric)
         else:
             if self.scaler:
-                df_scaled[self.numeric_features] = self.scaler.transform(
-                    df_scaled[self.numeric_features]
-                )
+                df_scaled[self.numeric_features] = self.scaler.transform(numeric)
         
         return df_scaled
     
@@ -164,8 +209,56 @@ class DataPreprocessor:
         
         print(f"✅ Scaled {len(self.numeric_features)} numeric features")
         
+        self.feature_order = df_scaled.columns.tolist()
+        self.feature_dtypes = {col: str(dtype) for col, dtype in df_scaled.dtypes.items()}
+        
         return df_scaled, y
     
+    def partial_fit(self, df: pd.DataFrame) -> 'DataPreprocessor':
+        """
+        Update the fitted state with one chunk of training data.
+
+        Feature types are identified on the first chunk; label vocabularies
+        are accumulated across chunks and the scaler is fitted incrementally,
+        so the full dataset never has to be in memory. Transform the chunks
+        with transform() once every chunk has been seen.
+
+        Args:
+            df: Chunk with features and target
+
+        Returns:
+            self
+        """
+        if self.scaler is None:
+            self.identify_feature_types(df)
+            self.scaler = StandardScaler()
+            self.label_encoders = {}
+            self.category_mappings = {}
+
+        df_features = df.drop(columns=[self.target_col] + self.features_to_drop, errors='ignore')
+
+        for col in self.categorical_features:
+            if col not in df_features.columns:
+                continue
+            if isinstance(df_features[col].dtype, pd.CategoricalDtype):
+                self.category_mappings[col] = [str(c) for c in df_features[col].cat.categories]
+                continue
+
+            # Sorted union of labels seen so far, as LabelEncoder.fit would produce
+            encoder = self.label_encoders.setdefault(col, LabelEncoder())
+            seen = getattr(encoder, 'classes_', [])
+            encoder.classes_ = np.array(
+                sorted(set(seen).union(df_features[col].astype(str).unique())), dtype=object
+            )
+
+        numeric = df_features[self.numeric_features]
+        if self.compact_dtypes:
+            numeric = numeric.astype(COMPACT_FLOAT)
+        self.scaler.partial_fit(numeric)
+
+        self.feature_order = df_features.columns.tolist()
+        return self
+
     def transform(self, df: pd.DataFrame) -> Tuple[pd.DataFrame, pd.Series]:
         """
         Transform new data using fitted preprocessor.
@@ -195,33 +288,68 @@ class DataPreprocessor:
         
         return df_scaled, y
     
-    def save_preprocessor(self, filepath: str = 'models/saved_models/preprocessor.pkl') -> None:
-        """Save preprocessor to disk."""
-        preprocessor_data = {
+    def save_preprocessor(self, filepath: str = 'models/saved_models/preprocessor.prep') -> None:
+        """
+        Save preprocessor to disk as a memory-mappable artifact.
+        
+        Only the arrays inference needs are stored (see PreprocessorArtifact).
+        
+        Args:
+            filepath: Destination path
+        """
+        artifact = PreprocessorArtifact.from_components({
             'label_encoders': self.label_encoders,
+            'category_mappings': self.category_mappings,
             'scaler': self.scaler,
             'numeric_features': self.numeric_features,
             'categorical_features': self.categorical_features,
-            'features_to_drop': self.features_to_drop
-        }
-        
-        Path(filepath).parent.mkdir(parents=True, exist_ok=True)
-        
-        with open(filepath, 'wb') as f:
-            pickle.dump(preprocessor_data, f)
+            'features_to_drop': self.features_to_drop,
+            'feature_order': self.feature_order,
+            'feature_dtypes': self.feature_dtypes,
+            'feature_config': self.feature_config
+        })
+        artifact.save(filepath)
         
         self.logger.info(f"💾 Preprocessor saved to: {filepath}")
     
-    def load_preprocessor(self, filepath: str = 'models/saved_models/preprocessor.pkl') -> None:
-        """Load preprocessor from disk."""
-        with open(filepath, 'rb') as f:
-            preprocessor_data = pickle.load(f)
-        
-        self.label_encoders = preprocessor_data['label_encoders']
-        self.scaler = preprocessor_data['scaler']
-        self.numeric_features = preprocessor_data['numeric_features']
-        self.categorical_features = preprocessor_data['categorical_features']
-        self.features_to_drop = preprocessor_data['features_to_drop']
-        
-        self.logger.info(f"✅ Preprocessor loaded from: {filepath}")
+    def load_preprocessor(self, filepath: str = 'models/saved_models/preprocessor.prep') -> None:
+        """
+        Load preprocessor from disk.
+        
+        Reads the artifact format and, for older files, pickled preprocessors.
+        Encoders and scaler are rebuilt from the stored arrays.
+        
+        Args:
+            filepath: Artifact path
+        """
+        artifact = PreprocessorArtifact.load(filepath)
+        
+        self.label_encoders = {}
+        self.category_mappings = {}
+        for col, vocabulary in artifact.vocabularies.items():
+            if artifact.encodings[col] == 'categorical':
+                self.category_mappings[col] = vocabulary.tolist()
+            else:
+                encoder = LabelEncoder()
+                encoder.classes_ = vocabulary
+                self.label_encoders[col] = encoder
+        
+        self.scaler = None
+        if artifact.has_scaler:
+            self.scaler = StandardScaler()
+            self.scaler.mean_ = artifact.scaler_mean
+            self.scaler.scale_ = artifact.scaler_scale
+            self.scaler.var_ = artifact.scaler_var
+            self.scaler.n_samples_seen_ = artifact.scaler_samples_seen
+            self.scaler.n_features_in_ = len(artifact.numeric_features)
+            self.scaler.feature_names_in_ = np.asarray(artifact.numeric_features, dtype=object)
+        
+        self.numeric_features = artifact.numeric_features
+        self.categorical_features = artifact.categorical_features
+        self.features_to_drop = artifact.features_to_drop
+        self.feature_order = artifact.feature_order
+        self.feature_dtypes = artifact.feature_dtypes
+        self.feature_config = artifact.feature_config
+        
+        self.logger.info(f"✅ Preprocessor loaded from: {filepath} (format v{artifact.format_version})")
 
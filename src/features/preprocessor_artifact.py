@@ -0,0 +1,351 @@
+"""
+Compact preprocessor artifact format.
+Stores only what inference needs (class vocabularies, scaler statistics,
+feature lists and dtypes) as raw numpy arrays behind a JSON manifest in a
+single file, so it can be memory-mapped, loads in milliseconds and its
+pages are shared between forked workers. Pickled artifacts from earlier
+releases are still readable.
+
+Layout: 8-byte magic, little-endian uint64 manifest length, UTF-8 JSON
+manifest, then each array's raw bytes at a 64-byte aligned offset.
+"""
+
+import json
+import math
+import mmap
+import os
+import pickle
+import struct
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, List, Mapping, Optional, Union
+
+import numpy as np
+
+MAGIC = b'FRDPREP\x00'
+FORMAT_NAME = 'fraud-preprocessor'
+FORMAT_VERSION = 1
+ALIGNMENT = 64
+
+# Categorical encodings: 'label' vocabularies are sorted LabelEncoder classes,
+# 'categorical' ones are stored category orders (e.g. bins); either way the
+# encoded value is the index in the vocabulary and unseen values map to -1
+ENCODINGS = ('label', 'categorical')
+
+_HEADER = struct.Struct('<8sQ')
+
+_REQUIRED_KEYS = {
+    'format': str,
+    'format_version': int,
+    'numeric_features': list,
+    'categorical_features': list,
+    'features_to_drop': list,
+    'feature_order': list,
+    'feature_dtypes': dict,
+    'encodings': dict,
+    'scaler': (dict, type(None)),
+    'feature_config': dict,
+    'arrays': dict
+}
+
+
+class ArtifactError(ValueError):
+    """Raised when a preprocessor artifact is malformed or of an unsupported version."""
+
+
+class PreprocessorArtifact:
+    """Inference-time view of a fitted DataPreprocessor."""
+
+    def __init__(
+        self,
+        numeric_features: List[str],
+        categorical_features: List[str],
+        features_to_drop: List[str],
+        vocabularies: Dict[str, np.ndarray],
+        encodings: Dict[str, str],
+        scaler_mean: Optional[np.ndarray] = None,
+        scaler_scale: Optional[np.ndarray] = None,
+        scaler_var: Optional[np.ndarray] = None,
+        scaler_samples_seen: Optional[int] = None,
+        feature_order: Optional[List[str]] = None,
+        feature_dtypes: Optional[Dict[str, str]] = None,
+        feature_config: Optional[Dict[str, Any]] = None,
+        format_version: int = FORMAT_VERSION
+    ):
+        """
+        Initialize artifact.
+
+        Args:
+            numeric_features: Scaled columns, in scaler order
+            categorical_features: Encoded columns
+            features_to_drop: Columns removed before encoding
+            vocabularies: Column -> array of labels (index = encoded value)
+            encodings: Column -> 'label' or 'categorical'
+            scaler_mean: StandardScaler.mean_
+            scaler_scale: StandardScaler.scale_
+            scaler_var: StandardScaler.var_
+            scaler_samples_seen: StandardScaler.n_samples_seen_
+            feature_order: Output column order of the fitted transform
+            feature_dtypes: Output column dtypes of the fitted transform
+            feature_config: Feature pipeline parameters used for training
+            format_version: Version the artifact was read from (or will be written as)
+        """
+        self.numeric_features = list(numeric_features)
+        self.categorical_features = list(categorical_features)
+        self.features_to_drop = list(features_to_drop)
+        self.vocabularies = vocabularies
+        self.encodings = encodings
+        self.scaler_mean = scaler_mean
+        self.scaler_scale = scaler_scale
+        self.scaler_var = scaler_var
+        self.scaler_samples_seen = scaler_samples_seen
+        self.feature_order = list(feature_order or [])
+        self.feature_dtypes = dict(feature_dtypes or {})
+        self.feature_config = dict(feature_config or {})
+        self.format_version = format_version
+
+    @property
+    def has_scaler(self) -> bool:
+        """Whether scaler statistics are present."""
+        return self.scaler_mean is not None
+
+    @classmethod
+    def from_components(cls, components: Mapping[str, Any]) -> 'PreprocessorArtifact':
+        """
+        Build from the component dict of a pickled (pre-artifact) preprocessor.
+
+        Args:
+            components: Dict with label_encoders, scaler, feature lists, ...
+
+        Returns:
+            PreprocessorArtifact
+        """
+        vocabularies: Dict[str, np.ndarray] = {}
+        encodings: Dict[str, str] = {}
+        for col, encoder in components.get('label_encoders', {}).items():
+            vocabularies[col] = np.asarray(encoder.classes_).astype(str)
+            encodings[col] = 'label'
+        for col, categories in components.get('category_mappings', {}).items():
+            vocabularies[col] = np.asarray(categories).astype(str)
+            encodings[col] = 'categorical'
+
+        scaler = components.get('scaler')
+        has_scaler = scaler is not None and getattr(scaler, 'mean_', None) is not None
+        samples_seen = getattr(scaler, 'n_samples_seen_', None) if has_scaler else None
+
+        return cls(
+            numeric_features=components.get('numeric_features', []),
+            categorical_features=components.get('categorical_features', []),
+            features_to_drop=components.get('features_to_drop', []),
+            vocabularies=vocabularies,
+            encodings=encodings,
+            scaler_mean=np.asarray(scaler.mean_, dtype=np.float64) if has_scaler else None,
+            scaler_scale=np.asarray(scaler.scale_, dtype=np.float64) if has_scaler else None,
+            scaler_var=np.asarray(scaler.var_, dtype=np.float64) if has_scaler else None,
+            scaler_samples_seen=int(np.max(samples_seen)) if samples_seen is not None else None,
+            feature_order=components.get('feature_order'),
+            feature_dtypes=components.get('feature_dtypes'),
+            feature_config=components.get('feature_config')
+        )
+
+    def save(self, filepath: Union[str, Path]) -> None:
+        """
+        Write the artifact atomically.
+
+        The file is written next to its destination and renamed into place,
+        so readers that still have the previous version mapped are unaffected.
+
+        Args:
+            filepath: Destination path
+        """
+        arrays = {f'vocabulary/{col}': vocab for col, vocab in self.vocabularies.items()}
+        if self.has_scaler:
+            arrays.update({
+                'scaler/mean': self.scaler_mean,
+                'scaler/scale': self.scaler_scale,
+                'scaler/var': self.scaler_var
+            })
+
+        blobs = {}
+        for name, array in arrays.items():
+            array = np.ascontiguousarray(array)
+            if array.dtype.kind == 'U':
+                array = array.astype(f'<U{max(1, array.dtype.itemsize // 4)}')
+            elif array.dtype.kind == 'f':
+                array = array.astype('<f8')
+            else:
+                raise ArtifactError(f"Unsupported dtype {array.dtype} for array '{name}'")
+            blobs[name] = array
+
+        manifest = {
+            'format': FORMAT_NAME,
+            'format_version': FORMAT_VERSION,
+            'numeric_features': self.numeric_features,
+            'categorical_features': self.categorical_features,
+            'features_to_drop': self.features_to_drop,
+            'feature_order': self.feature_order,
+            'feature_dtypes': self.feature_dtypes,
+            'encodings': self.encodings,
+            'scaler': {'n_samples_seen': self.scaler_samples_seen} if self.has_scaler else None,
+            'feature_config': self.feature_config,
+            'arrays': {}
+        }
+
+        # Offsets are relative to the (aligned) start of the data section
+        offset = 0
+        for name, array in blobs.items():
+            manifest['arrays'][name] = {
+                'dtype': array.dtype.str,
+                'shape': list(array.shape),
+                'offset': offset,
+                'nbytes': array.nbytes
+            }
+            offset = _align(offset + array.nbytes)
+
+        manifest_bytes = json.dumps(manifest, sort_keys=True).encode('utf-8')
+        data_start = _align(_HEADER.size + len(manifest_bytes))
+
+        path = Path(filepath)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f'.{path.name}.')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(_HEADER.pack(MAGIC, len(manifest_bytes)))
+                f.write(manifest_bytes)
+                for name, array in blobs.items():
+                    f.seek(data_start + manifest['arrays'][name]['offset'])
+                    f.write(array.tobytes())
+                f.truncate(data_start + offset)
+            os.chmod(tmp_path, 0o644)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+
+    @classmethod
+    def load(cls, filepath: Union[str, Path]) -> 'PreprocessorArtifact':
+        """
+        Load an artifact, memory-mapping its arrays.
+
+        Falls back to unpickling files written by earlier releases.
+
+        Args:
+            filepath: Artifact path
+
+        Returns:
+            PreprocessorArtifact
+        """
+        with open(filepath, 'rb') as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                f.seek(0)
+                return cls._from_pickle(f.read())
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return cls._from_buffer(buffer)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> 'PreprocessorArtifact':
+        """Load an artifact (or legacy pickle) from an in-memory buffer."""
+        if not data.startswith(MAGIC):
+            return cls._from_pickle(data)
+        return cls._from_buffer(data)
+
+    @classmethod
+    def _from_pickle(cls, data: bytes) -> 'PreprocessorArtifact':
+        """Convert a pickled component dict; its format version is reported as 0."""
+        components = pickle.loads(data)
+        if not isinstance(components, Mapping):
+            raise ArtifactError(f"Unrecognized preprocessor pickle: {type(components).__name__}")
+        artifact = cls.from_components(components)
+        artifact.format_version = 0
+        return artifact
+
+    @classmethod
+    def _from_buffer(cls, buffer: Any) -> 'PreprocessorArtifact':
+        """Parse and validate the manifest, then view the arrays in place."""
+        if len(buffer) < _HEADER.size:
+            raise ArtifactError("Artifact is truncated")
+        _, manifest_length = _HEADER.unpack_from(buffer, 0)
+        try:
+            manifest = json.loads(bytes(buffer[_HEADER.size:_HEADER.size + manifest_length]))
+        except ValueError as e:
+            raise ArtifactError(f"Invalid artifact manifest: {e}")
+
+        data_start = _align(_HEADER.size + manifest_length)
+        _validate_manifest(manifest, len(buffer) - data_start)
+
+        arrays = {}
+        for name, spec in manifest['arrays'].items():
+            dtype = np.dtype(spec['dtype'])
+            arrays[name] = np.frombuffer(
+                buffer, dtype=dtype, count=spec['nbytes'] // dtype.itemsize,
+                offset=data_start + spec['offset']
+            ).reshape(spec['shape'])
+
+        scaler = manifest['scaler']
+        return cls(
+            numeric_features=manifest['numeric_features'],
+            categorical_features=manifest['categorical_features'],
+            features_to_drop=manifest['features_to_drop'],
+            vocabularies={col: arrays[f'vocabulary/{col}'] for col in manifest['encodings']},
+            encodings=manifest['encodings'],
+            scaler_mean=arrays['scaler/mean'] if scaler else None,
+            scaler_scale=arrays['scaler/scale'] if scaler else None,
+            scaler_var=arrays['scaler/var'] if scaler else None,
+            scaler_samples_seen=scaler['n_samples_seen'] if scaler else None,
+            feature_order=manifest['feature_order'],
+            feature_dtypes=manifest['feature_dtypes'],
+            feature_config=manifest['feature_config'],
+            format_version=manifest['format_version']
+        )
+
+
+def _align(offset: int) -> int:
+    """Round an offset up to the array alignment."""
+    return (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+def _validate_manifest(manifest: Any, data_size: int) -> None:
+    """
+    Check the manifest against the schema and the file size.
+
+    Raises:
+        ArtifactError: On any mismatch
+    """
+    if not isinstance(manifest, dict):
+        raise ArtifactError("Artifact manifest must be an object")
+    if manifest.get('format') != FORMAT_NAME:
+        raise ArtifactError(f"Not a {FORMAT_NAME} artifact: {manifest.get('format')!r}")
+    if not isinstance(manifest.get('format_version'), int) or not 1 <= manifest['format_version'] <= FORMAT_VERSION:
+        raise ArtifactError(
+            f"Unsupported artifact version {manifest.get('format_version')!r} "
+            f"(this release reads up to {FORMAT_VERSION})"
+        )
+
+    for key, expected in _REQUIRED_KEYS.items():
+        if key not in manifest or not isinstance(manifest[key], expected):
+            raise ArtifactError(f"Artifact manifest field '{key}' is missing or has the wrong type")
+
+    for name, spec in manifest['arrays'].items():
+        try:
+            dtype = np.dtype(spec['dtype'])
+            count = math.prod(int(dim) for dim in spec['shape'])
+            offset, nbytes = int(spec['offset']), int(spec['nbytes'])
+        except (KeyError, TypeError, ValueError) as e:
+            raise ArtifactError(f"Invalid spec for array '{name}': {e}")
+        if dtype.kind not in ('U', 'f') or dtype.hasobject:
+            raise ArtifactError(f"Array '{name}' has unsupported dtype {dtype}")
+        if nbytes != count * dtype.itemsize or offset % ALIGNMENT or offset + nbytes > data_size:
+            raise ArtifactError(f"Array '{name}' does not fit the artifact file")
+
+    for col, encoding in manifest['encodings'].items():
+        if encoding not in ENCODINGS:
+            raise ArtifactError(f"Unknown encoding {encoding!r} for column '{col}'")
+        if f'vocabulary/{col}' not in manifest['arrays']:
+            raise ArtifactError(f"Missing vocabulary for column '{col}'")
+
+    if manifest['scaler'] is not None:
+        for part in ('mean', 'scale', 'var'):
+            spec = manifest['arrays'].get(f'scaler/{part}')
+            if spec is None or spec['shape'] != [len(manifest['numeric_features'])]:
+                raise ArtifactError(f"Scaler {part} does not match the numeric features")
@@ -1,6 +1,18 @@
 """Model training and evaluation modules."""
 
-from .trainer import ModelTrainer
+import importlib
+
+# Classes are imported on first access so that importing src.models does not
+# pull in MLflow and the optional boosting libraries
+_LAZY_IMPORTS = {
+    'ModelTrainer': '.trainer'
+}
 
 __all__ = ['ModelTrainer']
 
+
+def __getattr__(name):
+    if name in _LAZY_IMPORTS:
+        module = importlib.import_module(_LAZY_IMPORTS[name], __name__)
+        return getattr(module, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
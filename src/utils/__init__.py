@@ -1,6 +1,9 @@
 """Utility modules for the fraud detection system."""
 
 from .logger import ProjectLogger
+from .config import load_config, get_section
+from .dtypes import downcast_array, downcast_frame
+from .segment_log import SegmentLog
 
-__all__ = ['ProjectLogger']
+__all__ = ['ProjectLogger', 'load_config', 'get_section', 'downcast_array', 'downcast_frame', 'SegmentLog']
 
@@ -0,0 +1,53 @@
+"""
+Configuration loading for the fraud detection system.
+Reads config/config.yaml and exposes it as a plain dictionary.
+"""
+
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+try:
+    import yaml
+    HAS_YAML = True
+except ImportError:
+    HAS_YAML = False
+
+DEFAULT_CONFIG_PATH = Path(__file__).resolve().parent.parent.parent / 'config' / 'config.yaml'
+
+
+def load_config(config_path: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Load project configuration.
+
+    Args:
+        config_path: Path to YAML config file (defaults to config/config.yaml)
+
+    Returns:
+        Configuration dictionary (empty if the file or PyYAML is unavailable)
+    """
+    path = Path(config_path) if config_path else DEFAULT_CONFIG_PATH
+
+    if not HAS_YAML or not path.exists():
+        return {}
+
+    with open(path, 'r', encoding='utf-8') as f:
+        return yaml.safe_load(f) or {}
+
+
+def get_section(config: Dict[str, Any], *keys: str) -> Dict[str, Any]:
+    """
+    Get a nested configuration section, returning an empty dict if missing.
+
+    Args:
+        config: Configuration dictionary
+        keys: Path of section names, e.g. ('api', 'batching')
+
+    Returns:
+        Section dictionary
+    """
+    section = config
+    for key in keys:
+        section = section.get(key) if isinstance(section, dict) else None
+        if section is None:
+            return {}
+    return section if isinstance(section, dict) else {}
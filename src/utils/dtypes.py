@@ -0,0 +1,81 @@
+"""
+Compact dtype helpers for the fraud detection system.
+Downcast numeric data to the smallest types that hold it (integers and
+flags to int8/int16/int32, floats to float32) for the opt-in compact
+training mode.
+"""
+
+from typing import TYPE_CHECKING, Any
+
+import numpy as np
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+# Float type used for features in compact mode
+COMPACT_FLOAT = np.float32
+
+# Candidate integer types, smallest first
+_INT_TYPES = (np.int8, np.int16, np.int32, np.int64)
+
+
+def smallest_int_dtype(values: np.ndarray) -> np.dtype:
+    """
+    Smallest signed integer type that holds every value.
+
+    Args:
+        values: Integer or boolean array
+
+    Returns:
+        numpy dtype (int8 for empty arrays)
+    """
+    if values.size == 0:
+        return np.dtype(np.int8)
+    low, high = int(values.min()), int(values.max())
+    for int_type in _INT_TYPES:
+        info = np.iinfo(int_type)
+        if info.min <= low and high <= info.max:
+            return np.dtype(int_type)
+    return values.dtype
+
+
+def downcast_array(values: Any) -> Any:
+    """
+    Downcast a numeric array: booleans and integers to the smallest signed
+    integer type, floats to COMPACT_FLOAT. Other dtypes and scalars are
+    returned unchanged.
+
+    Args:
+        values: Array (or scalar)
+
+    Returns:
+        Downcast array
+    """
+    if not isinstance(values, np.ndarray):
+        return values
+    if values.dtype.kind in 'biu':
+        return values.astype(smallest_int_dtype(values), copy=False)
+    if values.dtype.kind == 'f':
+        return values.astype(COMPACT_FLOAT, copy=False)
+    return values
+
+
+def downcast_frame(df: 'pd.DataFrame') -> 'pd.DataFrame':
+    """
+    Downcast every numeric column of a DataFrame.
+
+    Categorical, string and datetime columns are left as they are.
+
+    Args:
+        df: Input DataFrame
+
+    Returns:
+        DataFrame with compact numeric columns
+    """
+    dtypes = {}
+    for col, dtype in df.dtypes.items():
+        if isinstance(dtype, np.dtype) and dtype.kind in 'biuf':
+            target = downcast_array(df[col].to_numpy()).dtype
+            if target != dtype:
+                dtypes[col] = target
+    return df.astype(dtypes) if dtypes else df
@@ -0,0 +1,287 @@
+"""
+Append-only segmented record log.
+Records are queued in a bounded in-memory buffer and written as JSON lines
+by a background thread in batches, to segment files that are rotated by
+size. Memory stays bounded by the buffer, writes are sequential appends,
+and readers iterate over the segments in order.
+"""
+
+import atexit
+import json
+import os
+import queue
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+FSYNC_POLICIES = ('always', 'interval', 'never')
+OVERFLOW_POLICIES = ('drop', 'block')
+
+SEGMENT_SUFFIX = '.jsonl'
+
+# Queued by close() to stop the writer after everything before it is written
+_STOP = object()
+
+
+def _json_default(value: Any) -> Any:
+    """Serialize numpy scalars and arrays."""
+    if hasattr(value, 'tolist'):
+        return value.tolist()
+    return str(value)
+
+
+def list_segments(directory: str, prefix: str = 'segment') -> List[Path]:
+    """Segment files of a log, oldest first."""
+    return sorted(Path(directory).glob(f'{prefix}-*{SEGMENT_SUFFIX}'))
+
+
+def iter_records(
+    directory: str,
+    prefix: str = 'segment',
+    modified_since: Optional[float] = None
+) -> Iterator[Dict[str, Any]]:
+    """
+    Iterate over every record of a log, oldest first.
+
+    A trailing line without a newline (a write in progress, or one cut short
+    by a crash) is skipped.
+
+    Args:
+        directory: Log directory
+        prefix: Segment file prefix
+        modified_since: Skip segments last written before this Unix time
+
+    Yields:
+        One record per logged entry
+    """
+    for path in list_segments(directory, prefix):
+        if modified_since is not None and path.stat().st_mtime < modified_since:
+            continue
+        with open(path, 'rb') as f:
+            for line in f:
+                if not line.endswith(b'\n'):
+                    break
+                yield json.loads(line)
+
+
+class SegmentLog:
+    """Bounded, batched, background-written JSON lines log rotated by size."""
+
+    def __init__(
+        self,
+        directory: str,
+        prefix: str = 'segment',
+        max_segment_mb: float = 64.0,
+        max_segments: Optional[int] = None,
+        buffer_size: int = 10000,
+        batch_size: int = 1000,
+        flush_interval: float = 1.0,
+        fsync: str = 'interval',
+        fsync_interval: float = 5.0,
+        overflow: str = 'drop'
+    ):
+        """
+        Initialize log and start its writer thread.
+
+        Args:
+            directory: Directory holding the segment files
+            prefix: Segment file prefix (<prefix>-<index>.jsonl)
+            max_segment_mb: Size at which the current segment is closed
+            max_segments: Oldest segments beyond this many are deleted (None keeps all)
+            buffer_size: Records held in memory waiting to be written
+            batch_size: Maximum records per write
+            flush_interval: Seconds the writer waits for more records before
+                checking the fsync interval
+            fsync: 'always' after every batch, 'interval' at most every
+                fsync_interval seconds, or 'never' (closed segments are
+                still synced unless 'never')
+            fsync_interval: Seconds between fsyncs with the 'interval' policy
+            overflow: 'drop' new records or 'block' the caller when the buffer is full
+        """
+        if fsync not in FSYNC_POLICIES:
+            raise ValueError(f"Unknown fsync policy '{fsync}', expected one of {FSYNC_POLICIES}")
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown overflow policy '{overflow}', expected one of {OVERFLOW_POLICIES}")
+
+        self.directory = Path(directory)
+        self.prefix = prefix
+        self.max_segment_bytes = int(max_segment_mb * 1024 * 1024)
+        self.max_segments = max_segments
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self.fsync = fsync
+        self.fsync_interval = fsync_interval
+        self.overflow = overflow
+
+        self.appended = 0
+        self.written = 0
+        self.dropped = 0
+        self.write_errors = 0
+        self.last_error: Optional[str] = None
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._queue: 'queue.Queue[Any]' = queue.Queue(maxsize=max(1, buffer_size))
+        self._file = None
+        self._segment_index = 0
+        self._segment_bytes = 0
+        self._last_fsync = time.monotonic()
+        self._closed = False
+        self._open_segment()
+
+        self._writer = threading.Thread(target=self._run, name=f'{prefix}-log-writer', daemon=True)
+        self._writer.start()
+        atexit.register(self.close)
+
+    def append(self, record: Dict[str, Any]) -> bool:
+        """
+        Queue a record for writing.
+
+        Returns:
+            False if the record was dropped because the buffer is full
+        """
+        if self._closed:
+            raise ValueError("Log is closed")
+
+        try:
+            self._queue.put(record, block=self.overflow == 'block')
+        except queue.Full:
+            self.dropped += 1
+            return False
+        self.appended += 1
+        return True
+
+    def flush(self) -> None:
+        """Wait until every queued record has been written."""
+        self._queue.join()
+
+    def close(self) -> None:
+        """Write the remaining records, sync and close the current segment."""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(_STOP)
+        self._writer.join()
+
+    def segments(self) -> List[Path]:
+        """Segment files, oldest first."""
+        return list_segments(self.directory, self.prefix)
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        return iter_records(self.directory, self.prefix)
+
+    def records(self, modified_since: Optional[float] = None) -> Iterator[Dict[str, Any]]:
+        """Records of the segments written since a Unix time, oldest first."""
+        return iter_records(self.directory, self.prefix, modified_since)
+
+    def _segment_path(self, index: int) -> Path:
+        return self.directory / f'{self.prefix}-{index:08d}{SEGMENT_SUFFIX}'
+
+    def _open_segment(self) -> None:
+        """Continue the newest segment, or start a new one if it is full or has a torn tail."""
+        segments = self.segments()
+        if segments:
+            newest = segments[-1]
+            self._segment_index = int(newest.stem.rsplit('-', 1)[1])
+            size = newest.stat().st_size
+            torn = False
+            if size:
+                with open(newest, 'rb') as f:
+                    f.seek(-1, os.SEEK_END)
+                    torn = f.read(1) != b'\n'
+            if size < self.max_segment_bytes and not torn:
+                self._file = open(newest, 'ab')
+                self._segment_bytes = size
+                return
+        self._start_segment(self._segment_index + 1)
+
+    def _start_segment(self, index: int) -> None:
+        self._segment_index = index
+        self._file = open(self._segment_path(index), 'ab')
+        self._segment_bytes = 0
+
+    def _close_segment(self) -> None:
+        self._file.flush()
+        if self.fsync != 'never':
+            os.fsync(self._file.fileno())
+        self._file.close()
+
+    def _rotate(self) -> None:
+        """Close the current segment, start the next and apply retention."""
+        self._close_segment()
+        self._start_segment(self._segment_index + 1)
+
+        if self.max_segments is not None:
+            for path in self.segments()[:-self.max_segments]:
+                path.unlink(missing_ok=True)
+
+    def _write(self, records: List[Dict[str, Any]]) -> None:
+        """Append a batch, rotating between records when a segment is full."""
+        chunk: List[bytes] = []
+        chunk_bytes = 0
+        for record in records:
+            line = (json.dumps(record, separators=(',', ':'), default=_json_default) + '\n').encode()
+            if chunk_bytes and self._segment_bytes + chunk_bytes + len(line) > self.max_segment_bytes:
+                self._file.write(b''.join(chunk))
+                self._segment_bytes += chunk_bytes
+                chunk, chunk_bytes = [], 0
+            if self._segment_bytes and self._segment_bytes + chunk_bytes + len(line) > self.max_segment_bytes:
+                self._rotate()
+            chunk.append(line)
+            chunk_bytes += len(line)
+
+        if chunk:
+            self._file.write(b''.join(chunk))
+            self._segment_bytes += chunk_bytes
+        self._file.flush()
+        self.written += len(records)
+
+        if self.fsync == 'always':
+            self._sync()
+
+    def _sync(self) -> None:
+        os.fsync(self._file.fileno())
+        self._last_fsync = time.monotonic()
+
+    def _run(self) -> None:
+        """Writer thread: drain the buffer in batches until close()."""
+        stopping = False
+        while not stopping:
+            try:
+                items = [self._queue.get(timeout=self.flush_interval)]
+            except queue.Empty:
+                items = []
+            while items and len(items) < self.batch_size:
+                try:
+                    items.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            records = [item for item in items if item is not _STOP]
+            stopping = len(records) < len(items)
+            try:
+                if records:
+                    self._write(records)
+                if self.fsync == 'interval' and time.monotonic() - self._last_fsync >= self.fsync_interval:
+                    self._sync()
+            except (OSError, TypeError, ValueError) as e:
+                self.write_errors += 1
+                self.last_error = str(e)
+            finally:
+                for _ in items:
+                    self._queue.task_done()
+
+        self._close_segment()
+
+    def stats(self) -> Dict[str, Any]:
+        """Throughput, loss and backlog counters."""
+        return {
+            'appended': self.appended,
+            'written': self.written,
+            'dropped': self.dropped,
+            'buffered': self._queue.qsize(),
+            'write_errors': self.write_errors,
+            'last_error': self.last_error,
+            'segment': self._segment_index,
+            'segment_bytes': self._segment_bytes
+        }
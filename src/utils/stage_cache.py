@@ -0,0 +1,285 @@
+"""
+Content-addressed cache for training pipeline stages.
+Each stage's outputs are stored under a key hashed from its upstream keys,
+its config and the source code that produces it, so a rerun skips every
+stage whose inputs did not change. Keys never depend on output contents,
+so a fully cached chain only loads the outputs that are actually used.
+
+DataFrames and Series are stored as Parquet (pickle without pyarrow),
+artifact files are copied, and anything else is stored as JSON.
+"""
+
+import hashlib
+import inspect
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+import types
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Mapping, Optional, Sequence
+
+import pandas as pd
+
+try:
+    import pyarrow  # noqa: F401
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+from .logger import ProjectLogger
+
+# Bump when the on-disk layout changes so old entries are not reused
+CACHE_FORMAT_VERSION = 1
+
+MANIFEST_NAME = 'manifest.json'
+
+
+def hash_file(path: str, chunk_size: int = 1 << 20) -> str:
+    """SHA-256 of a file's contents."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(chunk_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def code_fingerprint(*objects: Any) -> str:
+    """
+    Hash of the code behind stage logic.
+
+    Modules and classes hash their whole module file (so helpers are
+    covered); functions hash their own source.
+
+    Args:
+        objects: Modules, classes or functions
+
+    Returns:
+        Hex digest
+    """
+    digest = hashlib.sha256()
+    for obj in objects:
+        if isinstance(obj, (types.FunctionType, types.MethodType)):
+            digest.update(inspect.getsource(obj).encode())
+            continue
+        module = obj if isinstance(obj, types.ModuleType) else sys.modules[obj.__module__]
+        with open(inspect.getsourcefile(module), 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+def _json_default(value: Any) -> Any:
+    """Serialize numpy scalars, tuples of them and paths."""
+    if hasattr(value, 'item'):
+        return value.item()
+    return str(value)
+
+
+class StageOutputs(Mapping):
+    """Outputs of one stage; cached outputs are loaded on first access."""
+
+    def __init__(self, stage: str, key: str, loaders: Mapping[str, Callable[[], Any]]):
+        self.stage = stage
+        self.key = key
+        self._loaders = dict(loaders)
+        self._values: Dict[str, Any] = {}
+
+    def __getitem__(self, name: str) -> Any:
+        if name not in self._values:
+            self._values[name] = self._loaders[name]()
+        return self._values[name]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._loaders)
+
+    def __len__(self) -> int:
+        return len(self._loaders)
+
+
+class StageCache:
+    """Skips pipeline stages whose upstream keys, config and code are unchanged."""
+
+    def __init__(
+        self,
+        stages: Sequence[str],
+        root: str = 'data/cache/stages',
+        enabled: bool = True,
+        rerun_from: Optional[str] = None,
+        keep: int = 3
+    ):
+        """
+        Initialize stage cache.
+
+        Args:
+            stages: Stage names in execution order
+            root: Cache directory (one subdirectory per stage and key)
+            enabled: Run every stage and store nothing when False
+            rerun_from: Recompute this stage and every later one
+            keep: Entries kept per stage (least recently used ones are pruned)
+        """
+        if rerun_from is not None and rerun_from not in stages:
+            raise ValueError(f"Unknown stage '{rerun_from}', expected one of {list(stages)}")
+
+        self.stages = list(stages)
+        self.root = Path(root)
+        self.enabled = enabled
+        self.rerun_from = rerun_from
+        self.keep = keep
+        self.logger = ProjectLogger()
+
+        # (stage, status, key, seconds) per run() call, for report()
+        self.events: List[Dict[str, Any]] = []
+
+    def key(self, stage: str, inputs: Iterable[str] = (), config: Any = None, code: str = '') -> str:
+        """Cache key of a stage from its upstream keys, config and code fingerprint."""
+        payload = json.dumps({
+            'format': CACHE_FORMAT_VERSION,
+            'stage': stage,
+            'inputs': list(inputs),
+            'config': config,
+            'code': code
+        }, sort_keys=True, default=_json_default)
+        return hashlib.sha256(payload.encode()).hexdigest()[:32]
+
+    def _forced(self, stage: str) -> bool:
+        return self.rerun_from is not None and self.stages.index(stage) >= self.stages.index(self.rerun_from)
+
+    def run(
+        self,
+        stage: str,
+        fn: Callable[[], Dict[str, Any]],
+        inputs: Iterable[str] = (),
+        config: Any = None,
+        code: str = ''
+    ) -> StageOutputs:
+        """
+        Return a stage's cached outputs, or compute and store them.
+
+        Args:
+            stage: Stage name (one of stages)
+            fn: Computes the outputs as a dict of name to DataFrame, Series,
+                Path (artifact file to keep) or JSON-serializable value
+            inputs: Keys of upstream stages and fingerprints of input files
+            config: Config values the stage depends on
+            code: code_fingerprint() of the stage logic
+
+        Returns:
+            StageOutputs with the stage's key
+        """
+        key = self.key(stage, inputs, config, code)
+        entry = self.root / stage / key
+        started = time.perf_counter()
+
+        if self.enabled and not self._forced(stage) and (entry / MANIFEST_NAME).exists():
+            # Mark the entry as used so pruning evicts least recently used entries
+            os.utime(entry)
+            outputs = self._load(stage, key, entry)
+            self._record(stage, 'hit', key, started)
+            return outputs
+
+        values = fn()
+        if self.enabled:
+            self._store(stage, entry, values)
+            self._prune(stage)
+        status = 'disabled' if not self.enabled else 'rerun' if self._forced(stage) else 'miss'
+        self._record(stage, status, key, started)
+        return StageOutputs(stage, key, {name: (lambda value=value: value) for name, value in values.items()})
+
+    def _record(self, stage: str, status: str, key: str, started: float) -> None:
+        seconds = time.perf_counter() - started
+        self.events.append({'stage': stage, 'status': status, 'key': key, 'seconds': seconds})
+        self.logger.info(f"Stage {stage}: {status} ({key[:12]}, {seconds:.2f}s)")
+
+    def _store(self, stage: str, entry: Path, values: Mapping[str, Any]) -> None:
+        """Write outputs to a temporary directory, then move it into place."""
+        entry.parent.mkdir(parents=True, exist_ok=True)
+        tmp_dir = Path(tempfile.mkdtemp(dir=entry.parent, prefix='.tmp-'))
+        try:
+            manifest = {'stage': stage, 'created_at': time.time(), 'outputs': {}}
+            for name, value in values.items():
+                manifest['outputs'][name] = self._write_output(tmp_dir, name, value)
+            with open(tmp_dir / MANIFEST_NAME, 'w', encoding='utf-8') as f:
+                json.dump(manifest, f, indent=2, default=_json_default)
+
+            if entry.exists():
+                shutil.rmtree(entry)
+            os.replace(tmp_dir, entry)
+        except BaseException:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            raise
+
+    @staticmethod
+    def _write_output(directory: Path, name: str, value: Any) -> Dict[str, Any]:
+        """Write one output and describe it for the manifest."""
+        if isinstance(value, Path):
+            filename = f'{name}{value.suffix}'
+            shutil.copyfile(value, directory / filename)
+            return {'kind': 'file', 'file': filename, 'target': str(value)}
+
+        if isinstance(value, (pd.DataFrame, pd.Series)):
+            spec = {'kind': 'frame'}
+            if isinstance(value, pd.Series):
+                spec = {'kind': 'series', 'name': value.name}
+                value = value.to_frame(name='values')
+            if HAS_PYARROW:
+                spec['file'] = f'{name}.parquet'
+                value.to_parquet(directory / spec['file'])
+            else:
+                spec['file'] = f'{name}.pkl'
+                value.to_pickle(directory / spec['file'])
+            return spec
+
+        filename = f'{name}.json'
+        with open(directory / filename, 'w', encoding='utf-8') as f:
+            json.dump(value, f, default=_json_default)
+        return {'kind': 'json', 'file': filename}
+
+    def _load(self, stage: str, key: str, entry: Path) -> StageOutputs:
+        """Outputs of a cached entry; artifact files are restored to their targets now."""
+        with open(entry / MANIFEST_NAME, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+
+        loaders = {}
+        for name, spec in manifest['outputs'].items():
+            path = entry / spec['file']
+            if spec['kind'] == 'file':
+                Path(spec['target']).parent.mkdir(parents=True, exist_ok=True)
+                shutil.copyfile(path, spec['target'])
+                loaders[name] = lambda target=spec['target']: Path(target)
+            else:
+                loaders[name] = lambda path=path, spec=spec: self._read_output(path, spec)
+        return StageOutputs(stage, key, loaders)
+
+    @staticmethod
+    def _read_output(path: Path, spec: Mapping[str, Any]) -> Any:
+        if spec['kind'] == 'json':
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+
+        df = pd.read_parquet(path) if path.suffix == '.parquet' else pd.read_pickle(path)
+        if spec['kind'] == 'series':
+            return df['values'].rename(spec['name'])
+        return df
+
+    def _prune(self, stage: str) -> None:
+        """Keep only the most recently used (written or hit) entries of a stage."""
+        entries = sorted(
+            (path for path in (self.root / stage).iterdir() if path.is_dir() and not path.name.startswith('.')),
+            key=lambda path: path.stat().st_mtime,
+            reverse=True
+        )
+        for path in entries[self.keep:]:
+            shutil.rmtree(path, ignore_errors=True)
+
+    def report(self) -> str:
+        """Table of stage statuses and timings for this run."""
+        lines = [f"   {'stage':<12}{'status':<10}{'seconds':>9}  key"]
+        for event in self.events:
+            lines.append(
+                f"   {event['stage']:<12}{event['status']:<10}{event['seconds']:>9.2f}  {event['key'][:12]}"
+            )
+        hits = sum(event['status'] == 'hit' for event in self.events)
+        lines.append(f"   {hits}/{len(self.events)} stages served from cache")
+        return "\n".join(lines)